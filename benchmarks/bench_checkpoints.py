@@ -0,0 +1,142 @@
+"""Checkpoint Size and Write Latency Benchmark.
+
+Runs ``deep_research_from_scratch.research_agent_full.agent`` end to end once
+with the default LangGraph serializer and once with the compact serializer
+from ``checkpointing.py``, both on an in-memory saver, and compares:
+
+- Bytes written: serialized checkpoint payloads, plus (for the compact
+  serializer) the offloaded contents newly stored in the note store
+- Write latency: time spent in the saver's put/put_writes calls
+
+The research run makes real model and search calls, so API keys must be set.
+
+Usage:
+    uv run python benchmarks/bench_checkpoints.py --json bench_checkpoints.json
+"""
+
+import argparse
+import asyncio
+import json
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from deep_research_from_scratch.checkpointing import CompactSerializer
+from deep_research_from_scratch.note_store import NoteStore
+from deep_research_from_scratch.research_agent_full import agent
+
+DEFAULT_QUERY = (
+    "Compare the best specialty coffee shops in San Francisco for espresso quality. "
+    "Focus on independent shops, use any sources, and I have no further constraints."
+)
+
+class MeasuringSerializer:
+    """Pass-through serializer that counts payload bytes."""
+
+    def __init__(self, inner):
+        """Wrap inner, counting the bytes of every payload it writes."""
+        self.inner = inner
+        self.payloads = 0
+        self.bytes = 0
+
+    def dumps_typed(self, obj):
+        """Serialize through inner and count the result."""
+        type_, data = self.inner.dumps_typed(obj)
+        self.payloads += 1
+        self.bytes += len(data)
+        return type_, data
+
+    def loads_typed(self, data):
+        """Deserialize through inner."""
+        return self.inner.loads_typed(data)
+
+class TimedSaver(InMemorySaver):
+    """In-memory saver that records the time spent writing checkpoints."""
+
+    def __init__(self, serde):
+        """Create a saver using serde."""
+        super().__init__(serde=serde)
+        self.write_seconds = []
+
+    def put(self, *args, **kwargs):
+        """Time a checkpoint write."""
+        start = time.perf_counter()
+        try:
+            return super().put(*args, **kwargs)
+        finally:
+            self.write_seconds.append(time.perf_counter() - start)
+
+    def put_writes(self, *args, **kwargs):
+        """Time a pending-writes write."""
+        start = time.perf_counter()
+        try:
+            return super().put_writes(*args, **kwargs)
+        finally:
+            self.write_seconds.append(time.perf_counter() - start)
+
+async def run_once(name: str, serde, query: str, note_store: NoteStore = None) -> dict:
+    """Run the full agent with a checkpointer using serde and return its measurements."""
+    measured = MeasuringSerializer(serde)
+    saver = TimedSaver(measured)
+    graph = agent.builder.compile(checkpointer=saver)
+
+    stored_before = note_store.stats["bytes_stored"] if note_store else 0
+    start = time.perf_counter()
+    await graph.ainvoke(
+        {"messages": [HumanMessage(content=query)]},
+        {"configurable": {"thread_id": str(uuid.uuid4())}, "recursion_limit": 100},
+    )
+    elapsed = time.perf_counter() - start
+    offloaded = (note_store.stats["bytes_stored"] - stored_before) if note_store else 0
+
+    writes = saver.write_seconds
+    return {
+        "serializer": name,
+        "run_seconds": elapsed,
+        "payloads": measured.payloads,
+        "checkpoint_bytes": measured.bytes,
+        "offloaded_bytes": offloaded,
+        "total_bytes": measured.bytes + offloaded,
+        "writes": len(writes),
+        "write_seconds_total": sum(writes),
+        "write_ms_mean": 1000 * sum(writes) / len(writes) if writes else 0.0,
+        "write_ms_max": 1000 * max(writes, default=0.0),
+    }
+
+async def run(query: str) -> list:
+    """Benchmark the default and compact serializers on the same query."""
+    results = [await run_once("jsonplus", JsonPlusSerializer(), query)]
+    with tempfile.TemporaryDirectory() as tmp:
+        # A fresh note store so only this run's offloaded contents are counted
+        note_store = NoteStore(Path(tmp) / "raw_notes.sqlite")
+        results.append(await run_once("compact", CompactSerializer(note_store=note_store), query, note_store))
+    return results
+
+def main() -> None:
+    """Run the benchmark and print (and optionally save) a comparison."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--query", default=DEFAULT_QUERY, help="research request sent to the agent")
+    parser.add_argument("--json", help="optional path to write results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.query))
+
+    for result in results:
+        print(f"{result['serializer']}:")
+        print(f"  {result['total_bytes'] / 1024:.1f} KiB written ({result['checkpoint_bytes'] / 1024:.1f} KiB checkpoints, {result['offloaded_bytes'] / 1024:.1f} KiB offloaded) in {result['payloads']} payloads")
+        print(f"  {result['writes']} writes, mean {result['write_ms_mean']:.2f} ms, max {result['write_ms_max']:.2f} ms, total {result['write_seconds_total']:.3f}s")
+    baseline, compact = results
+    if compact["total_bytes"]:
+        print(f"compact writes {baseline['total_bytes'] / compact['total_bytes']:.1f}x fewer bytes")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""End-to-End Benchmark Suite for the Research Graphs.
+
+Runs each research graph over a fixed query set and reports, per graph:
+
+- Run latency and per-node latency (p50/p95)
+- LLM calls, tokens, tool calls and search calls per run
+- Peak RSS of the process running the graph
+- Runs per minute at each requested number of concurrent sessions
+
+By default every graph runs against the offline stand-ins from
+``fake_providers.py`` with a fresh cache directory, so results are
+reproducible and comparable between commits; ``--live`` uses the real
+providers instead. Each (graph, concurrency) pair runs in its own
+interpreter so peak RSS and caches are isolated.
+
+Results are saved as JSON together with the commit they were measured on,
+and ``--baseline`` prints the change against an earlier results file.
+
+Usage:
+    uv run python benchmarks/bench_graphs.py --concurrency 1 4 --json bench_graphs.json
+    uv run python benchmarks/bench_graphs.py --graphs agent --baseline bench_graphs_main.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import UTC, datetime
+
+QUERIES = [
+    "What are the best specialty coffee shops in San Francisco for espresso quality?",
+    "How do heat pumps compare with gas furnaces on running cost in cold climates?",
+    "What are the main approaches to long-context memory in large language models?",
+    "Which open-source vector databases are most used in production and why?",
+    "What does current research say about the health effects of intermittent fasting?",
+]
+
+# graph name -> (module, attribute, input builder)
+GRAPHS = {
+    "scope_research": ("deep_research_from_scratch.research_agent_scope", "scope_research", "messages"),
+    "researcher_agent": ("deep_research_from_scratch.research_agent", "researcher_agent", "researcher"),
+    "agent_mcp": ("deep_research_from_scratch.research_agent_mcp", "agent_mcp", "researcher"),
+    "supervisor_agent": ("deep_research_from_scratch.multi_agent_supervisor", "supervisor_agent", "supervisor"),
+    "agent": ("deep_research_from_scratch.research_agent_full", "agent", "messages"),
+}
+
+def percentile(values: list, q: float) -> float:
+    """Nearest-rank percentile of values (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+def summarize(values: list) -> dict:
+    """p50/p95/mean of a list of numbers."""
+    return {
+        "p50": percentile(values, 50),
+        "p95": percentile(values, 95),
+        "mean": statistics.fmean(values) if values else 0.0,
+    }
+
+# ===== WORKER =====
+
+def make_input(kind: str, query: str) -> dict:
+    """Input state for a graph of the given kind."""
+    from langchain_core.messages import HumanMessage
+
+    if kind == "researcher":
+        return {"researcher_messages": [HumanMessage(content=query)], "research_topic": query}
+    if kind == "supervisor":
+        return {"supervisor_messages": [HumanMessage(content=query)], "research_brief": query}
+    return {"messages": [HumanMessage(content=query)]}
+
+def make_recorder():
+    """Create a callback handler recording node latencies, LLM usage and tool calls for one run."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class RunRecorder(BaseCallbackHandler):
+        run_inline = True
+
+        def __init__(self):
+            self.node_seconds = defaultdict(list)
+            self.llm_calls = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.tool_calls = defaultdict(int)
+            self._starts = {}
+
+        def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+            node = (metadata or {}).get("langgraph_node")
+            if node and kwargs.get("name") == node:
+                self._starts[run_id] = (node, time.perf_counter())
+
+        def _end(self, run_id):
+            if run_id in self._starts:
+                node, start = self._starts.pop(run_id)
+                self.node_seconds[node].append(time.perf_counter() - start)
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            self._end(run_id)
+
+        def on_chain_error(self, error, *, run_id, **kwargs):
+            self._end(run_id)
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self.llm_calls += 1
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            for generations in response.generations:
+                for generation in generations:
+                    usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                    self.input_tokens += usage.get("input_tokens", 0)
+                    self.output_tokens += usage.get("output_tokens", 0)
+
+        def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+            self.tool_calls[kwargs.get("name") or (serialized or {}).get("name", "unknown")] += 1
+
+    return RunRecorder()
+
+async def run_graph(name: str, runs: int, concurrency: int, timeout: float) -> dict:
+    """Run one graph over the query set at the given concurrency and measure it."""
+    import importlib
+
+    from deep_research_from_scratch import models
+
+    module, attribute, kind = GRAPHS[name]
+    graph = getattr(importlib.import_module(module), attribute)
+    queries = [QUERIES[i % len(QUERIES)] for i in range(runs)]
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run_one(query: str) -> dict:
+        recorder = make_recorder()
+        async with semaphore:
+            start = time.perf_counter()
+            error = None
+            try:
+                await asyncio.wait_for(
+                    graph.ainvoke(make_input(kind, query), {"callbacks": [recorder], "recursion_limit": 100}),
+                    timeout,
+                )
+            except TimeoutError:
+                error = f"timed out after {timeout:.0f}s"
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            elapsed = time.perf_counter() - start
+        return {"seconds": elapsed, "error": error, "recorder": recorder}
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(run_one(query) for query in queries))
+    wall = time.perf_counter() - start
+
+    node_seconds = defaultdict(list)
+    for result in results:
+        for node, seconds in result["recorder"].node_seconds.items():
+            node_seconds[node].extend(seconds)
+
+    searches = [r["recorder"].tool_calls.get("tavily_search", 0) + r["recorder"].tool_calls.get("local_search", 0) for r in results]
+    search_queries = sum(getattr(client, "stats", {}).get("searches", 0) for client in models._clients.values())
+    return {
+        "graph": name,
+        "concurrency": concurrency,
+        "runs": runs,
+        "errors": [r["error"] for r in results if r["error"]],
+        "wall_seconds": wall,
+        "runs_per_minute": 60 * runs / wall if wall else 0.0,
+        "run_seconds": summarize([r["seconds"] for r in results]),
+        "node_seconds": {node: summarize(values) for node, values in sorted(node_seconds.items())},
+        "llm_calls_per_run": statistics.fmean(r["recorder"].llm_calls for r in results),
+        "input_tokens_per_run": statistics.fmean(r["recorder"].input_tokens for r in results),
+        "output_tokens_per_run": statistics.fmean(r["recorder"].output_tokens for r in results),
+        "tool_calls_per_run": statistics.fmean(sum(r["recorder"].tool_calls.values()) for r in results),
+        "search_calls_per_run": statistics.fmean(searches),
+        # Provider-level query count; only the fake clients expose it
+        "search_queries_per_run": search_queries / runs,
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024),
+    }
+
+def worker(args) -> None:
+    """Benchmark a single graph in this process and print the result as JSON."""
+    result = asyncio.run(run_graph(args.worker, args.runs, args.worker_concurrency, args.timeout))
+    print(json.dumps(result))
+
+# ===== DRIVER =====
+
+def run_in_subprocess(graph: str, runs: int, concurrency: int, timeout: float, live: bool) -> dict:
+    """Benchmark one graph at one concurrency in a fresh interpreter."""
+    with tempfile.TemporaryDirectory() as cache:
+        env = dict(os.environ)
+        if not live:
+            env["DEEP_RESEARCH_PROVIDERS"] = "fake"
+            # Fresh caches so every measurement starts cold
+            env["DEEP_RESEARCH_CACHE_DIR"] = cache
+        command = [sys.executable, __file__, "--worker", graph, "--runs", str(runs), "--worker-concurrency", str(concurrency), "--timeout", str(timeout)]
+        result = subprocess.run(command, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        return {"graph": graph, "concurrency": concurrency, "runs": runs, "errors": [result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "worker failed"]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def git_commit() -> str:
+    """Return the current commit hash, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def print_result(result: dict, baseline: dict = None) -> None:
+    """Print one graph/concurrency result, with changes against baseline if given."""
+    header = f"{result['graph']} @ {result['concurrency']} concurrent ({result['runs']} runs)"
+    if "run_seconds" not in result:
+        print(f"{header}: FAILED {result['errors']}")
+        return
+
+    def change(key, sub=None):
+        if not baseline or key not in baseline:
+            return ""
+        old = baseline[key][sub] if sub else baseline[key]
+        new = result[key][sub] if sub else result[key]
+        return f" ({(new - old) / old * 100:+.0f}%)" if old else ""
+
+    print(header)
+    print(f"  run p50 {result['run_seconds']['p50']:.2f}s{change('run_seconds', 'p50')}  p95 {result['run_seconds']['p95']:.2f}s{change('run_seconds', 'p95')}  {result['runs_per_minute']:.1f} runs/min{change('runs_per_minute')}")
+    print(f"  per run: {result['llm_calls_per_run']:.1f} LLM calls, {result['input_tokens_per_run'] + result['output_tokens_per_run']:.0f} tokens{change('input_tokens_per_run')}, {result['search_calls_per_run']:.1f} searches ({result['search_queries_per_run']:.1f} queries)  peak RSS {result['peak_rss_mb']:.0f} MB{change('peak_rss_mb')}")
+    for node, stats in result["node_seconds"].items():
+        print(f"    {node:<28} p50 {stats['p50'] * 1000:8.1f} ms  p95 {stats['p95'] * 1000:8.1f} ms")
+    if result["errors"]:
+        print(f"  {len(result['errors'])} failed runs, e.g. {result['errors'][0]}")
+
+def main() -> None:
+    """Run the suite and print (and optionally save) the results."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--graphs", nargs="+", choices=list(GRAPHS), default=list(GRAPHS), help="graphs to benchmark")
+    parser.add_argument("--runs", type=int, default=len(QUERIES), help="runs per graph and concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4], help="concurrent sessions to measure")
+    parser.add_argument("--timeout", type=float, default=300.0, help="seconds before a single run is counted as failed")
+    parser.add_argument("--live", action="store_true", help="use the real providers instead of the offline stand-ins")
+    parser.add_argument("--json", help="optional path to write results as JSON")
+    parser.add_argument("--baseline", help="earlier results JSON to compare against")
+    parser.add_argument("--worker", choices=list(GRAPHS), help=argparse.SUPPRESS)
+    parser.add_argument("--worker-concurrency", type=int, default=1, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args)
+        return
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = {(r["graph"], r["concurrency"]): r for r in json.load(f)["results"]}
+
+    results = []
+    for graph in args.graphs:
+        for concurrency in args.concurrency:
+            result = run_in_subprocess(graph, args.runs, concurrency, args.timeout, args.live)
+            print_result(result, baseline.get((graph, concurrency)))
+            results.append(result)
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "measured_at": datetime.now(UTC).isoformat(),
+            "providers": "live" if args.live else "fake",
+            "queries": QUERIES,
+            "results": results,
+        }
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
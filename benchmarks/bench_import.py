@@ -0,0 +1,69 @@
+"""Startup Benchmark for Package Import Time.
+
+Measures how long a fresh interpreter takes to import
+``deep_research_from_scratch.research_agent_full`` (which pulls in every
+graph module), and checks that the import neither requires API keys nor
+eagerly loads provider SDKs.
+
+Usage:
+    uv run python benchmarks/bench_import.py --runs 10 --json bench_import.json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+MODULE = "deep_research_from_scratch.research_agent_full"
+
+# Provider SDKs that should only be imported once a model or client is first used
+LAZY_MODULES = ["langchain_google_genai", "tavily", "langchain_mcp_adapters.sessions"]
+
+PROBE = f"""
+import json, sys, time
+start = time.perf_counter()
+import {MODULE}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {LAZY_MODULES!r} if m in sys.modules]}}))
+"""
+
+def run_once() -> dict:
+    """Import the module in a fresh interpreter without API keys and return its timing."""
+    env = {key: value for key, value in os.environ.items() if not key.endswith("_API_KEY")}
+    result = subprocess.run([sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def main() -> None:
+    """Run the benchmark and print (and optionally save) a summary."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="number of fresh-interpreter imports")
+    parser.add_argument("--json", help="optional path to write results as JSON")
+    args = parser.parse_args()
+
+    # The first run warms the filesystem and bytecode caches and is not counted
+    run_once()
+    samples = [run_once() for _ in range(args.runs)]
+    seconds = [sample["seconds"] for sample in samples]
+
+    summary = {
+        "module": MODULE,
+        "runs": args.runs,
+        "min_seconds": min(seconds),
+        "median_seconds": statistics.median(seconds),
+        "max_seconds": max(seconds),
+        "eagerly_loaded": sorted({name for sample in samples for name in sample["loaded"]}),
+    }
+
+    print(f"import {MODULE}")
+    print(f"  min {summary['min_seconds']:.3f}s  median {summary['median_seconds']:.3f}s  max {summary['max_seconds']:.3f}s  ({args.runs} runs, no API keys)")
+    if summary["eagerly_loaded"]:
+        print(f"  WARNING: eagerly imported {', '.join(summary['eagerly_loaded'])}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(summary, f, indent=2)
+
+if __name__ == "__main__":
+    main()
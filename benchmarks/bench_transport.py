@@ -0,0 +1,209 @@
+"""Connection Reuse Benchmark for the Shared HTTP Transport.
+
+Points the clients that use the shared transport from ``transport.py`` at a
+local keep-alive HTTP server and counts how many TCP connections the server
+sees while researchers run in consecutive waves, as the research scheduler
+runs them when there are more units than slots:
+
+- Async Tavily client on an httpx client over the shared transport, compared
+  with one private httpx client per researcher that is closed when the
+  researcher finishes (the behaviour without the shared pool)
+- Sync Tavily client on the shared requests session
+- OpenAI chat model with the transport params from the registry, when
+  langchain-openai is installed
+
+Gemini models do not use the shared transport (see transport.py) and are not
+measured. No API keys or network access are needed.
+
+Usage:
+    uv run python benchmarks/bench_transport.py --researchers 6 --rounds 5 --waves 3 --json bench_transport.json
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from deep_research_from_scratch.transport import (
+    chat_model_transport_params,
+    get_async_http_client,
+    get_requests_session,
+)
+
+# Searches each researcher issues at once (one tool call's query fan-out)
+SEARCHES_PER_ROUND = 3
+
+# Simulated server latency, so concurrent requests overlap
+SERVER_LATENCY_SECONDS = 0.02
+
+SEARCH_RESPONSE = json.dumps({
+    "query": "benchmark",
+    "results": [{"url": "https://example.com/a", "title": "A", "content": "text", "raw_content": "text " * 200, "score": 0.9}],
+}).encode("utf-8")
+
+CHAT_RESPONSE = json.dumps({
+    "id": "chatcmpl-bench",
+    "object": "chat.completion",
+    "created": 0,
+    "model": "gpt-4.1",
+    "choices": [{"index": 0, "message": {"role": "assistant", "content": "ok"}, "finish_reason": "stop"}],
+    "usage": {"prompt_tokens": 1, "completion_tokens": 1, "total_tokens": 2},
+}).encode("utf-8")
+
+class CountingServer(ThreadingHTTPServer):
+    """Local HTTP/1.1 server counting the connections and requests it serves."""
+
+    daemon_threads = True
+    # Concurrent researchers open many connections at once
+    request_queue_size = 256
+
+    def __init__(self):
+        """Listen on a free local port."""
+        super().__init__(("127.0.0.1", 0), CountingHandler)
+        self.connections = 0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def reset(self) -> None:
+        """Zero the counters."""
+        with self.lock:
+            self.connections = self.requests = 0
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Keep-alive handler answering Tavily search and OpenAI chat requests."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        """Count a new connection (one handler instance serves one connection)."""
+        super().setup()
+        with self.server.lock:
+            self.server.connections += 1
+
+    def do_POST(self):
+        """Answer a request after the simulated latency."""
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.server.lock:
+            self.server.requests += 1
+        time.sleep(SERVER_LATENCY_SECONDS)
+        body = CHAT_RESPONSE if self.path.endswith("/chat/completions") else SEARCH_RESPONSE
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Keep the benchmark output quiet."""
+
+def measure(server: CountingServer, name: str, run) -> dict:
+    """Run one scenario and return the server-side connection counts."""
+    server.reset()
+    start = time.perf_counter()
+    run()
+    elapsed = time.perf_counter() - start
+    reused = max(server.requests - server.connections, 0)
+    return {
+        "client": name,
+        "requests": server.requests,
+        "connections": server.connections,
+        "reuse_ratio": reused / server.requests if server.requests else 0.0,
+        "seconds": elapsed,
+    }
+
+def run_async_tavily(url: str, researchers: int, rounds: int, waves: int, shared: bool) -> None:
+    """Waves of concurrent researchers searching through the async Tavily client."""
+    from tavily import AsyncTavilyClient
+
+    async def main():
+        shared_client = AsyncTavilyClient(api_key="bench", api_base_url=url, client=get_async_http_client()) if shared else None
+
+        async def researcher():
+            if shared_client is not None:
+                return await search_rounds(shared_client)
+            async with httpx.AsyncClient() as http_client:
+                await search_rounds(AsyncTavilyClient(api_key="bench", api_base_url=url, client=http_client))
+
+        async def search_rounds(client):
+            for _ in range(rounds):
+                await asyncio.gather(*(client.search("benchmark") for _ in range(SEARCHES_PER_ROUND)))
+
+        for _ in range(waves):
+            await asyncio.gather(*(researcher() for _ in range(researchers)))
+
+    asyncio.run(main())
+
+def run_sync_tavily(url: str, researchers: int, rounds: int, waves: int) -> None:
+    """Waves of concurrent researchers searching through the sync Tavily client in threads."""
+    from tavily import TavilyClient
+
+    client = TavilyClient(api_key="bench", api_base_url=url, session=get_requests_session())
+    with ThreadPoolExecutor(max_workers=researchers) as executor:
+        for _ in range(waves):
+            list(executor.map(lambda _: client.search("benchmark"), range(researchers * rounds * SEARCHES_PER_ROUND)))
+
+def run_openai(url: str, researchers: int, rounds: int, waves: int) -> None:
+    """Waves of concurrent researchers calling an OpenAI model built with the registry's transport params."""
+    from langchain.chat_models import init_chat_model
+
+    model = init_chat_model(model="gpt-4.1", model_provider="openai", api_key="bench", base_url=url, **chat_model_transport_params("openai"))
+
+    async def main():
+        async def researcher():
+            for _ in range(rounds):
+                await model.ainvoke("ping")
+
+        for _ in range(waves):
+            await asyncio.gather(*(researcher() for _ in range(researchers)))
+
+    asyncio.run(main())
+
+def main() -> None:
+    """Run every scenario and print (and optionally save) the connection counts."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--researchers", type=int, default=6, help="concurrent researchers")
+    parser.add_argument("--rounds", type=int, default=5, help="tool rounds per researcher")
+    parser.add_argument("--waves", type=int, default=3, help="consecutive waves of researchers")
+    parser.add_argument("--json", help="optional path to write results as JSON")
+    args = parser.parse_args()
+
+    # Import the SDK up front so the first scenario's timing excludes it
+    import tavily  # noqa: F401
+
+    server = CountingServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    scenarios = [
+        ("async tavily, shared transport", lambda: run_async_tavily(server.url, args.researchers, args.rounds, args.waves, shared=True)),
+        ("async tavily, client per researcher", lambda: run_async_tavily(server.url, args.researchers, args.rounds, args.waves, shared=False)),
+        ("sync tavily, shared session", lambda: run_sync_tavily(server.url, args.researchers, args.rounds, args.waves)),
+    ]
+    try:
+        import langchain_openai  # noqa: F401
+        scenarios.append(("openai chat model, shared transport", lambda: run_openai(server.url, args.researchers, args.rounds, args.waves)))
+    except ImportError:
+        print("langchain-openai is not installed; skipping the OpenAI scenario")
+
+    results = [measure(server, name, run) for name, run in scenarios]
+    server.shutdown()
+
+    for result in results:
+        print(f"{result['client']}: {result['requests']} requests over {result['connections']} connections "
+              f"(reuse {result['reuse_ratio']:.0%}) in {result['seconds']:.2f}s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
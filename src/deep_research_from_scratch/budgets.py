@@ -0,0 +1,78 @@
+"""Researcher Budget Enforcement.
+
+This module enforces per-researcher limits so a single researcher cannot loop
+without bound and hold up the supervisor. Three budgets are tracked in
+``ResearcherState``:
+- Tool call iterations (rounds of tool execution)
+- A wall-clock deadline, fixed on the researcher's first model call
+- Tokens consumed by the researcher's model calls (from usage metadata)
+
+When any budget runs out, the researcher routes straight to compress_research
+with the findings gathered so far, and the reason is recorded on the current
+trace span as ``budget_stop``.
+"""
+
+import time
+
+from langchain_core.messages import AIMessage, BaseMessage
+from typing_extensions import List, Optional, Sequence
+
+from deep_research_from_scratch.state_research import ResearchBudget, ResearcherState
+from deep_research_from_scratch.tracing import current_span
+
+# ===== CONFIGURATION =====
+
+# Default limits, overridable per ConductResearch call via research_budget
+default_research_budget: ResearchBudget = {
+    "max_tool_call_iterations": 8,
+    "max_seconds": 600.0,
+    "max_tokens": 400_000,
+}
+
+# ===== BUDGET ACCOUNTING =====
+
+def get_budget(state: ResearcherState) -> ResearchBudget:
+    """Return the researcher's budget with defaults filled in."""
+    return {**default_research_budget, **(state.get("research_budget") or {})}
+
+def start_budget(state: ResearcherState) -> dict:
+    """State update fixing the wall-clock deadline on the first model call."""
+    if state.get("research_deadline"):
+        return {}
+    return {"research_deadline": time.time() + get_budget(state)["max_seconds"]}
+
+def count_tokens_used(state: ResearcherState, response: AIMessage) -> dict:
+    """State update adding a model response's token usage to tokens_used."""
+    usage = response.usage_metadata or {}
+    return {"tokens_used": state.get("tokens_used", 0) + usage.get("total_tokens", 0)}
+
+def budget_exhausted(state: ResearcherState) -> Optional[str]:
+    """Return a description of the first exhausted budget, or None if all remain."""
+    budget = get_budget(state)
+
+    if state.get("tool_call_iterations", 0) >= budget["max_tool_call_iterations"]:
+        return f"tool call iteration limit ({budget['max_tool_call_iterations']}) reached"
+    deadline = state.get("research_deadline")
+    if deadline and time.time() >= deadline:
+        return f"time limit ({budget['max_seconds']:g}s) reached"
+    if state.get("tokens_used", 0) >= budget["max_tokens"]:
+        return f"token limit ({budget['max_tokens']}) reached"
+    return None
+
+def budget_stop(state: ResearcherState) -> Optional[str]:
+    """Return why the researcher must stop (see budget_exhausted), recording it on the current span."""
+    reason = budget_exhausted(state)
+    if reason and (span := current_span()) is not None:
+        span.set(budget_stop=reason)
+    return reason
+
+def drop_unanswered_tool_calls(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Drop a trailing AI message whose tool calls were never executed.
+
+    When a budget stops the researcher right after the model requested tools,
+    the dangling tool calls would make the compression request invalid.
+    """
+    messages = list(messages)
+    if messages and isinstance(messages[-1], AIMessage) and messages[-1].tool_calls:
+        return messages[:-1]
+    return messages
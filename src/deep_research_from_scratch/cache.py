@@ -0,0 +1,333 @@
+"""Persistent Caches for Research Utilities.
+
+This module provides on-disk caches that let repeated work across researchers,
+supervisor iterations and separate runs be served without new API calls:
+- A content-addressed webpage summary cache backed by SQLite
+- A Tavily search-result cache backed by JSON files, with per-topic TTLs,
+  in-flight request coalescing and an offline replay mode for tests
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from typing_extensions import Awaitable, Callable, Optional
+
+# ===== CONFIGURATION =====
+
+# Root directory for all on-disk caches (override with DEEP_RESEARCH_CACHE_DIR);
+# read it through get_cache_dir(), which accounts for the provider mode
+cache_dir = Path(os.environ.get("DEEP_RESEARCH_CACHE_DIR", Path.home() / ".cache" / "deep_research_from_scratch"))
+
+# Set DEEP_RESEARCH_CACHE_DISABLED=1 to bypass all caches
+cache_enabled = os.environ.get("DEEP_RESEARCH_CACHE_DISABLED", "").lower() not in ("1", "true", "yes")
+
+# Summary cache limits: entries expire after the TTL, and least recently used
+# entries are evicted once either the entry or the byte cap is exceeded
+summary_cache_ttl_seconds = 30 * 24 * 3600
+summary_cache_max_entries = 20_000
+summary_cache_max_bytes = 200 * 1024 * 1024
+
+# Search cache TTLs per Tavily topic; time-sensitive topics expire quickly
+search_cache_ttl_seconds = {
+    "general": 6 * 3600,
+    "news": 15 * 60,
+    "finance": 5 * 60,
+}
+
+# Search cache mode (override with DEEP_RESEARCH_SEARCH_CACHE_MODE):
+# "readwrite" serves fresh entries and records new responses,
+# "replay" serves recorded entries regardless of age and never hits the network,
+# "record" always fetches and overwrites recorded entries
+search_cache_mode = os.environ.get("DEEP_RESEARCH_SEARCH_CACHE_MODE", "readwrite")
+
+def get_cache_dir() -> Path:
+    """Directory the on-disk caches use for the current provider mode.
+
+    The offline stand-ins (provider mode "fake") get their own subdirectory,
+    so fake summaries and search results never mix with real ones.
+    """
+    # Deferred: the model registry imports modules that import this one
+    from deep_research_from_scratch import models
+
+    return cache_dir / "fake" if models.provider_mode == "fake" else cache_dir
+
+# ===== KEY HELPERS =====
+
+def normalize_content(content: str) -> str:
+    """Normalize page content so trivially different copies share a cache key."""
+    return re.sub(r"\s+", " ", content).strip()
+
+def content_hash(*parts: str) -> str:
+    """Return a stable SHA-256 hex digest over one or more string parts."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+def get_model_id(model) -> str:
+    """Best-effort identifier for a chat model, used to scope cached outputs."""
+    for attr in ("model", "model_name"):
+        value = getattr(model, attr, None)
+        if isinstance(value, str) and value:
+            return value
+    return type(model).__name__
+
+# ===== SUMMARY CACHE =====
+
+class SummaryCache:
+    """SQLite-backed cache of formatted webpage summaries.
+
+    Keys are content addresses built from the normalized raw page content, the
+    summarization model id and the summarization prompt version, so editing
+    the prompt or switching models never serves stale summaries. Entries are
+    evicted by TTL and then least-recently-used order when the entry or byte
+    cap is exceeded. Hit/miss counters are kept per process in ``stats``.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl_seconds: float = summary_cache_ttl_seconds,
+        max_entries: int = summary_cache_max_entries,
+        max_bytes: int = summary_cache_max_bytes,
+    ):
+        """Open (or create) the summary cache database at path."""
+        self.path = Path(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "evictions": 0, "expirations": 0}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " key TEXT PRIMARY KEY,"
+            " value TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS summaries_accessed ON summaries (accessed_at)")
+
+    @staticmethod
+    def make_key(raw_content: str, model_id: str, prompt_version: str, selection: str = "") -> str:
+        """Build the content address for a page summary.
+
+        selection identifies how the summarized text was picked from raw_content
+        (e.g. the query and token budget), since long pages are summarized from
+        a query-dependent excerpt.
+        """
+        return content_hash(normalize_content(raw_content), model_id, prompt_version, selection)
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached summary for key, or None on a miss or expired entry."""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM summaries WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.stats["misses"] += 1
+                return None
+
+            value, created_at = row
+            if now - created_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM summaries WHERE key = ?", (key,))
+                self.stats["expirations"] += 1
+                self.stats["misses"] += 1
+                return None
+
+            self._conn.execute("UPDATE summaries SET accessed_at = ? WHERE key = ?", (now, key))
+            self.stats["hits"] += 1
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        """Store a summary and evict entries beyond the configured caps."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO summaries (key, value, size, created_at, accessed_at)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (key, value, len(value.encode("utf-8")), now, now),
+            )
+            self.stats["writes"] += 1
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under the caps."""
+        expired = self._conn.execute(
+            "DELETE FROM summaries WHERE created_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.stats["expirations"] += max(expired, 0)
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM summaries"
+        ).fetchone()
+
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM summaries ORDER BY accessed_at ASC")
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+
+        self._conn.executemany("DELETE FROM summaries WHERE key = ?", victims)
+        self.stats["evictions"] += len(victims)
+
+    def clear(self) -> None:
+        """Remove every cached summary."""
+        with self._lock:
+            self._conn.execute("DELETE FROM summaries")
+
+    def __len__(self) -> int:
+        """Return the number of cached summaries."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
+
+# ===== SEARCH CACHE =====
+
+class SearchCacheMiss(LookupError):
+    """Raised in replay mode when a query has no recorded response."""
+
+class SearchCache:
+    """File-backed cache of raw Tavily responses with in-flight coalescing.
+
+    Each entry is one JSON file named by the hash of (normalized query,
+    max_results, topic, include_raw_content), so a directory of recorded
+    responses can be committed and replayed offline. Concurrent identical
+    queries share a single in-flight request instead of each calling Tavily.
+    """
+
+    def __init__(self, directory: Path, mode: str = search_cache_mode, ttl_seconds: Optional[dict] = None):
+        """Use directory as the backing store, creating it if needed."""
+        if mode not in ("readwrite", "replay", "record"):
+            raise ValueError(f"Unknown search cache mode: {mode}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.ttl_seconds = {**search_cache_ttl_seconds, **(ttl_seconds or {})}
+        self.stats = {"hits": 0, "misses": 0, "writes": 0, "expirations": 0, "coalesced": 0}
+        self._inflight: dict[str, asyncio.Task] = {}
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(query: str, max_results: int, topic: str, include_raw_content: bool) -> str:
+        """Build the cache key for a search request."""
+        normalized_query = normalize_content(query).lower()
+        return content_hash(normalized_query, str(max_results), topic, str(bool(include_raw_content)))
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str, topic: str) -> Optional[dict]:
+        """Return the cached response for key, or None if missing or expired."""
+        if self.mode == "record":
+            self.stats["misses"] += 1
+            return None
+
+        try:
+            entry = json.loads(self._path(key).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.stats["misses"] += 1
+            return None
+
+        # Replay serves recordings regardless of age
+        ttl = self.ttl_seconds.get(topic, self.ttl_seconds["general"])
+        if self.mode != "replay" and time.time() - entry["stored_at"] > ttl:
+            self.stats["expirations"] += 1
+            self.stats["misses"] += 1
+            return None
+
+        self.stats["hits"] += 1
+        return entry["response"]
+
+    def put(self, key: str, topic: str, query: str, response: dict) -> None:
+        """Record a response; failed responses are never stored."""
+        if self.mode == "replay" or response.get("error"):
+            return
+        entry = {"stored_at": time.time(), "query": query, "topic": topic, "response": response}
+
+        # Write atomically so concurrent readers never see a partial file
+        tmp_path = self._path(key).with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(json.dumps(entry), encoding="utf-8")
+        os.replace(tmp_path, self._path(key))
+        self.stats["writes"] += 1
+
+    async def aget_or_fetch(
+        self,
+        key: str,
+        topic: str,
+        query: str,
+        fetch: Callable[[], Awaitable[dict]],
+    ) -> dict:
+        """Return the cached response, or fetch it once for all concurrent callers.
+
+        Raises:
+            SearchCacheMiss: In replay mode when no recording exists for key
+        """
+        # File reads and writes run in a worker thread so the event loop never blocks
+        cached = await asyncio.to_thread(self.get, key, topic)
+        if cached is not None:
+            return cached
+        if self.mode == "replay":
+            raise SearchCacheMiss(f"No recorded search response for query '{query}'")
+
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.stats["coalesced"] += 1
+        else:
+            async def fetch_and_store() -> dict:
+                response = await fetch()
+                await asyncio.to_thread(self.put, key, topic, query, response)
+                return response
+
+            task = asyncio.ensure_future(fetch_and_store())
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+
+        # Shield so one caller's cancellation does not cancel the shared request
+        return await asyncio.shield(task)
+
+# Global cache instances - will be initialized lazily
+_summary_cache = None
+_search_cache = None
+
+def get_summary_cache() -> Optional[SummaryCache]:
+    """Get or initialize the summary cache lazily; None when caching is disabled.
+
+    The cache is reopened when the cache directory changes (e.g. after
+    switching to the fake providers).
+    """
+    global _summary_cache
+    if not cache_enabled:
+        return None
+    path = get_cache_dir() / "summaries.sqlite"
+    if _summary_cache is None or _summary_cache.path != path:
+        _summary_cache = SummaryCache(path)
+    return _summary_cache
+
+def get_search_cache() -> Optional[SearchCache]:
+    """Get or initialize the search cache lazily; None when caching is disabled."""
+    global _search_cache
+    if not cache_enabled:
+        return None
+    directory = get_cache_dir() / "search"
+    if _search_cache is None or _search_cache.directory != directory:
+        _search_cache = SearchCache(directory)
+    return _search_cache
@@ -0,0 +1,176 @@
+"""Compact Checkpoint Serialization.
+
+Every super-step of the research graphs checkpoints the full channel values,
+and the message channels hold multi-KB ToolMessages that are re-serialized
+unchanged at every step. This module provides a serializer that keeps
+checkpoints small:
+
+- Large strings (message contents, research notes, reports) are moved to the
+  content-addressed note store and replaced by a short marker, so content
+  repeated across checkpoints is written once and each new checkpoint of a
+  message list only adds the bodies of its new messages
+- The remaining payload is compressed with zstd (zlib when the zstandard
+  package is unavailable)
+
+Savers already write only the channels that changed at each step; together
+with content offloading this makes each checkpoint a delta over the previous
+ones. Payloads written by the plain serializer are still readable.
+
+Use ``get_checkpointer()`` when compiling a graph for notebook or script runs.
+For a persistent deployment, point DEEP_RESEARCH_CACHE_DIR at the same volume
+as the checkpoints so the offloaded contents are kept alongside them.
+"""
+
+import threading
+import zlib
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.serde.base import SerializerProtocol
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from typing_extensions import Any, Optional, Tuple
+
+from deep_research_from_scratch.cache import content_hash
+from deep_research_from_scratch.note_store import (
+    NoteStore,
+    get_note_store,
+    raw_note_ref_prefix,
+)
+
+try:
+    import zstandard
+except ImportError:  # Optional: fall back to zlib
+    zstandard = None
+
+# ===== CONFIGURATION =====
+
+# Strings at least this long are offloaded to the note store
+offload_min_chars = 2_048
+
+# Compression level for checkpoint payloads
+zstd_level = 3
+zlib_level = 6
+
+# Number of offloaded content references remembered as already stored
+known_refs_limit = 50_000
+
+# Marks an offloaded string inside a serialized checkpoint
+_MARKER = "\x00ckpt:"
+
+# ===== SERIALIZER =====
+
+class CompactSerializer(SerializerProtocol):
+    """Serializer that offloads large strings and compresses the rest."""
+
+    def __init__(self, note_store: Optional[NoteStore] = None, inner: Optional[SerializerProtocol] = None):
+        """Wrap inner (JsonPlusSerializer by default), offloading to note_store."""
+        self.inner = inner or JsonPlusSerializer()
+        self._note_store = note_store
+        self._known = set()
+        self._lock = threading.Lock()
+        self.stats = {"payloads": 0, "raw_bytes": 0, "written_bytes": 0, "offloaded": 0, "offload_reused": 0}
+
+    @property
+    def note_store(self) -> NoteStore:
+        """Store holding offloaded contents (the shared raw note store by default)."""
+        if self._note_store is None:
+            self._note_store = get_note_store()
+        return self._note_store
+
+    # ----- offloading -----
+
+    def _offload_text(self, text: str) -> str:
+        if len(text) < offload_min_chars or text.startswith(_MARKER):
+            return text
+
+        # Same address as NoteStore.put, so known contents skip the database entirely
+        key = content_hash(text)
+        with self._lock:
+            known = key in self._known
+        if known:
+            self.stats["offload_reused"] += 1
+        else:
+            self.note_store.put(text)
+            self.stats["offloaded"] += 1
+            with self._lock:
+                if len(self._known) >= known_refs_limit:
+                    self._known.clear()
+                self._known.add(key)
+        return _MARKER + key
+
+    def _offload(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self._offload_text(value)
+        if isinstance(value, BaseMessage):
+            if isinstance(value.content, str) and len(value.content) >= offload_min_chars:
+                return value.model_copy(update={"content": self._offload_text(value.content)})
+            return value
+        if isinstance(value, dict):
+            return {key: self._offload(item) for key, item in value.items()}
+        if isinstance(value, list | tuple):
+            return type(value)(self._offload(item) for item in value)
+        return value
+
+    def _restore_text(self, text: str) -> str:
+        if not text.startswith(_MARKER):
+            return text
+        ref = raw_note_ref_prefix + text[len(_MARKER):]
+        restored = self.note_store.get(ref)
+        return restored if restored is not None else f"[Checkpointed content {ref} is no longer available]"
+
+    def _restore(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self._restore_text(value)
+        if isinstance(value, BaseMessage):
+            if isinstance(value.content, str) and value.content.startswith(_MARKER):
+                return value.model_copy(update={"content": self._restore_text(value.content)})
+            return value
+        if isinstance(value, dict):
+            return {key: self._restore(item) for key, item in value.items()}
+        if isinstance(value, list | tuple):
+            return type(value)(self._restore(item) for item in value)
+        return value
+
+    # ----- compression -----
+
+    @staticmethod
+    def _compress(data: bytes) -> Tuple[str, bytes]:
+        if zstandard is not None:
+            return "zstd", zstandard.ZstdCompressor(level=zstd_level).compress(data)
+        return "zlib", zlib.compress(data, zlib_level)
+
+    @staticmethod
+    def _decompress(codec: str, data: bytes) -> bytes:
+        if codec == "zstd":
+            if zstandard is None:
+                raise RuntimeError("Checkpoint was written with zstd; install the zstandard package to read it")
+            return zstandard.ZstdDecompressor().decompress(data)
+        if codec == "zlib":
+            return zlib.decompress(data)
+        raise ValueError(f"Unknown checkpoint codec: {codec}")
+
+    # ----- SerializerProtocol -----
+
+    def dumps_typed(self, obj: Any) -> Tuple[str, bytes]:
+        """Serialize obj with large strings offloaded, then compress it."""
+        type_, data = self.inner.dumps_typed(self._offload(obj))
+        codec, compressed = self._compress(data)
+        self.stats["payloads"] += 1
+        self.stats["raw_bytes"] += len(data)
+        self.stats["written_bytes"] += len(compressed)
+        return f"{type_}+{codec}", compressed
+
+    def loads_typed(self, data: Tuple[str, bytes]) -> Any:
+        """Decompress and deserialize a payload, restoring offloaded strings."""
+        type_, payload = data
+        inner_type, _, codec = type_.partition("+")
+        if not codec:
+            # Written by the plain serializer
+            return self.inner.loads_typed(data)
+        return self._restore(self.inner.loads_typed((inner_type, self._decompress(codec, payload))))
+
+# ===== CHECKPOINTER =====
+
+def get_checkpointer() -> InMemorySaver:
+    """Return an in-memory checkpointer using the compact serializer."""
+    return InMemorySaver(serde=CompactSerializer())
@@ -0,0 +1,210 @@
+"""Relevance-Ranked Content Selection Before Summarization.
+
+Tavily's raw_content can be a whole page dump of hundreds of KB, most of it
+navigation, cookie banners and unrelated sections. Sending all of it to the
+summarization model is slow and expensive. This module trims a page to the
+parts that matter for the research query:
+
+1. Boilerplate is stripped (HTML tags, scripts, link-only lines, short
+   cookie/newsletter/sign-in lines, repeated lines)
+2. The remaining text is split into paragraph-aligned chunks
+3. Chunks are scored against the query with a local BM25 ranker
+4. The best chunks that fit the token budget are kept, in page order
+
+Pages that already fit the budget are passed through after boilerplate removal.
+"""
+
+import math
+import re
+from collections import Counter
+
+from langchain_core.messages import HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from typing_extensions import List, Optional, Tuple
+
+# ===== CONFIGURATION =====
+
+# Approximate token budget for the page content sent to the summarizer
+summary_input_token_budget = 6_000
+
+# Approximate size of a single chunk in tokens
+chunk_tokens = 300
+
+# BM25 parameters
+bm25_k1 = 1.5
+bm25_b = 0.75
+
+# Short lines containing one of these phrases are treated as page chrome
+boilerplate_phrases = (
+    "cookie", "subscribe", "sign in", "sign up", "log in", "newsletter",
+    "privacy policy", "terms of use", "all rights reserved", "skip to content",
+    "share this", "advertisement", "read more",
+)
+
+# Only lines with at most this many words are checked against boilerplate_phrases
+max_boilerplate_line_words = 12
+
+# Marker placed between non-adjacent selected chunks
+omission_marker = "\n\n[...]\n\n"
+
+_HTML_BLOCK = re.compile(r"<(script|style|noscript|svg|nav|footer|header)\b.*?</\1>", re.IGNORECASE | re.DOTALL)
+_HTML_TAG = re.compile(r"<[^>]+>")
+_MARKDOWN_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_TOKEN = re.compile(r"\w+")
+
+def text_tokens(text: str) -> int:
+    """Approximate token count of a block of text."""
+    return count_tokens_approximately([HumanMessage(content=text)])
+
+# ===== BOILERPLATE REMOVAL =====
+
+def _is_boilerplate_line(line: str) -> bool:
+    """Whether a line looks like navigation, a link list or other page chrome."""
+    text = _MARKDOWN_LINK.sub(r"\1", line).strip(" \t*-|#>")
+    if not text:
+        return True
+    # Lines that were nothing but links
+    if not _MARKDOWN_LINK.sub("", line).strip(" \t*-|#>,"):
+        return True
+    if len(text.split()) > max_boilerplate_line_words:
+        return False
+    lowered = text.lower()
+    return any(phrase in lowered for phrase in boilerplate_phrases)
+
+def strip_boilerplate(content: str) -> str:
+    """Remove markup, menus, link lists and repeated lines from page content."""
+    content = _HTML_BLOCK.sub(" ", content)
+    content = _HTML_TAG.sub(" ", content)
+
+    seen = set()
+    lines = []
+    for line in content.splitlines():
+        line = line.rstrip()
+        key = line.strip().lower()
+        if not key:
+            # Keep paragraph breaks, collapsing runs of blank lines
+            if lines and lines[-1]:
+                lines.append("")
+            continue
+        if key in seen or _is_boilerplate_line(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return "\n".join(lines).strip()
+
+# ===== CHUNKING =====
+
+def chunk_text(content: str, max_tokens: int = chunk_tokens) -> List[str]:
+    """Split content into paragraph-aligned chunks of roughly max_tokens each.
+
+    Paragraphs longer than max_tokens are split on sentence boundaries.
+    """
+    pieces = []
+    for paragraph in re.split(r"\n\s*\n", content):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if text_tokens(paragraph) <= max_tokens:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(s for s in re.split(r"(?<=[.!?])\s+", paragraph) if s)
+
+    chunks, current, current_tokens = [], [], 0
+    for piece in pieces:
+        piece_tokens = text_tokens(piece)
+        if current and current_tokens + piece_tokens > max_tokens:
+            chunks.append("\n\n".join(current))
+            current, current_tokens = [], 0
+        current.append(piece)
+        current_tokens += piece_tokens
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+# ===== BM25 RANKING =====
+
+def terms(text: str) -> List[str]:
+    """Lowercased word terms of text, as used for BM25 scoring."""
+    return _TOKEN.findall(text.lower())
+
+def bm25_scores(query: str, chunks: List[str]) -> List[float]:
+    """Score each chunk against the query with Okapi BM25."""
+    query_terms = set(terms(query))
+    documents = [Counter(terms(chunk)) for chunk in chunks]
+    if not query_terms or not documents:
+        return [0.0] * len(chunks)
+
+    lengths = [sum(document.values()) for document in documents]
+    average_length = sum(lengths) / len(lengths) or 1.0
+    document_frequency = {term: sum(1 for document in documents if term in document) for term in query_terms}
+
+    scores = []
+    for document, length in zip(documents, lengths):
+        score = 0.0
+        for term in query_terms:
+            frequency = document.get(term, 0)
+            if not frequency:
+                continue
+            idf = math.log(1 + (len(documents) - document_frequency[term] + 0.5) / (document_frequency[term] + 0.5))
+            score += idf * frequency * (bm25_k1 + 1) / (frequency + bm25_k1 * (1 - bm25_b + bm25_b * length / average_length))
+        scores.append(score)
+    return scores
+
+# ===== SELECTION =====
+
+def select_relevant_content(
+    content: str,
+    query: Optional[str],
+    token_budget: int = summary_input_token_budget,
+) -> str:
+    """Reduce page content to the chunks most relevant to query within token_budget.
+
+    Args:
+        content: Raw page content
+        query: Research query the page was found for; without one, the start of the page is kept
+        token_budget: Approximate token budget for the returned text
+
+    Returns:
+        Selected content with boilerplate removed, chunks in their original order
+    """
+    return trim_to_relevant_content(content, query, token_budget)[0]
+
+def trim_to_relevant_content(
+    content: str,
+    query: Optional[str],
+    token_budget: int = summary_input_token_budget,
+) -> Tuple[str, bool]:
+    """Select content like select_relevant_content, also reporting whether it was trimmed.
+
+    Returns:
+        Tuple of the selected content and whether chunks were dropped to fit
+        token_budget (False when only boilerplate was removed)
+    """
+    cleaned = strip_boilerplate(content) or content
+    if text_tokens(cleaned) <= token_budget:
+        return cleaned, False
+
+    chunks = chunk_text(cleaned)
+    scores = bm25_scores(query or "", chunks)
+    # Highest score first; earlier chunks win ties so query-less pages keep their opening
+    ranked = sorted(range(len(chunks)), key=lambda i: (-scores[i], i))
+
+    selected, used = [], 0
+    for i in ranked:
+        chunk_size = text_tokens(chunks[i])
+        if used + chunk_size > token_budget:
+            continue
+        selected.append(i)
+        used += chunk_size
+
+    if not selected:
+        # Only oversized chunks (e.g. one huge unpunctuated block): keep the start of the best one
+        return chunks[ranked[0]][: token_budget * 4], True
+
+    selected.sort()
+    output = ""
+    for position, i in enumerate(selected):
+        if position:
+            output += "\n\n" if i == selected[position - 1] + 1 else omission_marker
+        output += chunks[i]
+    return output, True
@@ -0,0 +1,142 @@
+"""Token-Budgeted Context Compaction for Researcher Loops.
+
+Every researcher turn resends the whole ``researcher_messages`` history, and
+search results are multi-KB ToolMessages, so the prompt grows on every loop
+iteration. This module keeps it bounded:
+
+1. Each message's size is estimated with an approximate token counter
+2. Once the history exceeds the token budget, the oldest tool outputs (outside
+   the most recent ones) are replaced in place by short digests
+3. The original text of each compacted output is put in the raw note store,
+   its reference is appended to ``raw_notes`` and the digest keeps the index
+   of that entry, so compression can restore the full text
+"""
+
+import re
+
+from langchain_core.messages import BaseMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from typing_extensions import List, Sequence, Tuple
+
+from deep_research_from_scratch.note_store import get_note, put_note
+from deep_research_from_scratch.state_research import ResearcherState
+
+# ===== CONFIGURATION =====
+
+# Approximate token budget for the researcher message history
+context_token_budget = 40_000
+
+# Number of most recent tool outputs that are never compacted
+keep_recent_tool_messages = 4
+
+# Characters of the original output kept at the start of a digest
+digest_chars = 400
+
+# Maximum number of source URLs listed in a digest
+digest_max_urls = 8
+
+_URL_PATTERN = re.compile(r"https?://[^\s<>\"')\]]+")
+
+# ===== TOKEN ACCOUNTING =====
+
+def message_tokens(message: BaseMessage) -> int:
+    """Approximate token count of a single message."""
+    return count_tokens_approximately([message])
+
+def is_compacted(message: BaseMessage) -> bool:
+    """Whether a message has already been replaced by a digest."""
+    return bool(message.response_metadata.get("compacted"))
+
+# ===== COMPACTION =====
+
+def make_digest(content: str, raw_note_index: int) -> str:
+    """Build a compact digest of a tool output that points at its raw note."""
+    urls = list(dict.fromkeys(_URL_PATTERN.findall(content)))[:digest_max_urls]
+    head = content[:digest_chars].strip()
+
+    digest = f"[Compacted tool output, full text kept as raw note #{raw_note_index}]\n{head}"
+    if len(content) > digest_chars:
+        digest += " ..."
+    if urls:
+        digest += "\nSources: " + ", ".join(urls)
+    return digest
+
+def compact_messages(
+    messages: Sequence[BaseMessage],
+    raw_note_offset: int,
+    budget: int = context_token_budget,
+    keep_recent: int = keep_recent_tool_messages,
+) -> Tuple[List[ToolMessage], List[str]]:
+    """Compact the oldest tool outputs until the history fits the token budget.
+
+    Args:
+        messages: Current researcher message history
+        raw_note_offset: Number of raw notes already in state, used to index new ones
+        budget: Approximate token budget for the whole history
+        keep_recent: Number of most recent tool outputs to leave untouched
+
+    Returns:
+        Tuple of (replacement ToolMessages with the same ids, raw notes holding
+        the original text); both empty if the history is within budget
+    """
+    token_counts = [message_tokens(message) for message in messages]
+    total = sum(token_counts)
+    if total <= budget:
+        return [], []
+
+    tool_positions = [
+        i for i, message in enumerate(messages)
+        if isinstance(message, ToolMessage) and not is_compacted(message)
+    ]
+    candidates = tool_positions[:-keep_recent] if keep_recent else tool_positions
+
+    replacements, raw_notes = [], []
+    for i in candidates:
+        if total <= budget:
+            break
+        message = messages[i]
+        content = str(message.content)
+        raw_note_index = raw_note_offset + len(raw_notes)
+
+        compacted = ToolMessage(
+            id=message.id,
+            content=make_digest(content, raw_note_index),
+            name=message.name,
+            tool_call_id=message.tool_call_id,
+            status=message.status,
+            response_metadata={"compacted": True, "raw_note_index": raw_note_index},
+        )
+        total += message_tokens(compacted) - token_counts[i]
+        replacements.append(compacted)
+        raw_notes.append(content)
+
+    return replacements, raw_notes
+
+def restore_compacted(messages: Sequence[BaseMessage], raw_notes: Sequence[str]) -> List[BaseMessage]:
+    """Return the history with compacted tool outputs restored to their original text."""
+    restored = []
+    for message in messages:
+        index = message.response_metadata.get("raw_note_index") if is_compacted(message) else None
+        if index is not None and index < len(raw_notes):
+            message = message.model_copy(update={"content": get_note(raw_notes[index])})
+        restored.append(message)
+    return restored
+
+# ===== GRAPH NODE =====
+
+def compact_context(state: ResearcherState) -> dict:
+    """Compact the researcher history after tool execution when it exceeds the budget.
+
+    Shared by the web and MCP researcher graphs; runs between tool_node and
+    llm_call so the next model call sees the compacted history.
+    """
+    replacements, raw_notes = compact_messages(
+        state.get("researcher_messages", []),
+        raw_note_offset=len(state.get("raw_notes", [])),
+    )
+    if not replacements:
+        return {}
+
+    # Messages with existing ids replace the originals in place via add_messages
+    # Only references to the stored originals are kept in state
+    return {"researcher_messages": replacements, "raw_notes": [put_note(note) for note in raw_notes]}
@@ -0,0 +1,460 @@
+"""Offline Model and Search Stand-Ins.
+
+Benchmarking the research graphs against live Gemini and Tavily costs money
+and gives noisy latencies. This module provides deterministic stand-ins that
+the model registry hands out instead of the real providers when
+``DEEP_RESEARCH_PROVIDERS=fake`` is set (or after ``use_fake_providers()``):
+
+- ``FakeChatModel`` plays every model role. It recognizes its role from the
+  tools bound to it (supervisor, web researcher, MCP researcher, structured
+  output) and replays a script of tool calls, falling back to a default
+  policy that delegates, searches, reflects and finishes like the real
+  agents. Plain calls get deterministic text built from the prompt, with
+  citations for any URLs in it, so compression and report writing work.
+- ``FakeTavilyClient``/``AsyncFakeTavilyClient`` serve results from a
+  recorded corpus (search cache recordings, Tavily responses or plain lists
+  of documents), ranked with BM25, or synthesize deterministic pages when no
+  corpus is configured.
+- Both sleep for latencies drawn from a configurable distribution that is
+  seeded per request, so runs are reproducible regardless of scheduling.
+
+Environment configuration:
+    DEEP_RESEARCH_FAKE_SCRIPT: JSON file of scripted turns per role
+    DEEP_RESEARCH_FAKE_CORPUS: JSON file or directory of recorded search results
+    DEEP_RESEARCH_FAKE_LLM_LATENCY / DEEP_RESEARCH_FAKE_SEARCH_LATENCY:
+        "<median seconds>[,<sigma>[,<distribution>]]", e.g. "0.8,0.4,lognormal"
+
+A script maps a role ("supervisor", "researcher", "mcp_researcher",
+"structured:<SchemaName>" or "text") to a list of turns; turn i answers the
+role's i-th tool round. A turn is {"content": str, "tool_calls": [{"name":
+str, "args": dict}]}; string args may use {topic} and {round}.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import time
+import uuid
+from pathlib import Path
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+from typing_extensions import (
+    Any,
+    AsyncIterator,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+)
+
+from deep_research_from_scratch.content_selection import bm25_scores
+
+# ===== CONFIGURATION =====
+
+def _parse_latency(value: str, default: tuple) -> tuple:
+    parts = [part.strip() for part in value.split(",") if part.strip()] if value else []
+    median = float(parts[0]) if parts else default[0]
+    sigma = float(parts[1]) if len(parts) > 1 else default[1]
+    distribution = parts[2] if len(parts) > 2 else default[2]
+    return median, sigma, distribution
+
+# (median seconds, spread, distribution) for model calls and searches
+fake_llm_latency = _parse_latency(os.environ.get("DEEP_RESEARCH_FAKE_LLM_LATENCY", ""), (0.5, 0.4, "lognormal"))
+fake_search_latency = _parse_latency(os.environ.get("DEEP_RESEARCH_FAKE_SEARCH_LATENCY", ""), (0.3, 0.3, "lognormal"))
+
+fake_script_path = os.environ.get("DEEP_RESEARCH_FAKE_SCRIPT", "")
+fake_corpus_path = os.environ.get("DEEP_RESEARCH_FAKE_CORPUS", "")
+
+# Seed for latencies and synthetic content
+fake_seed = int(os.environ.get("DEEP_RESEARCH_FAKE_SEED", "0"))
+
+# Default policy: research units per supervisor round, and search rounds per researcher
+fake_research_units = 2
+fake_supervisor_rounds = 1
+fake_search_rounds = 2
+
+# Approximate length of generated text and synthetic pages, in words
+fake_output_words = 250
+fake_page_words = 1_500
+
+# ===== LATENCY =====
+
+class LatencyModel:
+    """Latency distribution sampled deterministically per request key.
+
+    Distributions: "fixed" (always median), "lognormal" (median * e^(sigma*N(0,1)))
+    and "uniform" (median +/- sigma).
+    """
+
+    def __init__(self, median: float, sigma: float = 0.0, distribution: str = "lognormal", seed: int = 0):
+        """Create a latency model."""
+        if distribution not in ("fixed", "lognormal", "uniform"):
+            raise ValueError(f"Unknown latency distribution: {distribution}")
+        self.median = median
+        self.sigma = sigma
+        self.distribution = distribution
+        self.seed = seed
+
+    def sample(self, key: str) -> float:
+        """Latency in seconds for the request identified by key."""
+        rng = _rng(self.seed, key)
+        if self.distribution == "fixed" or self.median <= 0:
+            return max(self.median, 0.0)
+        if self.distribution == "uniform":
+            return max(self.median + rng.uniform(-self.sigma, self.sigma), 0.0)
+        return self.median * math.exp(self.sigma * rng.gauss(0.0, 1.0))
+
+def _rng(seed: int, key: str) -> random.Random:
+    digest = hashlib.sha256(f"{seed}\x00{key}".encode()).digest()
+    return random.Random(int.from_bytes(digest[:8], "big"))
+
+# ===== FAKE CHAT MODEL =====
+
+_URL = re.compile(r"https?://[^\s<>\"')\]]+")
+_WORD = re.compile(r"[A-Za-z][A-Za-z'-]+")
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return "".join(block if isinstance(block, str) else block.get("text", "") for block in content)
+
+def _approx_tokens(text: str) -> int:
+    return max(len(text) // 4, 1)
+
+def load_script(path: str) -> Dict[str, list]:
+    """Load a fake-model script from a JSON file ({} when path is empty)."""
+    if not path:
+        return {}
+    return json.loads(Path(path).read_text(encoding="utf-8"))
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model that replays scripted or default tool calls."""
+
+    model: str = "fake"
+    latency_median: float = 0.5
+    latency_sigma: float = 0.4
+    latency_distribution: str = "lognormal"
+    seed: int = 0
+    script: Dict[str, list] = Field(default_factory=dict)
+    output_words: int = fake_output_words
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-research-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], *, tool_choice: Optional[Any] = None, **kwargs: Any):
+        """Bind tools in OpenAI format, as real chat models do."""
+        formatted = [convert_to_openai_tool(tool) for tool in tools]
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        return self.bind(tools=formatted, **kwargs)
+
+    # ----- response policy -----
+
+    @staticmethod
+    def _role(tool_names: List[str], structured: bool) -> str:
+        if structured and len(tool_names) == 1:
+            return f"structured:{tool_names[0]}"
+        if "ConductResearch" in tool_names:
+            return "supervisor"
+        if "tavily_search" in tool_names:
+            return "researcher"
+        if tool_names:
+            return "mcp_researcher"
+        return "text"
+
+    def _respond(self, messages: List[BaseMessage], tools: List[dict], tool_choice: Any) -> AIMessage:
+        schemas = {tool["function"]["name"]: tool["function"].get("parameters", {}) for tool in tools}
+        role = self._role(list(schemas), structured=tool_choice is not None)
+        human = [m for m in messages if isinstance(m, HumanMessage)]
+        topic = " ".join(_text(human[0]).split())[:300] if human else ""
+        rounds = sum(1 for m in messages if isinstance(m, AIMessage) and m.tool_calls)
+
+        turns = self.script.get(role, [])
+        if rounds < len(turns):
+            turn = turns[rounds]
+            tool_calls = [
+                (call["name"], {k: v.format(topic=topic, round=rounds) if isinstance(v, str) else v for k, v in call.get("args", {}).items()})
+                for call in turn.get("tool_calls", [])
+            ]
+            return self._message(turn.get("content", ""), tool_calls, schemas, topic)
+
+        if role.startswith("structured:"):
+            name = role.split(":", 1)[1]
+            return self._message("", [(name, {})], schemas, topic)
+        if role == "supervisor":
+            if rounds < fake_supervisor_rounds:
+                calls = [("think_tool", {"reflection": f"Planning research on: {topic}"})]
+                calls += [("ConductResearch", {"research_topic": f"Angle {i + 1} of: {topic}"}) for i in range(fake_research_units)]
+                return self._message("", calls, schemas, topic)
+            return self._message("", [("ResearchComplete", {})], schemas, topic)
+        if role in ("researcher", "mcp_researcher"):
+            search_tool = "tavily_search" if role == "researcher" else next(
+                (name for name in ("local_search", "search_files") if name in schemas), None
+            )
+            if search_tool and rounds < 2 * fake_search_rounds:
+                if rounds % 2 == 0:
+                    return self._message("", [(search_tool, {"query": f"{topic[:120]} {rounds // 2 + 1}"})], schemas, topic)
+                if "think_tool" in schemas:
+                    return self._message("", [("think_tool", {"reflection": f"Reviewed search round {rounds // 2 + 1}."})], schemas, topic)
+        return self._message(self._generate_text(messages), [], schemas, topic)
+
+    def _message(self, content: str, calls: list, schemas: Dict[str, dict], topic: str) -> AIMessage:
+        tool_calls = [
+            {"name": name, "args": {**self._fill_args(schemas.get(name, {}), topic), **args}, "id": f"call_{uuid.uuid4().hex[:12]}", "type": "tool_call"}
+            for name, args in calls
+        ]
+        return AIMessage(content=content, tool_calls=tool_calls)
+
+    @staticmethod
+    def _fill_args(schema: dict, topic: str) -> dict:
+        """Plausible values for a tool's required arguments."""
+        args = {}
+        properties = schema.get("properties", {})
+        for name in schema.get("required", []):
+            kind = properties.get(name, {}).get("type", "string")
+            if kind == "boolean":
+                args[name] = False
+            elif kind in ("integer", "number"):
+                args[name] = 1
+            elif kind == "array":
+                args[name] = []
+            elif kind == "object":
+                args[name] = {}
+            else:
+                args[name] = f"{name.replace('_', ' ').capitalize()}: {topic}"
+        return args
+
+    def _generate_text(self, messages: List[BaseMessage]) -> str:
+        """Deterministic markdown built from the prompt, citing URLs found in it."""
+        prompt = "\n".join(_text(m) for m in messages)
+        words = _WORD.findall(_URL.sub(" ", prompt)) or ["research"]
+        rng = _rng(self.seed, prompt[-2000:])
+        urls = list(dict.fromkeys(url.rstrip(".,;") for url in _URL.findall(prompt)))[:10]
+
+        sections = []
+        per_section = max(self.output_words // 3, 10)
+        for index in range(3):
+            start = rng.randrange(max(len(words) - per_section, 1))
+            body = " ".join(words[start:start + per_section])
+            citation = f" [{index % len(urls) + 1}]" if urls else ""
+            sections.append(f"## Finding {index + 1}\n\n{body.capitalize()}.{citation}")
+
+        text = "\n\n".join(sections)
+        if urls:
+            text += "\n\n### Sources\n" + "\n".join(f"[{i}] Source {i}: {url}" for i, url in enumerate(urls, 1))
+        return text
+
+    def _result(self, messages: List[BaseMessage], **kwargs: Any) -> AIMessage:
+        message = self._respond(messages, kwargs.get("tools", []), kwargs.get("tool_choice"))
+        input_tokens = sum(_approx_tokens(_text(m)) for m in messages)
+        output_tokens = _approx_tokens(message.content + json.dumps([c["args"] for c in message.tool_calls]))
+        message.usage_metadata = {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens}
+        message.response_metadata = {"model_name": self.model, "finish_reason": "STOP"}
+        return message
+
+    def _latency(self, messages: List[BaseMessage]) -> float:
+        key = "\n".join(_text(m)[-500:] for m in messages[-3:]) + str(len(messages))
+        return LatencyModel(self.latency_median, self.latency_sigma, self.latency_distribution, self.seed).sample(key)
+
+    # ----- BaseChatModel -----
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        time.sleep(self._latency(messages))
+        return ChatResult(generations=[ChatGeneration(message=self._result(messages, **kwargs))])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        await asyncio.sleep(self._latency(messages))
+        return ChatResult(generations=[ChatGeneration(message=self._result(messages, **kwargs))])
+
+    def _chunks(self, message: AIMessage) -> Iterator[ChatGenerationChunk]:
+        if message.tool_calls:
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content=message.content,
+                tool_call_chunks=[
+                    {"name": c["name"], "args": json.dumps(c["args"]), "id": c["id"], "index": i, "type": "tool_call_chunk"}
+                    for i, c in enumerate(message.tool_calls)
+                ],
+                usage_metadata=message.usage_metadata,
+            ))
+            return
+        pieces = re.findall(r"\S+\s*", message.content) or [""]
+        for i in range(0, len(pieces), 20):
+            last = i + 20 >= len(pieces)
+            yield ChatGenerationChunk(message=AIMessageChunk(
+                content="".join(pieces[i:i + 20]),
+                usage_metadata=message.usage_metadata if last else None,
+            ))
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        time.sleep(self._latency(messages))
+        yield from self._chunks(self._result(messages, **kwargs))
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        await asyncio.sleep(self._latency(messages))
+        for chunk in self._chunks(self._result(messages, **kwargs)):
+            yield chunk
+            await asyncio.sleep(0)
+
+# ===== FAKE TAVILY =====
+
+def load_corpus(path: str) -> List[dict]:
+    """Load recorded documents from a JSON file or a directory of JSON files.
+
+    Accepts search cache recordings ({"response": {...}}), Tavily responses
+    ({"results": [...]}) and plain lists of documents. Documents are
+    deduplicated by URL.
+    """
+    if not path:
+        return []
+    root = Path(path)
+    files = sorted(root.rglob("*.json")) if root.is_dir() else [root]
+
+    documents: Dict[str, dict] = {}
+    for file in files:
+        data = json.loads(file.read_text(encoding="utf-8"))
+        for item in data if isinstance(data, list) else [data]:
+            item = item.get("response", item)
+            for document in item.get("results", [item]):
+                if document.get("url"):
+                    documents.setdefault(document["url"], document)
+    return list(documents.values())
+
+class FakeTavilyClient:
+    """Tavily stand-in serving a recorded corpus or synthetic pages."""
+
+    def __init__(self, corpus: Optional[List[dict]] = None, latency: Optional[LatencyModel] = None, seed: int = fake_seed):
+        """Create a client over corpus (synthetic results when empty)."""
+        self.corpus = corpus or []
+        self.latency = latency or LatencyModel(*fake_search_latency, seed=seed)
+        self.seed = seed
+        self.stats = {"searches": 0}
+
+    def _results(self, query: str, max_results: int, include_raw_content: bool) -> dict:
+        self.stats["searches"] += 1
+        if self.corpus:
+            scores = bm25_scores(query, [f"{d.get('title', '')} {d.get('content', '')}" for d in self.corpus])
+            ranked = sorted(range(len(self.corpus)), key=lambda i: (-scores[i], i))[:max_results]
+            results = [{**self.corpus[i], "score": round(scores[i], 4)} for i in ranked]
+        else:
+            results = [self._synthetic_page(query, i) for i in range(max_results)]
+        if not include_raw_content:
+            results = [{**result, "raw_content": None} for result in results]
+        return {"query": query, "results": results, "response_time": 0.0}
+
+    def _synthetic_page(self, query: str, index: int) -> dict:
+        rng = _rng(self.seed, f"{query}\x00{index}")
+        query_words = _WORD.findall(query) or ["topic"]
+        filler = ["analysis", "report", "data", "market", "study", "results", "growth", "users", "quality", "review", "local", "trend"]
+        sentences = []
+        while sum(len(s.split()) for s in sentences) < fake_page_words:
+            length = rng.randint(8, 20)
+            words = [rng.choice(query_words if rng.random() < 0.3 else filler) for _ in range(length)]
+            sentences.append(" ".join(words).capitalize() + ".")
+        paragraphs = [" ".join(sentences[i:i + 5]) for i in range(0, len(sentences), 5)]
+        slug = hashlib.sha256(query.lower().encode("utf-8")).hexdigest()[:10]
+        return {
+            "url": f"https://example.com/{slug}/{index + 1}",
+            "title": f"{' '.join(query_words[:6]).title()} - Source {index + 1}",
+            "content": sentences[0],
+            "raw_content": "\n\n".join(paragraphs),
+            "score": round(1.0 / (index + 1), 4),
+        }
+
+    def search(self, query: str, max_results: int = 5, include_raw_content: bool = False, topic: str = "general", **kwargs: Any) -> dict:
+        """Return a Tavily-shaped response after the sampled latency."""
+        time.sleep(self.latency.sample(f"{query}\x00{max_results}"))
+        return self._results(query, max_results, include_raw_content)
+
+class AsyncFakeTavilyClient(FakeTavilyClient):
+    """Async Tavily stand-in."""
+
+    async def search(self, query: str, max_results: int = 5, include_raw_content: bool = False, topic: str = "general", **kwargs: Any) -> dict:
+        """Return a Tavily-shaped response after the sampled latency."""
+        await asyncio.sleep(self.latency.sample(f"{query}\x00{max_results}"))
+        return self._results(query, max_results, include_raw_content)
+
+# ===== FACTORIES =====
+
+def create_fake_chat_model(model: str, model_provider: str, **params: Any) -> FakeChatModel:
+    """Fake stand-in for the model the registry was asked for."""
+    median, sigma, distribution = fake_llm_latency
+    return FakeChatModel(
+        model=f"fake/{model_provider}/{model}",
+        latency_median=median,
+        latency_sigma=sigma,
+        latency_distribution=distribution,
+        seed=fake_seed,
+        script=load_script(fake_script_path),
+    )
+
+def create_fake_tavily_client(asynchronous: bool = False) -> FakeTavilyClient:
+    """Fake stand-in for the Tavily client."""
+    corpus = load_corpus(fake_corpus_path)
+    latency = LatencyModel(*fake_search_latency, seed=fake_seed)
+    client_class = AsyncFakeTavilyClient if asynchronous else FakeTavilyClient
+    return client_class(corpus, latency, seed=fake_seed)
+
+def use_fake_providers(
+    script: Optional[str] = None,
+    corpus: Optional[str] = None,
+    llm_latency: Optional[tuple] = None,
+    search_latency: Optional[tuple] = None,
+    seed: Optional[int] = None,
+) -> None:
+    """Switch the model registry to the fake providers, optionally reconfiguring them.
+
+    Args:
+        script: Path of a JSON script of turns per role
+        corpus: Path of a recorded corpus file or directory
+        llm_latency: (median seconds, spread, distribution) for model calls
+        search_latency: (median seconds, spread, distribution) for searches
+        seed: Seed for latencies and synthetic content
+    """
+    global fake_script_path, fake_corpus_path, fake_llm_latency, fake_search_latency, fake_seed
+    from deep_research_from_scratch import models
+
+    fake_script_path = script if script is not None else fake_script_path
+    fake_corpus_path = corpus if corpus is not None else fake_corpus_path
+    fake_llm_latency = llm_latency or fake_llm_latency
+    fake_search_latency = search_latency or fake_search_latency
+    fake_seed = seed if seed is not None else fake_seed
+    models.set_provider_mode("fake")
@@ -0,0 +1,280 @@
+"""Memory-Mapped Reader Tools for Large Local Files.
+
+The MCP filesystem server's read_file loads a whole file into one
+ToolMessage, which bloats memory and the prompt for large corpora and needs
+the Node server for every plain read. These native tools read through mmap,
+so only the pages actually touched are loaded, and return bounded windows the
+agent can page through:
+
+- ``read_file_lines``: a range of lines, with the next line to continue from
+- ``read_file_bytes``: a byte range, with the next offset to continue from
+- ``grep_file``: regex matches with byte offsets and line numbers, starting
+  from an offset so long scans can be resumed
+
+Line positions are remembered sparsely per file (every
+``line_checkpoint_interval`` lines), so paging deep into a multi-GB file does
+not rescan it from the start each time. Paths are confined to the research
+files directory.
+"""
+
+import bisect
+import mmap
+import re
+import threading
+from pathlib import Path
+
+from langchain_core.tools import tool
+from typing_extensions import Dict, List, Optional, Tuple
+
+from deep_research_from_scratch.utils import get_current_dir
+
+# ===== CONFIGURATION =====
+
+# Upper bounds on what a single tool call may return
+max_lines_per_read = 400
+max_bytes_per_read = 64 * 1024
+max_grep_matches = 50
+
+# Lines longer than this are cut in tool output
+max_line_chars = 2_000
+
+# Distance in lines between remembered line offsets
+line_checkpoint_interval = 10_000
+
+# Block size used when counting lines up to a byte offset
+count_block_bytes = 1024 * 1024
+
+# ===== PATHS =====
+
+def get_files_root() -> Path:
+    """Directory the reader tools may access."""
+    return (get_current_dir() / "files").resolve()
+
+def resolve_path(path: str) -> Path:
+    """Resolve a path relative to the files directory, refusing paths outside it.
+
+    Raises:
+        ValueError: If the path escapes the files directory or is not a file
+    """
+    root = get_files_root()
+    candidate = Path(path)
+    resolved = (candidate if candidate.is_absolute() else root / candidate).resolve()
+    if resolved != root and root not in resolved.parents:
+        raise ValueError(f"Access denied: {path} is outside {root}")
+    if not resolved.is_file():
+        raise ValueError(f"Not a file: {path}")
+    return resolved
+
+# ===== LINE OFFSETS =====
+
+class LineCheckpoints:
+    """Sparse line-number to byte-offset map for one version of a file."""
+
+    def __init__(self):
+        """Start with line 1 at offset 0."""
+        self.lines: List[int] = [1]
+        self.offsets: List[int] = [0]
+
+    def nearest(self, line: int) -> Tuple[int, int]:
+        """Closest known (line, offset) at or before line."""
+        i = bisect.bisect_right(self.lines, line) - 1
+        return self.lines[i], self.offsets[i]
+
+    def record(self, line: int, offset: int) -> None:
+        """Remember the offset of line if it is a new checkpoint."""
+        if line > self.lines[-1] and line % line_checkpoint_interval == 1:
+            self.lines.append(line)
+            self.offsets.append(offset)
+
+# (path, mtime_ns, size) -> checkpoints
+_checkpoints: Dict[Tuple[str, int, int], LineCheckpoints] = {}
+_checkpoints_lock = threading.Lock()
+
+def _get_checkpoints(path: Path) -> LineCheckpoints:
+    stat = path.stat()
+    key = (str(path), stat.st_mtime_ns, stat.st_size)
+    with _checkpoints_lock:
+        if key not in _checkpoints:
+            # Drop checkpoints of older versions of the same file
+            for stale in [k for k in _checkpoints if k[0] == key[0]]:
+                del _checkpoints[stale]
+            _checkpoints[key] = LineCheckpoints()
+        return _checkpoints[key]
+
+def _seek_line(mm: mmap.mmap, checkpoints: LineCheckpoints, line: int) -> int:
+    """Byte offset where line starts (len(mm) if the file has fewer lines)."""
+    current, offset = checkpoints.nearest(line)
+    while current < line:
+        newline = mm.find(b"\n", offset)
+        if newline < 0:
+            return len(mm)
+        offset = newline + 1
+        current += 1
+        checkpoints.record(current, offset)
+    return offset
+
+def _line_number_at(
+    mm: mmap.mmap,
+    checkpoints: LineCheckpoints,
+    offset: int,
+    known: Optional[Tuple[int, int]] = None,
+) -> int:
+    """1-based line number containing byte offset.
+
+    Counting starts from the nearest checkpoint, or from known (a line and the
+    offset of a position on it) when that is closer, so sequential lookups only
+    count the newlines between them.
+    """
+    i = bisect.bisect_right(checkpoints.offsets, offset) - 1
+    line, start = checkpoints.lines[i], checkpoints.offsets[i]
+    if known is not None and start < known[1] <= offset:
+        line, start = known
+    # Count newlines in bounded blocks so a far-away offset never copies a huge slice
+    for block_start in range(start, offset, count_block_bytes):
+        line += mm[block_start:min(block_start + count_block_bytes, offset)].count(b"\n")
+    return line
+
+def _decode_line(raw: bytes) -> str:
+    text = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+    return text[:max_line_chars] + " ..." if len(text) > max_line_chars else text
+
+def _open_map(path: Path):
+    f = open(path, "rb")
+    if path.stat().st_size == 0:
+        return f, None
+    return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+# ===== TOOLS =====
+
+@tool(parse_docstring=True)
+def read_file_lines(path: str, start_line: int = 1, num_lines: int = 100) -> str:
+    """Read a range of lines from a local file without loading the whole file.
+
+    Use this instead of read_file for large files, and page through them by
+    calling again with the reported next start_line.
+
+    Args:
+        path: File path relative to the research files directory
+        start_line: First line to read (1-based)
+        num_lines: Number of lines to read (at most 400)
+
+    Returns:
+        The requested lines prefixed with their line numbers
+    """
+    resolved = resolve_path(path)
+    start_line, num_lines = max(start_line, 1), min(max(num_lines, 1), max_lines_per_read)
+    f, mm = _open_map(resolved)
+    try:
+        if mm is None:
+            return f"{path} is empty."
+        checkpoints = _get_checkpoints(resolved)
+        offset = _seek_line(mm, checkpoints, start_line)
+        if offset >= len(mm):
+            return f"{path} has fewer than {start_line} lines."
+
+        size = len(mm)
+        output = []
+        line = start_line
+        while line < start_line + num_lines and offset < len(mm):
+            newline = mm.find(b"\n", offset)
+            end = len(mm) if newline < 0 else newline + 1
+            output.append(f"{line:>7}  {_decode_line(mm[offset:end])}")
+            offset, line = end, line + 1
+            checkpoints.record(line, offset)
+    finally:
+        if mm is not None:
+            mm.close()
+        f.close()
+
+    more = f" Continue with start_line={line}." if offset < size else ""
+    return f"{path} lines {start_line}-{line - 1}:{more}\n" + "\n".join(output)
+
+@tool(parse_docstring=True)
+def read_file_bytes(path: str, offset: int = 0, length: int = 16384) -> str:
+    """Read a byte range from a local file without loading the whole file.
+
+    Args:
+        path: File path relative to the research files directory
+        offset: Byte offset to start reading at
+        length: Number of bytes to read (at most 65536)
+
+    Returns:
+        The decoded bytes, with the offset to continue from
+    """
+    resolved = resolve_path(path)
+    offset, length = max(offset, 0), min(max(length, 1), max_bytes_per_read)
+    f, mm = _open_map(resolved)
+    try:
+        size = len(mm) if mm is not None else 0
+        if offset >= size:
+            return f"{path} has {size} bytes; offset {offset} is past the end."
+        end = min(offset + length, size)
+        text = mm[offset:end].decode("utf-8", errors="replace")
+    finally:
+        if mm is not None:
+            mm.close()
+        f.close()
+
+    more = f" Continue with offset={end}." if end < size else ""
+    return f"{path} bytes {offset}-{end} of {size}:{more}\n{text}"
+
+@tool(parse_docstring=True)
+def grep_file(path: str, pattern: str, start_offset: int = 0, max_matches: int = 20) -> str:
+    """Find lines matching a regular expression in a local file.
+
+    Scans through the file without loading it; resume a long scan by calling
+    again with the reported next start_offset. Use read_file_lines around a
+    match's line number to see its context.
+
+    Args:
+        path: File path relative to the research files directory
+        pattern: Regular expression to search for (case-insensitive)
+        start_offset: Byte offset to start scanning at
+        max_matches: Maximum number of matching lines to return (at most 50)
+
+    Returns:
+        Matching lines with their line numbers and byte offsets
+    """
+    resolved = resolve_path(path)
+    max_matches = min(max(max_matches, 1), max_grep_matches)
+    try:
+        regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE | re.MULTILINE)
+    except re.error as e:
+        return f"Invalid pattern '{pattern}': {e}"
+
+    f, mm = _open_map(resolved)
+    matches = []
+    next_offset = None
+    try:
+        if mm is None:
+            return f"{path} is empty."
+        checkpoints = _get_checkpoints(resolved)
+        position = max(start_offset, 0)
+        # Line number and start offset of the previous match, counted from incrementally
+        previous = None
+        while position < len(mm):
+            match = regex.search(mm, position)
+            if match is None:
+                break
+            line_start = mm.rfind(b"\n", 0, match.start()) + 1
+            newline = mm.find(b"\n", match.end())
+            line_end = len(mm) if newline < 0 else newline + 1
+            if len(matches) == max_matches:
+                next_offset = line_start
+                break
+            line = _line_number_at(mm, checkpoints, line_start, previous)
+            previous = (line, line_start)
+            matches.append(f"line {line} (offset {line_start}): {_decode_line(mm[line_start:line_end])}")
+            position = line_end
+    finally:
+        if mm is not None:
+            mm.close()
+        f.close()
+
+    if not matches:
+        return f"No matches for '{pattern}' in {path} from offset {start_offset}."
+    more = f" More matches; continue with start_offset={next_offset}." if next_offset is not None else ""
+    return f"{len(matches)} matches for '{pattern}' in {path}:{more}\n" + "\n".join(matches)
+
+# Exposed to the MCP researcher alongside the MCP filesystem tools
+file_reader_tools = [read_file_lines, read_file_bytes, grep_file]
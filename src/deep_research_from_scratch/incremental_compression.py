@@ -0,0 +1,120 @@
+"""Incremental Research Compression.
+
+Compressing a researcher's whole message history in one call at the end is
+slow, and a researcher stopped by a hard deadline has nothing to report. This
+module folds findings into a running summary as research progresses instead:
+
+1. Every ``fold_every_rounds`` tool rounds, ``fold_findings`` merges the
+   unfolded rounds into ``running_summary`` with a fast, short-output model.
+   It runs in parallel with the researcher's next model call, so it rarely
+   lengthens the loop, but it is an extra model call that costs tokens
+2. ``summarized_messages`` records how much of the history the summary covers
+3. The final compression only has to combine the running summary with the
+   few messages after it
+4. Callers streaming the researcher's state can fall back to the running
+   summary when a researcher never finishes
+"""
+
+import asyncio
+import logging
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from typing_extensions import List, Sequence
+
+from deep_research_from_scratch.budgets import drop_unanswered_tool_calls
+from deep_research_from_scratch.context_compaction import restore_compacted
+from deep_research_from_scratch.models import get_fold_model
+from deep_research_from_scratch.prompts import (
+    compress_research_human_message,
+    compress_research_system_prompt,
+    fold_findings_prompt,
+    running_summary_message,
+)
+from deep_research_from_scratch.state_research import ResearcherState
+from deep_research_from_scratch.utils import get_today_str
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Tool rounds collected before they are folded into the running summary
+fold_every_rounds = 2
+
+# ===== FOLDING =====
+
+def format_round(messages: Sequence[BaseMessage]) -> str:
+    """Render a tool round (model reasoning, tool calls and outputs) as plain text."""
+    parts = []
+    for message in messages:
+        if isinstance(message, ToolMessage):
+            parts.append(f"[Tool output: {message.name}]\n{message.content}")
+        elif isinstance(message, AIMessage):
+            if message.content:
+                parts.append(f"[Researcher]\n{message.content}")
+            for tool_call in message.tool_calls:
+                parts.append(f"[Tool call: {tool_call['name']}] {tool_call['args']}")
+        else:
+            parts.append(str(message.content))
+    return "\n\n".join(parts)
+
+async def fold_findings(state: ResearcherState) -> dict:
+    """Fold the latest tool rounds into the researcher's running summary.
+
+    Shared by the web and MCP researcher graphs. Does nothing until
+    fold_every_rounds rounds are unfolded. On failure, or when the summary no
+    longer fits the fold model's output limit, the summary is left unchanged
+    and the unfolded rounds are covered by the final compression instead.
+    """
+    # Restoring compacted outputs reads the note store, keep it off the event loop
+    messages = await asyncio.to_thread(restore_compacted, state.get("researcher_messages", []), state.get("raw_notes", []))
+    start = state.get("summarized_messages", 0) or 1  # the first message is the research topic
+    new_messages = messages[start:]
+    rounds = sum(1 for message in new_messages if isinstance(message, AIMessage) and message.tool_calls)
+    if rounds < fold_every_rounds:
+        return {}
+
+    prompt = fold_findings_prompt.format(
+        date=get_today_str(),
+        research_topic=state.get("research_topic", ""),
+        running_summary=state.get("running_summary") or "(none yet)",
+        new_round=format_round(new_messages),
+    )
+    try:
+        response = await get_fold_model().ainvoke([HumanMessage(content=prompt)])
+    except Exception as e:
+        logger.warning("Failed to fold research findings: %s", e)
+        return {}
+    if response.response_metadata.get("finish_reason") in ("MAX_TOKENS", "length"):
+        # A cut-off summary would drop findings; leave these rounds to the final compression
+        logger.warning("Running summary exceeded the fold model's output limit; keeping the previous summary")
+        return {}
+
+    return {"running_summary": str(response.content), "summarized_messages": len(messages)}
+
+# ===== FINAL COMPRESSION =====
+
+def compression_messages(state: ResearcherState) -> List[BaseMessage]:
+    """Build the prompt for the researcher's final compression call.
+
+    Compacted tool outputs are restored to full text, and a trailing tool
+    request left unexecuted by a budget stop is dropped. When a running
+    summary exists, it replaces the part of the history it already covers.
+    """
+    messages = restore_compacted(state.get("researcher_messages", []), state.get("raw_notes", []))
+    summary = state.get("running_summary")
+    if summary:
+        covered = state.get("summarized_messages", 0)
+        messages = messages[:1] + [HumanMessage(content=running_summary_message.format(running_summary=summary))] + messages[covered:]
+    messages = drop_unanswered_tool_calls(messages)
+
+    return (
+        [SystemMessage(content=compress_research_system_prompt.format(date=get_today_str()))]
+        + messages
+        + [HumanMessage(content=compress_research_human_message.format(research_topic=state.get("research_topic", "")))]
+    )
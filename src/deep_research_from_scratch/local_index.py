@@ -0,0 +1,252 @@
+"""Local Document Index for File-Based Research.
+
+The MCP researcher used to find answers by listing directories and reading
+whole files through the filesystem server, one round-trip at a time. This
+module indexes the research files directory locally so a single
+``local_search`` tool call returns the most relevant passages:
+
+- Text files are split into line-numbered chunks
+- Chunks are kept in an inverted index and ranked with BM25
+- Optionally, chunks are also embedded and ranked by a blend of BM25 and
+  cosine similarity (set DEEP_RESEARCH_LOCAL_EMBEDDINGS to an embeddings model
+  such as "google_genai:models/text-embedding-004")
+- Before each search the index is refreshed incrementally: files whose mtime
+  and size are unchanged are skipped, changed files are re-hashed and only
+  re-chunked if their content actually changed, and deleted files are dropped
+"""
+
+import hashlib
+import math
+import os
+import threading
+from collections import Counter
+from pathlib import Path
+
+from langchain_core.tools import tool
+from typing_extensions import Dict, List, Optional, Tuple
+
+from deep_research_from_scratch.content_selection import (
+    bm25_b,
+    bm25_k1,
+    chunk_tokens,
+    terms,
+    text_tokens,
+)
+from deep_research_from_scratch.utils import get_current_dir
+
+# ===== CONFIGURATION =====
+
+# File extensions that are indexed
+indexed_extensions = {
+    ".md", ".markdown", ".txt", ".rst", ".csv", ".tsv", ".json", ".jsonl",
+    ".yaml", ".yml", ".html", ".htm", ".xml", ".py", ".log",
+}
+
+# Larger files are left to the file reader tools
+max_indexed_file_bytes = 20 * 1024 * 1024
+
+# Default number of passages returned by local_search
+default_local_results = 5
+
+# Optional embeddings model as "provider:model" (unset disables embeddings)
+embeddings_model = os.environ.get("DEEP_RESEARCH_LOCAL_EMBEDDINGS", "")
+
+# Weight of the embedding similarity in the blended score (BM25 gets the rest)
+embedding_weight = 0.5
+
+# ===== CHUNKING =====
+
+class Chunk:
+    """A passage of a file, with its 1-based inclusive line range."""
+
+    def __init__(self, path: str, start_line: int, end_line: int, text: str):
+        """Create a chunk and count its terms."""
+        self.path = path
+        self.start_line = start_line
+        self.end_line = end_line
+        self.text = text
+        self.term_counts = Counter(terms(text))
+        self.length = sum(self.term_counts.values())
+        self.vector: Optional[List[float]] = None
+
+def chunk_file(path: str, content: str, max_tokens: int = chunk_tokens) -> List[Chunk]:
+    """Split file content into chunks of roughly max_tokens, preferring blank-line breaks."""
+    chunks = []
+    lines = content.splitlines()
+    start, current_tokens = 0, 0
+    for i, line in enumerate(lines):
+        current_tokens += text_tokens(line) if line.strip() else 0
+        at_break = not line.strip() and current_tokens >= max_tokens // 2
+        if current_tokens >= max_tokens or at_break or i == len(lines) - 1:
+            text = "\n".join(lines[start:i + 1]).strip()
+            if text:
+                chunks.append(Chunk(path, start + 1, i + 1, text))
+            start, current_tokens = i + 1, 0
+    return chunks
+
+# ===== INDEX =====
+
+def _file_hash(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+class LocalDocumentIndex:
+    """Incrementally updated BM25 (and optional embedding) index over a directory."""
+
+    def __init__(self, root: Path, embeddings=None):
+        """Create an empty index over root; embeddings is an optional LangChain Embeddings object."""
+        self.root = Path(root)
+        self.embeddings = embeddings
+        # path -> (mtime_ns, size, sha256)
+        self._files: Dict[str, Tuple[int, int, str]] = {}
+        self._chunks: Dict[str, List[Chunk]] = {}
+        # term -> {chunk: term count}
+        self._postings: Dict[str, Dict[Chunk, int]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"files": 0, "chunks": 0, "indexed": 0, "skipped": 0, "removed": 0}
+
+    def _iter_files(self):
+        for path in sorted(self.root.rglob("*")):
+            if path.is_file() and path.suffix.lower() in indexed_extensions:
+                yield path
+
+    def _remove(self, key: str) -> None:
+        for chunk in self._chunks.pop(key, []):
+            for term in chunk.term_counts:
+                postings = self._postings.get(term)
+                if postings is not None:
+                    postings.pop(chunk, None)
+                    if not postings:
+                        del self._postings[term]
+        self._files.pop(key, None)
+
+    def _add(self, key: str, path: Path, signature: Tuple[int, int, str]) -> None:
+        content = path.read_text(encoding="utf-8", errors="replace")
+        chunks = chunk_file(key, content)
+        if self.embeddings is not None and chunks:
+            for chunk, vector in zip(chunks, self.embeddings.embed_documents([c.text for c in chunks])):
+                chunk.vector = vector
+        for chunk in chunks:
+            for term, count in chunk.term_counts.items():
+                self._postings.setdefault(term, {})[chunk] = count
+        self._chunks[key] = chunks
+        self._files[key] = signature
+
+    def refresh(self) -> None:
+        """Bring the index up to date with the files on disk."""
+        with self._lock:
+            seen = set()
+            for path in self._iter_files():
+                key = path.relative_to(self.root).as_posix()
+                stat = path.stat()
+                if stat.st_size > max_indexed_file_bytes:
+                    continue
+                seen.add(key)
+
+                known = self._files.get(key)
+                if known and known[:2] == (stat.st_mtime_ns, stat.st_size):
+                    self.stats["skipped"] += 1
+                    continue
+                digest = _file_hash(path)
+                signature = (stat.st_mtime_ns, stat.st_size, digest)
+                if known and known[2] == digest:
+                    # Touched but unchanged: keep the chunks, remember the new mtime
+                    self._files[key] = signature
+                    self.stats["skipped"] += 1
+                    continue
+
+                self._remove(key)
+                self._add(key, path, signature)
+                self.stats["indexed"] += 1
+
+            for key in set(self._files) - seen:
+                self._remove(key)
+                self.stats["removed"] += 1
+
+            self.stats["files"] = len(self._files)
+            self.stats["chunks"] = sum(len(chunks) for chunks in self._chunks.values())
+
+    def search(self, query: str, k: int = default_local_results) -> List[Tuple[Chunk, float]]:
+        """Return up to k (chunk, score) pairs ranked by relevance to query."""
+        self.refresh()
+        with self._lock:
+            total = self.stats["chunks"]
+            if not total:
+                return []
+            average_length = sum(c.length for chunks in self._chunks.values() for c in chunks) / total or 1.0
+
+            scores: Dict[Chunk, float] = {}
+            for term in set(terms(query)):
+                postings = self._postings.get(term, {})
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for chunk, frequency in postings.items():
+                    norm = bm25_k1 * (1 - bm25_b + bm25_b * chunk.length / average_length)
+                    scores[chunk] = scores.get(chunk, 0.0) + idf * frequency * (bm25_k1 + 1) / (frequency + norm)
+
+            if self.embeddings is not None:
+                # Blend max-normalized BM25 with cosine similarity over every chunk
+                query_vector = self.embeddings.embed_query(query)
+                top = max(scores.values(), default=0.0) or 1.0
+                scores = {
+                    chunk: (1 - embedding_weight) * scores.get(chunk, 0.0) / top
+                    + embedding_weight * _cosine(query_vector, chunk.vector or [])
+                    for chunks in self._chunks.values() for chunk in chunks
+                }
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            return [(chunk, score) for chunk, score in ranked[:k] if score > 0]
+
+# Global index - will be initialized lazily
+_local_index = None
+_local_index_lock = threading.Lock()
+
+def get_local_index() -> LocalDocumentIndex:
+    """Get or initialize the index over the research files directory lazily."""
+    global _local_index
+    with _local_index_lock:
+        if _local_index is None:
+            embeddings = None
+            if embeddings_model:
+                # Deferred so the embeddings provider SDK is only imported when enabled
+                from langchain.embeddings import init_embeddings
+
+                embeddings = init_embeddings(embeddings_model)
+            _local_index = LocalDocumentIndex(get_current_dir() / "files", embeddings)
+        return _local_index
+
+# ===== TOOL =====
+
+@tool(parse_docstring=True)
+def local_search(query: str, max_results: int = default_local_results) -> str:
+    """Search the local research files and return the most relevant passages.
+
+    Use this first when researching local documents: one call returns ranked
+    passages with their file paths and line numbers, so you only need to read
+    whole files when a passage is not enough.
+
+    Args:
+        query: What to look for, in natural language or keywords
+        max_results: Maximum number of passages to return
+
+    Returns:
+        Ranked passages with file path, line range and text
+    """
+    results = get_local_index().search(query, max_results)
+    if not results:
+        return f"No local passages found for '{query}'."
+
+    formatted_output = f"Local search results for '{query}':\n"
+    for i, (chunk, score) in enumerate(results, 1):
+        formatted_output += f"\n--- PASSAGE {i}: {chunk.path} (lines {chunk.start_line}-{chunk.end_line}, score {score:.2f}) ---\n"
+        formatted_output += f"{chunk.text}\n"
+    return formatted_output
@@ -0,0 +1,220 @@
+"""Persistent MCP Session Management.
+
+This module keeps MCP server sessions warm for the MCP research agent. Without
+it, every agent step calls ``MultiServerMCPClient.get_tools()``, which starts a
+fresh server process (e.g. ``npx @modelcontextprotocol/server-filesystem``)
+just to list tools, and every tool call opens yet another session.
+
+The pool:
+- Starts a fixed number of long-lived stdio sessions on first use
+- Loads the tool list once per session and caches it
+- Re-lists tools on a warm session at most every ``tool_refresh_seconds`` and
+  bumps ``tools_fingerprint`` when the server's tool list changes, so callers
+  can invalidate anything derived from it (such as a model bound to the tools)
+- Hands out sessions to concurrent researchers one at a time, restarting a
+  session whose server has died before handing it out again
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+from mcp import ClientSession
+from typing_extensions import AsyncIterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Seconds between tool list refreshes on a warm session
+tool_refresh_seconds = 300.0
+
+# ===== SESSION POOL =====
+
+class PooledSession:
+    """A live MCP session together with the LangChain tools bound to it."""
+
+    def __init__(self, session: ClientSession, tools: List[BaseTool]):
+        """Wrap a live session and its tools."""
+        self.session = session
+        self.tools = tools
+        # Pool task holding the session open; set once the session is ready
+        self.worker: Optional[asyncio.Task] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the task holding the session (and its server) is still running."""
+        return self.worker is not None and not self.worker.done()
+
+def fingerprint_tools(tools: List[BaseTool]) -> str:
+    """Return a stable hash of tool names, descriptions and argument schemas."""
+    specs = sorted(
+        (tool.name, tool.description or "", json.dumps(tool.args, sort_keys=True, default=str))
+        for tool in tools
+    )
+    return hashlib.sha256(json.dumps(specs).encode("utf-8")).hexdigest()[:16]
+
+class MCPSessionPool:
+    """Pool of persistent stdio sessions to a single MCP server.
+
+    Each session is owned by a background task that keeps the server process
+    alive until ``aclose`` is called; the MCP stdio transport must be entered
+    and exited from the same task. Sessions are tied to the event loop they
+    were started on, and the pool restarts transparently on a new loop.
+    """
+
+    def __init__(self, client: MultiServerMCPClient, server_name: str, size: int = 1):
+        """Create a pool of size sessions to server_name (started lazily)."""
+        self.client = client
+        self.server_name = server_name
+        self.size = size
+        self.tools_fingerprint: Optional[str] = None
+        self.stats = {"sessions_started": 0, "sessions_restarted": 0, "tool_list_refreshes": 0, "tool_list_changes": 0}
+
+        self._sessions: List[PooledSession] = []
+        self._available: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._stop: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._refreshed_at = 0.0
+
+    async def _session_worker(self, ready: asyncio.Future, stop: asyncio.Event) -> None:
+        """Hold one session open until stop is set."""
+        try:
+            async with self.client.session(self.server_name) as session:
+                tools = await load_mcp_tools(session, server_name=self.server_name)
+                ready.set_result(PooledSession(session, tools))
+                await stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning("MCP session for '%s' closed unexpectedly: %s", self.server_name, e)
+
+    async def _start_session(self) -> PooledSession:
+        """Start one session worker and wait until its session is ready."""
+        ready = self._loop.create_future()
+        worker = asyncio.create_task(self._session_worker(ready, self._stop))
+        self._workers.append(worker)
+        try:
+            pooled = await ready
+        except BaseException:
+            worker.cancel()
+            self._workers.remove(worker)
+            raise
+        pooled.worker = worker
+        return pooled
+
+    async def _stop_workers(self) -> None:
+        """Stop and forget every session worker."""
+        if self._stop is not None:
+            self._stop.set()
+        workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        self._sessions = []
+
+    async def _ensure_started(self) -> None:
+        """Start the pool on the running loop if it is not already running there."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._sessions:
+            return
+
+        if self._loop is not loop:
+            # Sessions from a previous (possibly closed) loop cannot be reused
+            self._loop = loop
+            self._sessions = []
+            self._workers = []
+            self._start_lock = asyncio.Lock()
+
+        async with self._start_lock:
+            if self._sessions:
+                return
+
+            self._stop = asyncio.Event()
+            try:
+                results = await asyncio.gather(
+                    *(self._start_session() for _ in range(self.size)), return_exceptions=True
+                )
+                errors = [result for result in results if isinstance(result, BaseException)]
+                if errors:
+                    raise errors[0]
+            except BaseException:
+                # Do not leave the sessions that did start running in the background
+                await self._stop_workers()
+                raise
+            sessions = results
+            self.stats["sessions_started"] += len(sessions)
+
+            self._available = asyncio.Queue()
+            for pooled in sessions:
+                self._available.put_nowait(pooled)
+            self._sessions = list(sessions)
+            self.tools_fingerprint = fingerprint_tools(self._sessions[0].tools)
+            self._refreshed_at = time.monotonic()
+
+    async def _maybe_refresh_tools(self) -> None:
+        """Re-list tools on warm sessions when the refresh interval has elapsed."""
+        if time.monotonic() - self._refreshed_at < tool_refresh_seconds:
+            return
+        self._refreshed_at = time.monotonic()
+        self.stats["tool_list_refreshes"] += 1
+
+        for pooled in self._sessions:
+            if pooled.alive:
+                pooled.tools = await load_mcp_tools(pooled.session, server_name=self.server_name)
+
+        fingerprint = fingerprint_tools(self._sessions[0].tools)
+        if fingerprint != self.tools_fingerprint:
+            self.stats["tool_list_changes"] += 1
+            self.tools_fingerprint = fingerprint
+
+    async def get_tools(self) -> List[BaseTool]:
+        """Return the cached tool list, starting the pool if needed."""
+        await self._ensure_started()
+        await self._maybe_refresh_tools()
+        return self._sessions[0].tools
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[PooledSession]:
+        """Borrow a session (and its tools) for the duration of the block."""
+        await self._ensure_started()
+        await self._maybe_refresh_tools()
+        pooled = await self._available.get()
+        try:
+            if not pooled.alive:
+                pooled = await self._restart(pooled)
+            yield pooled
+        finally:
+            self._available.put_nowait(pooled)
+
+    async def _restart(self, dead: PooledSession) -> PooledSession:
+        """Replace a session whose worker has exited with a fresh one.
+
+        If the restart fails the dead session is returned to the queue by the
+        caller, so the next borrower tries again.
+        """
+        if dead.worker in self._workers:
+            self._workers.remove(dead.worker)
+        pooled = await self._start_session()
+        self._sessions[self._sessions.index(dead)] = pooled
+        self.stats["sessions_restarted"] += 1
+        return pooled
+
+    async def aclose(self) -> None:
+        """Stop all sessions and their server processes."""
+        if self._stop is not None:
+            self._stop.set()
+        if self._workers:
+            await asyncio.gather(*self._workers, return_exceptions=True)
+        self._sessions = []
+        self._workers = []
+        self._loop = None
@@ -0,0 +1,163 @@
+"""Lazy Model and Client Registry.
+
+This module centralizes construction of chat models and search clients. Nothing
+is built at import time: each model is created on first use and shared by every
+caller asking for the same (provider, model, params), so importing the package
+is fast, needs no API keys, and the research, summarization and supervisor
+roles that use the same Gemini configuration share one client. The Tavily
+clients and OpenAI-compatible models send their HTTP traffic over the pooled
+transport in transport.py.
+
+With DEEP_RESEARCH_PROVIDERS=fake (or set_provider_mode("fake")) the registry
+hands out the offline stand-ins from fake_providers.py instead.
+"""
+
+import os
+import threading
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.runnables import Runnable
+from typing_extensions import Any, Dict, Hashable, Optional, Sequence, Tuple
+
+from deep_research_from_scratch.transport import (
+    chat_model_transport_params,
+    get_async_http_client,
+    get_requests_session,
+)
+
+# ===== REGISTRY =====
+
+# "live" uses the real providers, "fake" the offline stand-ins
+provider_mode = os.environ.get("DEEP_RESEARCH_PROVIDERS", "live")
+
+_models: Dict[Tuple, BaseChatModel] = {}
+_bound_models: Dict[Tuple, Runnable] = {}
+_clients: Dict[str, Any] = {}
+_lock = threading.Lock()
+
+def _freeze(value: Any) -> Any:
+    """Make params hashable so they can be part of a registry key."""
+    if isinstance(value, dict):
+        return tuple(sorted((key, _freeze(item)) for key, item in value.items()))
+    if isinstance(value, list | tuple):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+def get_chat_model(model: str, model_provider: str, **params: Any) -> BaseChatModel:
+    """Get the shared chat model for (provider, model, params), creating it on first use.
+
+    Args:
+        model: Model name, e.g. "gemini-2.5-pro"
+        model_provider: Provider name understood by init_chat_model, e.g. "google_genai"
+        **params: Extra model parameters such as temperature or max_tokens
+
+    Returns:
+        The shared chat model instance
+    """
+    key = (model_provider, model, _freeze(params))
+    if key not in _models:
+        with _lock:
+            if key not in _models:
+                if provider_mode == "fake":
+                    from deep_research_from_scratch import fake_providers
+                    _models[key] = fake_providers.create_fake_chat_model(model, model_provider, **params)
+                    return _models[key]
+
+                # Deferred so provider SDKs are only imported when a model is first needed
+                from langchain.chat_models import init_chat_model
+
+                # Route HTTP calls over the shared pooled transport unless overridden
+                params = {**chat_model_transport_params(model_provider), **params}
+                _models[key] = init_chat_model(model=model, model_provider=model_provider, **params)
+    return _models[key]
+
+def get_bound_model(model: BaseChatModel, tools: Sequence, tools_key: Optional[Hashable] = None) -> Runnable:
+    """Get model bound to tools, binding it on first use.
+
+    Bound models live in the registry next to the models they wrap, so they
+    are dropped together by clear_registry and set_provider_mode.
+
+    Args:
+        model: A model from the registry
+        tools: Tools to bind
+        tools_key: Identifies the tool list (e.g. a fingerprint of its schemas);
+            defaults to the identity of the tools
+
+    Returns:
+        The shared bound model
+    """
+    key = (id(model), tools_key if tools_key is not None else tuple(id(tool) for tool in tools))
+    if key not in _bound_models:
+        with _lock:
+            if key not in _bound_models:
+                _bound_models[key] = model.bind_tools(tools)
+    return _bound_models[key]
+
+def get_tavily_client():
+    """Get the shared synchronous Tavily client, creating it on first use."""
+    if "tavily" not in _clients:
+        with _lock:
+            if "tavily" not in _clients:
+                if provider_mode == "fake":
+                    from deep_research_from_scratch import fake_providers
+                    _clients["tavily"] = fake_providers.create_fake_tavily_client()
+                    return _clients["tavily"]
+                from tavily import TavilyClient
+                _clients["tavily"] = TavilyClient(session=get_requests_session())
+    return _clients["tavily"]
+
+def get_async_tavily_client():
+    """Get the shared asynchronous Tavily client, creating it on first use."""
+    if "async_tavily" not in _clients:
+        with _lock:
+            if "async_tavily" not in _clients:
+                if provider_mode == "fake":
+                    from deep_research_from_scratch import fake_providers
+                    _clients["async_tavily"] = fake_providers.create_fake_tavily_client(asynchronous=True)
+                    return _clients["async_tavily"]
+                from tavily import AsyncTavilyClient
+                _clients["async_tavily"] = AsyncTavilyClient(client=get_async_http_client())
+    return _clients["async_tavily"]
+
+def clear_registry() -> None:
+    """Drop all shared models, bound models and clients (e.g. after changing credentials)."""
+    with _lock:
+        _models.clear()
+        _bound_models.clear()
+        _clients.clear()
+
+def set_provider_mode(mode: str) -> None:
+    """Switch between the real providers ("live") and the offline stand-ins ("fake")."""
+    global provider_mode
+    if mode not in ("live", "fake"):
+        raise ValueError(f"Unknown provider mode: {mode}")
+    provider_mode = mode
+    clear_registry()
+
+# ===== MODEL ROLES =====
+
+# Primary: Google Gemini | Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
+
+def get_research_model() -> BaseChatModel:
+    """Model used by researchers and the supervisor to decide on tool calls."""
+    return get_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)
+
+def get_summarization_model() -> BaseChatModel:
+    """Model used to summarize webpages (alternatives: "openai:gpt-4.1-mini", "anthropic:claude-haiku-3-5-20241022")."""
+    return get_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)
+
+def get_compress_model() -> BaseChatModel:
+    """Long-output model used to compress research findings."""
+    return get_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0, max_tokens=32000)
+
+def get_fold_model() -> BaseChatModel:
+    """Fast model used to fold tool rounds into a researcher's running summary."""
+    return get_chat_model(model="gemini-2.5-flash-lite", model_provider="google_genai", temperature=0.0, max_tokens=8000)
+
+def get_writer_model() -> BaseChatModel:
+    """Long-output model used to write the final report."""
+    return get_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0, max_tokens=32000)
+
+def get_scoping_model() -> BaseChatModel:
+    """Fast model used for clarification and research brief generation."""
+    return get_chat_model(model="gemini-2.5-flash-lite", model_provider="google_genai", temperature=0.0)
@@ -10,11 +10,8 @@ The supervisor uses parallel research execution to improve efficiency while
 maintaining isolated context windows for each research topic.
 """
 
-import asyncio
-
 from typing_extensions import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import (
     HumanMessage, 
     BaseMessage, 
@@ -22,16 +19,22 @@ from langchain_core.messages import (
     ToolMessage,
     filter_messages
 )
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
+from deep_research_from_scratch.models import get_bound_model, get_research_model
 from deep_research_from_scratch.prompts import lead_researcher_prompt
 from deep_research_from_scratch.research_agent import researcher_agent
+from deep_research_from_scratch.scheduler import ResearchScheduler
+from deep_research_from_scratch.source_store import new_source_store_id, use_source_store
+from deep_research_from_scratch.state_research import ResearchBudget
 from deep_research_from_scratch.state_multi_agent_supervisor import (
     SupervisorState, 
     ConductResearch, 
     ResearchComplete
 )
+from deep_research_from_scratch.tracing import traced_graph
 from deep_research_from_scratch.utils import get_today_str, think_tool
 
 def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
@@ -51,6 +54,45 @@ def get_notes_from_tool_calls(messages: list[BaseMessage]) -> list[str]:
     """
     return [tool_msg.content for tool_msg in filter_messages(messages, include_types="tool")]
 
+def get_research_budget(conduct_research_args: dict) -> ResearchBudget:
+    """Extract the per-call budget overrides from ConductResearch arguments.
+
+    Limits the supervisor leaves unset are omitted so the researcher falls
+    back to the defaults in budgets.py.
+
+    Args:
+        conduct_research_args: Arguments of a ConductResearch tool call
+
+    Returns:
+        ResearchBudget containing only the limits that were set
+    """
+    return {
+        key: conduct_research_args[key]
+        for key in ResearchBudget.__annotations__
+        if conduct_research_args.get(key) is not None
+    }
+
+async def run_researcher(research_input: dict, progress: dict, source_store_id: str, config: RunnableConfig) -> dict:
+    """Run a researcher sub-agent, recording its latest state in progress.
+
+    If the unit is stopped before it finishes (e.g. by the scheduler's
+    timeout), progress still holds the running summary folded in so far.
+    The researcher reads and fills the run's shared source store, and runs
+    as a child of the supervisor node's config so callbacks and traces nest.
+    """
+    with use_source_store(source_store_id):
+        async for state in researcher_agent.astream(research_input, config, stream_mode="values"):
+            progress.update(state)
+    return progress
+
+def get_research_result_content(result, progress: dict) -> str:
+    """Tool message content for a research unit, using partial findings if it did not finish."""
+    if not isinstance(result, BaseException):
+        return result.get("compressed_research", "Error synthesizing research report")
+    if progress.get("running_summary"):
+        return f"Research stopped before finishing ({result or type(result).__name__}). Partial findings gathered so far:\n\n{progress['running_summary']}"
+    return f"Research failed: {result}"
+
 # Ensure async compatibility for Jupyter environments
 try:
     import nest_asyncio
@@ -67,10 +109,12 @@ except ImportError:
 
 # ===== CONFIGURATION =====
 
-supervisor_tools = [ConductResearch, ResearchComplete, think_tool]
-# Primary: Google Gemini | Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
-supervisor_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)
-supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
+# Named apart from the supervisor_tools node below, which would otherwise shadow it
+supervisor_tool_list = [ConductResearch, ResearchComplete, think_tool]
+
+def get_supervisor_model_with_tools():
+    """Supervisor model bound to the supervisor tools (built on first use)."""
+    return get_bound_model(get_research_model(), supervisor_tool_list)
 
 # System constants
 # Maximum number of tool call iterations for individual researcher agents
@@ -78,7 +122,8 @@ supervisor_model_with_tools = supervisor_model.bind_tools(supervisor_tools)
 max_researcher_iterations = 6 # Calls to think_tool + ConductResearch
 
 # Maximum number of concurrent research agents the supervisor can launch
-# This is passed to the lead_researcher_prompt to limit parallel research tasks
+# This is passed to the lead_researcher_prompt and enforced by the ResearchScheduler;
+# extra ConductResearch calls are queued until a slot frees up
 max_concurrent_researchers = 3
 
 # ===== SUPERVISOR NODES =====
@@ -108,7 +153,7 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
     messages = [SystemMessage(content=system_message)] + supervisor_messages
 
     # Make decision about next research steps
-    response = await supervisor_model_with_tools.ainvoke(messages)
+    response = await get_supervisor_model_with_tools().ainvoke(messages)
 
     return Command(
         goto="supervisor_tools",
@@ -118,7 +163,7 @@ async def supervisor(state: SupervisorState) -> Command[Literal["supervisor_tool
         }
     )
 
-async def supervisor_tools(state: SupervisorState) -> Command[Literal["supervisor", "__end__"]]:
+async def supervisor_tools(state: SupervisorState, config: RunnableConfig) -> Command[Literal["supervisor", "__end__"]]:
     """Execute supervisor decisions - either conduct research or end the process.
 
     Handles:
@@ -129,12 +174,15 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
     Args:
         state: Current supervisor state with messages and iteration count
+        config: Runnable config of the node, passed on to the researchers
 
     Returns:
         Command to continue supervision, end process, or handle errors
     """
     supervisor_messages = state.get("supervisor_messages", [])
     research_iterations = state.get("research_iterations", 0)
+    # All researchers of a run share one source store, so each page is summarized once
+    source_store_id = state.get("source_store_id") or new_source_store_id()
     most_recent_message = supervisor_messages[-1]
 
     # Initialize variables for single return pattern
@@ -182,39 +230,44 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
 
             # Handle ConductResearch calls (asynchronous)
             if conduct_research_calls:
-                # Launch parallel research agents
-                coros = [
-                    researcher_agent.ainvoke({
+                # Launch research agents through the scheduler, which caps concurrency
+                # per run and process-wide and queues extra units in call order
+                scheduler = ResearchScheduler(max_concurrent_researchers)
+                progress = [{} for _ in conduct_research_calls]
+                tool_results = await scheduler.run_all([
+                    lambda tool_call=tool_call, unit_progress=unit_progress: run_researcher({
                         "researcher_messages": [
                             HumanMessage(content=tool_call["args"]["research_topic"])
                         ],
-                        "research_topic": tool_call["args"]["research_topic"]
-                    }) 
-                    for tool_call in conduct_research_calls
-                ]
-
-                # Wait for all research to complete
-                tool_results = await asyncio.gather(*coros)
+                        "research_topic": tool_call["args"]["research_topic"],
+                        "research_budget": get_research_budget(tool_call["args"])
+                    }, unit_progress, source_store_id, config)
+                    for tool_call, unit_progress in zip(conduct_research_calls, progress)
+                ])
 
                 # Format research results as tool messages
                 # Each sub-agent returns compressed research findings in result["compressed_research"]
                 # We write this compressed research as the content of a ToolMessage, which allows
                 # the supervisor to later retrieve these findings via get_notes_from_tool_calls()
+                # A unit that failed or timed out reports its partial findings (or error)
+                # instead of aborting the others
                 research_tool_messages = [
                     ToolMessage(
-                        content=result.get("compressed_research", "Error synthesizing research report"),
+                        content=get_research_result_content(result, unit_progress),
                         name=tool_call["name"],
                         tool_call_id=tool_call["id"]
-                    ) for result, tool_call in zip(tool_results, conduct_research_calls)
+                    ) for result, unit_progress, tool_call in zip(tool_results, progress, conduct_research_calls)
                 ]
 
                 tool_messages.extend(research_tool_messages)
 
-                # Aggregate raw notes from all research
-                all_raw_notes = [
-                    "\n".join(result.get("raw_notes", [])) 
-                    for result in tool_results
-                ]
+                # Aggregate raw note references from all research, including units stopped early;
+                # the note bodies stay in the note store, and identical notes share one reference
+                all_raw_notes = list(dict.fromkeys(
+                    note
+                    for result, unit_progress in zip(tool_results, progress)
+                    for note in (unit_progress.get("raw_notes", []) if isinstance(result, BaseException) else result.get("raw_notes", []))
+                ))
 
         except Exception as e:
             print(f"Error in supervisor tools: {e}")
@@ -235,7 +288,8 @@ async def supervisor_tools(state: SupervisorState) -> Command[Literal["superviso
             goto=next_step,
             update={
                 "supervisor_messages": tool_messages,
-                "raw_notes": all_raw_notes
+                "raw_notes": all_raw_notes,
+                "source_store_id": source_store_id
             }
         )
 
@@ -246,4 +300,4 @@ supervisor_builder = StateGraph(SupervisorState)
 supervisor_builder.add_node("supervisor", supervisor)
 supervisor_builder.add_node("supervisor_tools", supervisor_tools)
 supervisor_builder.add_edge(START, "supervisor")
-supervisor_agent = supervisor_builder.compile()
+supervisor_agent = traced_graph(supervisor_builder.compile(name="supervisor_agent"))
@@ -0,0 +1,105 @@
+"""Near-Duplicate Page Detection.
+
+Syndicated articles and mirrors reach the researchers under different URLs
+with almost the same raw content. This module fingerprints pages so that only
+one copy of each is summarized:
+
+- Each page's normalized text is split into word shingles and reduced to a
+  64-bit SimHash fingerprint
+- Fingerprints are kept in a compact banded index; by the pigeonhole principle
+  two fingerprints within the allowed Hamming distance share at least one band,
+  so lookups only compare against candidates from matching bands
+- ``stats`` counts pages checked, near-duplicates found and the LLM
+  summarization calls that were saved
+
+Within a supervised run the index lives on the run's source store, so copies
+found by different researchers are also merged.
+"""
+
+import hashlib
+import re
+import threading
+
+from typing_extensions import Dict, List, Optional, Tuple
+
+# ===== CONFIGURATION =====
+
+# Fraction of matching fingerprint bits above which two pages count as near-duplicates
+near_duplicate_threshold = 0.9
+
+# Number of words per shingle
+shingle_words = 5
+
+# Pages with fewer words than this are never treated as near-duplicates
+min_fingerprint_words = 50
+
+fingerprint_bits = 64
+
+# ===== FINGERPRINTS =====
+
+def _shingles(text: str) -> List[str]:
+    words = re.findall(r"\w+", text.lower())
+    if len(words) < min_fingerprint_words:
+        return []
+    return [" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)]
+
+def simhash(text: str) -> Optional[int]:
+    """Return the 64-bit SimHash of text's word shingles, or None if it is too short."""
+    shingles = _shingles(text)
+    if not shingles:
+        return None
+
+    weights = [0] * fingerprint_bits
+    for shingle in set(shingles):
+        value = int.from_bytes(hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(fingerprint_bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def max_distance_for(threshold: float) -> int:
+    """Largest Hamming distance between fingerprints that still meets threshold."""
+    return int((1.0 - threshold) * fingerprint_bits)
+
+# ===== INDEX =====
+
+class NearDuplicateIndex:
+    """Banded SimHash index mapping fingerprints to the key of the first page seen."""
+
+    def __init__(self, threshold: float = near_duplicate_threshold):
+        """Create an empty index for the given similarity threshold."""
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("near-duplicate threshold must be in (0, 1]")
+        self.max_distance = max_distance_for(threshold)
+        self._bands = self.max_distance + 1
+        self._band_width = -(-fingerprint_bits // self._bands)
+        self._buckets: List[Dict[int, List[Tuple[int, str]]]] = [{} for _ in range(self._bands)]
+        self._lock = threading.Lock()
+        self.stats = {"checked": 0, "near_duplicates": 0, "summaries_saved": 0}
+
+    def _band_values(self, fingerprint: int) -> List[int]:
+        mask = (1 << self._band_width) - 1
+        return [fingerprint >> (band * self._band_width) & mask for band in range(self._bands)]
+
+    def find_or_add(self, key: str, text: str) -> Optional[str]:
+        """Return the key of an indexed near-duplicate of text, or index text under key."""
+        fingerprint = simhash(text)
+        with self._lock:
+            self.stats["checked"] += 1
+            if fingerprint is None:
+                return None
+
+            bands = self._band_values(fingerprint)
+            for band, value in enumerate(bands):
+                for other, other_key in self._buckets[band].get(value, ()):
+                    if other_key != key and bin(fingerprint ^ other).count("1") <= self.max_distance:
+                        self.stats["near_duplicates"] += 1
+                        return other_key
+
+            for band, value in enumerate(bands):
+                self._buckets[band].setdefault(value, []).append((fingerprint, key))
+            return None
+
+    def record_saved_summary(self) -> None:
+        """Count one summarization call avoided because of a near-duplicate."""
+        with self._lock:
+            self.stats["summaries_saved"] += 1
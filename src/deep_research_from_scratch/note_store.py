@@ -0,0 +1,199 @@
+"""Content-Addressed Raw Note Store.
+
+Raw notes (full tool outputs and researcher messages) used to be carried as
+text through every state layer: compress_research joined them into one
+string, supervisor_tools joined those again, and SupervisorState and
+AgentState accumulated the results with ``operator.add``, so each source
+text was held and checkpointed several times.
+
+This module stores each note body once, addressed by its SHA-256 and
+optionally zlib-compressed, in a SQLite database next to the other caches.
+Graph state only carries short references of the form ``rawnote:<hash>``:
+
+- ``put_note`` stores a text and returns its reference
+- ``get_note`` resolves a reference (plain text is returned unchanged, so
+  states written before references existed still work)
+- ``resolve_notes`` resolves a whole raw_notes list
+
+Like the summary cache, notes expire once unused for a TTL and the least
+recently used ones are evicted beyond an entry or byte cap.
+"""
+
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+from typing_extensions import List, Optional, Sequence
+
+from deep_research_from_scratch.cache import content_hash, get_cache_dir
+
+# ===== CONFIGURATION =====
+
+# Compress note bodies with zlib before storing them
+raw_note_compression = True
+
+# Compression level for zlib (1 fastest, 9 smallest)
+raw_note_compression_level = 6
+
+# Prefix that marks a raw_notes entry as a reference into the store
+raw_note_ref_prefix = "rawnote:"
+
+# Note store limits: notes expire once not written or read for the TTL, and
+# least recently used notes are evicted once either the entry or the byte cap
+# (of stored, possibly compressed, bodies) is exceeded
+raw_note_ttl_seconds = 30 * 24 * 3600
+raw_note_max_entries = 50_000
+raw_note_max_bytes = 500 * 1024 * 1024
+
+# ===== NOTE STORE =====
+
+class NoteStore:
+    """SQLite-backed store of note bodies keyed by content hash.
+
+    Writing the same text twice stores it once. Notes are evicted by TTL
+    since last access and then least-recently-used order when the entry or
+    byte cap is exceeded. ``stats`` counts writes, deduplicated writes, stored
+    bytes and evictions per process.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compress: bool = raw_note_compression,
+        ttl_seconds: float = raw_note_ttl_seconds,
+        max_entries: int = raw_note_max_entries,
+        max_bytes: int = raw_note_max_bytes,
+    ):
+        """Open (or create) the note store database at path."""
+        self.path = Path(path)
+        self.compress = compress
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stats = {"writes": 0, "deduplicated": 0, "bytes_in": 0, "bytes_stored": 0, "evictions": 0, "expirations": 0}
+        self._lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS notes ("
+            " key TEXT PRIMARY KEY,"
+            " data BLOB NOT NULL,"
+            " compressed INTEGER NOT NULL)"
+        )
+        # Stores created before eviction existed lack the size and access columns
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(notes)")}
+        if "accessed_at" not in columns:
+            self._conn.execute("ALTER TABLE notes ADD COLUMN size INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("ALTER TABLE notes ADD COLUMN accessed_at REAL NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE notes SET size = LENGTH(data), accessed_at = ?", (time.time(),))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS notes_accessed ON notes (accessed_at)")
+
+    def put(self, text: str) -> str:
+        """Store text if it is new, evict notes beyond the configured caps and return its reference."""
+        key = content_hash(text)
+        raw = text.encode("utf-8")
+        data = zlib.compress(raw, raw_note_compression_level) if self.compress else raw
+        now = time.time()
+        with self._lock:
+            inserted = self._conn.execute(
+                "INSERT OR IGNORE INTO notes (key, data, compressed, size, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, data, int(self.compress), len(data), now),
+            ).rowcount
+            self.stats["writes"] += 1
+            self.stats["bytes_in"] += len(raw)
+            if inserted:
+                self.stats["bytes_stored"] += len(data)
+            else:
+                self._conn.execute("UPDATE notes SET accessed_at = ? WHERE key = ?", (now, key))
+                self.stats["deduplicated"] += 1
+            self._evict(now)
+        return raw_note_ref_prefix + key
+
+    def get(self, ref: str) -> Optional[str]:
+        """Return the text for a reference, or None if it is not stored or has expired."""
+        key = ref[len(raw_note_ref_prefix):]
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, compressed, accessed_at FROM notes WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            data, compressed, accessed_at = row
+            if now - accessed_at > self.ttl_seconds:
+                self._conn.execute("DELETE FROM notes WHERE key = ?", (key,))
+                self.stats["expirations"] += 1
+                return None
+            self._conn.execute("UPDATE notes SET accessed_at = ? WHERE key = ?", (now, key))
+        return (zlib.decompress(data) if compressed else data).decode("utf-8")
+
+    def _evict(self, now: float) -> None:
+        """Drop expired notes, then least recently used ones until under the caps."""
+        expired = self._conn.execute(
+            "DELETE FROM notes WHERE accessed_at < ?", (now - self.ttl_seconds,)
+        ).rowcount
+        self.stats["expirations"] += max(expired, 0)
+
+        count, total_bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM notes"
+        ).fetchone()
+
+        if count <= self.max_entries and total_bytes <= self.max_bytes:
+            return
+
+        rows = self._conn.execute("SELECT key, size FROM notes ORDER BY accessed_at ASC")
+        victims = []
+        for key, size in rows:
+            if count <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            victims.append((key,))
+            count -= 1
+            total_bytes -= size
+
+        self._conn.executemany("DELETE FROM notes WHERE key = ?", victims)
+        self.stats["evictions"] += len(victims)
+
+    def __len__(self) -> int:
+        """Return the number of stored notes."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+# Global note store - will be initialized lazily
+_note_store = None
+_note_store_lock = threading.Lock()
+
+def get_note_store() -> NoteStore:
+    """Get or initialize the raw note store lazily, reopening it if the cache directory changed."""
+    global _note_store
+    path = get_cache_dir() / "raw_notes.sqlite"
+    with _note_store_lock:
+        if _note_store is None or _note_store.path != path:
+            _note_store = NoteStore(path)
+        return _note_store
+
+# ===== REFERENCES =====
+
+def is_note_ref(value: str) -> bool:
+    """Whether a raw_notes entry is a reference rather than inline text."""
+    return value.startswith(raw_note_ref_prefix)
+
+def put_note(text: str) -> str:
+    """Store a raw note and return the reference to keep in graph state."""
+    return get_note_store().put(text)
+
+def get_note(value: str) -> str:
+    """Resolve a raw_notes entry to its text; inline text is returned unchanged."""
+    if not is_note_ref(value):
+        return value
+    text = get_note_store().get(value)
+    if text is None:
+        return f"[Raw note {value} is no longer available]"
+    return text
+
+def resolve_notes(values: Sequence[str]) -> List[str]:
+    """Resolve every entry of a raw_notes list to its text."""
+    return [get_note(value) for value in values]
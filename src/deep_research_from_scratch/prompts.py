@@ -201,10 +201,13 @@ You can use any of the tools provided to you to find and read files that help an
 </Task>
 
 <Available Tools>
-You have access to file system tools and thinking tools:
+You have access to a local search tool, file system tools and thinking tools:
+- **local_search**: Search all local files at once and get the most relevant passages with file paths and line numbers
 - **list_allowed_directories**: See what directories you can access
 - **list_directory**: List files in directories
 - **read_file**: Read individual files
+- **read_file_lines** / **read_file_bytes**: Read a window of a large file by line or byte range and page through it
+- **grep_file**: Find matching lines in a large file, with line numbers and offsets to read around
 - **read_multiple_files**: Read multiple files at once
 - **search_files**: Find files containing specific content
 - **think_tool**: For reflection and strategic planning during research
@@ -216,9 +219,9 @@ You have access to file system tools and thinking tools:
 Think like a human researcher with access to a document library. Follow these steps:
 
 1. **Read the question carefully** - What specific information does the user need?
-2. **Explore available files** - Use list_allowed_directories and list_directory to understand what's available
-3. **Identify relevant files** - Use search_files if needed to find documents matching the topic
-4. **Read strategically** - Start with most relevant files, use read_multiple_files for efficiency
+2. **Search first** - Use local_search to find the passages most relevant to the question
+3. **Explore only if needed** - Use list_allowed_directories, list_directory and search_files when local_search does not surface what you need
+4. **Read strategically** - Read whole files only when the passages are not enough, use read_multiple_files for efficiency; for large files use grep_file and read_file_lines instead of read_file
 5. **After reading, pause and assess** - Do I have enough to answer? What's still missing?
 6. **Stop when you can answer confidently** - Don't keep reading for perfection
 </Instructions>
@@ -365,6 +368,32 @@ CRITICAL REQUIREMENTS:
 
 The cleaned findings will be used for final report generation, so comprehensiveness is critical."""
 
+fold_findings_prompt = """You are keeping a running record of the findings of an AI researcher while the research is still in progress. For context, today's date is {date}.
+
+RESEARCH TOPIC: {research_topic}
+
+<Findings So Far>
+{running_summary}
+</Findings So Far>
+
+<New Research Round>
+{new_round}
+</New Research Round>
+
+Update the findings so far with everything relevant from the new research round and return the complete updated findings.
+
+CRITICAL REQUIREMENTS:
+- Keep ALL existing findings; only add to them, merging duplicates
+- Preserve new information verbatim: do not lose any details, facts, names, numbers or quotes
+- Keep inline citations and list every source with its URL at the end, numbered sequentially (e.g. [1] Source Title: URL)
+- Do not add commentary about the research process"""
+
+running_summary_message = """The findings from the earlier rounds of this research have already been collected below. The messages that follow them are the rounds not yet included.
+
+<Findings So Far>
+{running_summary}
+</Findings So Far>"""
+
 final_report_generation_prompt = """Based on all the research conducted, create a comprehensive, well-structured answer to the overall research brief:
 <Research Brief>
 {research_brief}
@@ -443,6 +472,89 @@ Format the report in clear markdown with proper structure and include source ref
 </Citation Rules>
 """
 
+report_continuation_prompt = """Your previous response was interrupted before the report was finished. Continue the report exactly where it stopped.
+
+Do not repeat any text that was already written, do not restart the report, and do not add commentary about the interruption. If the last sentence or table was cut off, complete it first, then keep the same structure, citation numbering and style until the report (including its Sources section) is complete."""
+
+section_draft_prompt = """You are writing one section draft of a larger research report. Other sections are drafted in parallel from other research findings and will be merged afterwards.
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Today's date is {date}.
+
+Here are the findings this section is based on:
+<Findings>
+{findings}
+</Findings>
+
+Write a detailed section draft that:
+1. Covers every fact, figure and insight in the findings that is relevant to the research brief
+2. Uses ## for the section title and ### for subsections
+3. Is written in the same language as the research brief
+4. Does not add an introduction or conclusion for the whole report, and has no self-referential commentary
+
+<Citation Rules>
+- Keep an inline citation such as [1] for every statement taken from a source
+- End with ### Sources that lists each source you cited with its number
+- Example format:
+  [1] Source Title: URL
+  [2] Source Title: URL
+</Citation Rules>
+"""
+
+section_merge_prompt = """You are merging several section drafts of a research report into one combined draft.
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+Today's date is {date}.
+
+<Drafts>
+{drafts}
+</Drafts>
+
+Combine the drafts into one cohesive set of report sections:
+1. Merge overlapping content and remove repetition, but keep every distinct fact, figure and insight
+2. Use ## for section titles and ### for subsections
+3. Do not add an introduction or conclusion for the whole report
+
+CRITICAL: Citation numbers such as [3] are already global across the whole report. Keep every citation exactly as numbered, never renumber them, and do not add a Sources section.
+"""
+
+final_report_merge_prompt = """Based on all the research conducted, create a comprehensive, well-structured answer to the overall research brief:
+<Research Brief>
+{research_brief}
+</Research Brief>
+
+CRITICAL: Make sure the answer is written in the same language as the human messages!
+This is critical. The user will only understand the answer if it is written in the same language as their input message.
+
+Today's date is {date}.
+
+The research findings have already been drafted into report sections:
+<Drafts>
+{drafts}
+</Drafts>
+
+Here is the complete list of sources cited in the drafts:
+<Sources>
+{sources}
+</Sources>
+
+Please turn the drafts into the final report:
+1. Use # for the title, ## for sections and ### for subsections
+2. Organize the content into a cohesive structure that answers the brief, adding an introduction and conclusion where they help
+3. Merge overlapping content, but keep all specific facts and insights from the drafts
+4. Do not refer to yourself as the writer of the report or comment on what you are doing
+
+<Citation Rules>
+- Citation numbers such as [3] already refer to the source list above. Keep them exactly as numbered and never renumber them
+- End with ### Sources that lists every source above that the report cites, with its number and text unchanged
+- Each source should be a separate line item in a list, so that in markdown it is rendered as a list.
+</Citation Rules>
+"""
+
 BRIEF_CRITERIA_PROMPT = """
 <role>
 You are an expert research brief evaluator specializing in assessing whether generated research briefs accurately capture user-specified criteria without loss of important details.
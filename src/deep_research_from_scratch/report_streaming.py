@@ -0,0 +1,255 @@
+"""Streaming Final Report Generation.
+
+Writing the final report can take minutes, and with a single ``ainvoke`` call
+nothing reaches the client until the whole report is done. This module streams
+the writer model instead and forwards progress as LangGraph custom stream
+events (``stream_mode="custom"``):
+
+- ``{"event": "report_token", "content": ...}`` for every chunk of report text
+- ``{"event": "report_section", "title": ..., "level": ..., "index": ...}`` when
+  a markdown heading line is complete
+- ``{"event": "report_resumed", "content": ...}`` with the text already written
+  when an interrupted report is resumed
+- ``{"event": "report_complete", "chars": ...}`` once the report is finished
+
+The text written so far is kept per thread as a draft. If generation is
+cancelled (by cancelling the run or calling ``cancel_report_generation``), the
+draft survives, and re-running the thread from its last checkpoint continues
+the report where it stopped instead of starting over. A draft is only resumed
+for the same final-report prompt; a run on the thread with a different prompt
+discards it and starts over. Drafts are held in process memory, so resuming
+must happen in the same server process; drafts of abandoned threads expire
+after ``report_draft_ttl_seconds`` and at most ``report_draft_max_threads``
+are kept.
+"""
+
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.config import get_stream_writer
+from typing_extensions import Callable, Dict, Optional, Tuple
+
+from deep_research_from_scratch.prompts import report_continuation_prompt
+
+_HEADING_PATTERN = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+
+# ===== CONFIGURATION =====
+
+# Drafts (and cancel requests) not touched for this long are dropped
+report_draft_ttl_seconds = 24 * 3600
+
+# Maximum number of threads with a stored draft; least recently updated are evicted first
+report_draft_max_threads = 256
+
+# ===== DRAFT STORE =====
+
+class ReportGenerationCancelled(Exception):
+    """Raised when report generation is stopped by cancel_report_generation."""
+
+class ReportDrafts:
+    """In-process store of partially written reports and cancel requests, keyed by thread id.
+
+    Each draft is tagged with the key of the prompt it was written for (see
+    prompt_key); asking for a thread's draft with another key discards it.
+    Entries expire after ttl_seconds without updates, and the least recently
+    updated drafts are evicted beyond max_threads.
+    """
+
+    def __init__(self, ttl_seconds: float = report_draft_ttl_seconds, max_threads: int = report_draft_max_threads):
+        """Create an empty draft store."""
+        self.ttl_seconds = ttl_seconds
+        self.max_threads = max_threads
+        # thread id -> (draft, prompt key, last update time), least recently updated first
+        self._drafts: OrderedDict[str, Tuple[str, str, float]] = OrderedDict()
+        # thread id -> time the cancel was requested
+        self._cancel_requests: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries and the oldest drafts beyond max_threads (lock held)."""
+        while self._drafts:
+            thread_id, (_, _, updated_at) = next(iter(self._drafts.items()))
+            if now - updated_at <= self.ttl_seconds and len(self._drafts) <= self.max_threads:
+                break
+            self._drafts.popitem(last=False)
+        for thread_id, requested_at in list(self._cancel_requests.items()):
+            if now - requested_at > self.ttl_seconds:
+                del self._cancel_requests[thread_id]
+
+    def get(self, thread_id: Optional[str], key: Optional[str] = None) -> str:
+        """Return the draft written so far for a thread (empty if none).
+
+        With a key, a draft written for a different prompt is discarded and
+        nothing is returned.
+        """
+        if not thread_id:
+            return ""
+        with self._lock:
+            self._evict(time.monotonic())
+            entry = self._drafts.get(thread_id)
+            if entry is None:
+                return ""
+            if key is not None and entry[1] != key:
+                del self._drafts[thread_id]
+                return ""
+            return entry[0]
+
+    def append(self, thread_id: Optional[str], text: str, key: str = "") -> None:
+        """Append newly generated text to a thread's draft for the prompt with key."""
+        if not thread_id:
+            return
+        now = time.monotonic()
+        with self._lock:
+            draft, draft_key, _ = self._drafts.pop(thread_id, ("", key, now))
+            if draft_key != key:
+                draft = ""
+            self._drafts[thread_id] = (draft + text, key, now)
+            self._evict(now)
+
+    def start(self, thread_id: Optional[str]) -> None:
+        """Mark the start of a run for a thread, dropping cancel requests left from earlier runs."""
+        with self._lock:
+            self._cancel_requests.pop(thread_id, None)
+
+    def clear(self, thread_id: Optional[str]) -> None:
+        """Drop a thread's draft and any pending cancel request."""
+        with self._lock:
+            self._drafts.pop(thread_id, None)
+            self._cancel_requests.pop(thread_id, None)
+
+    def request_cancel(self, thread_id: str) -> None:
+        """Ask the report generation running for a thread to stop."""
+        with self._lock:
+            self._cancel_requests[thread_id] = time.monotonic()
+
+    def take_cancel_request(self, thread_id: Optional[str]) -> bool:
+        """Consume a pending cancel request for a thread, if any."""
+        with self._lock:
+            return self._cancel_requests.pop(thread_id, None) is not None
+
+report_drafts = ReportDrafts()
+
+def prompt_key(prompt: str) -> str:
+    """Return the key identifying the prompt a draft was written for."""
+    return hashlib.sha256(prompt.encode()).hexdigest()[:16]
+
+def cancel_report_generation(thread_id: str) -> None:
+    """Stop the report being written for a thread, keeping its draft for resumption.
+
+    The run fails with ReportGenerationCancelled before the report node
+    completes, so invoking the thread again from its checkpoint resumes the
+    report.
+    """
+    report_drafts.request_cancel(thread_id)
+
+def get_report_draft(thread_id: str) -> str:
+    """Return the partially written report for a thread (empty if none)."""
+    return report_drafts.get(thread_id)
+
+# ===== SECTION TRACKING =====
+
+class SectionTracker:
+    """Detect completed markdown heading lines in streamed text."""
+
+    def __init__(self, emit: Optional[Callable[[dict], None]] = None):
+        """Create a tracker that reports headings through emit."""
+        self.emit = emit
+        self.sections = 0
+        self._line = ""
+
+    def feed(self, text: str) -> None:
+        """Consume a chunk of report text, emitting any headings it completes."""
+        self._line += text
+        *lines, self._line = self._line.split("\n")
+        for line in lines:
+            self._check(line)
+
+    def flush(self) -> None:
+        """Check the final unterminated line."""
+        if self._line:
+            self._check(self._line)
+            self._line = ""
+
+    def _check(self, line: str) -> None:
+        match = _HEADING_PATTERN.match(line.strip())
+        if not match:
+            return
+        self.sections += 1
+        if self.emit:
+            self.emit({
+                "event": "report_section",
+                "title": match.group(2),
+                "level": len(match.group(1)),
+                "index": self.sections,
+            })
+
+# ===== STREAMING =====
+
+def _chunk_text(chunk) -> str:
+    """Extract the text of a streamed message chunk (string or content blocks)."""
+    content = chunk.content
+    if isinstance(content, str):
+        return content
+    return "".join(
+        block if isinstance(block, str) else block.get("text", "")
+        for block in content
+        if isinstance(block, str) or block.get("type") == "text"
+    )
+
+async def astream_report(model: BaseChatModel, prompt: str, thread_id: Optional[str] = None) -> str:
+    """Generate a report with the writer model, streaming it as custom events.
+
+    Args:
+        model: Writer model
+        prompt: Final report prompt
+        thread_id: Thread the report belongs to; enables cancel and resume
+
+    Returns:
+        The complete report text, including any resumed draft
+
+    Raises:
+        ReportGenerationCancelled: If cancel_report_generation was called for the thread
+    """
+    writer = get_stream_writer()
+    # A cancel request that arrived after the previous run ended must not stop this one
+    report_drafts.start(thread_id)
+    # A draft left by a run with a different prompt is discarded, not resumed
+    key = prompt_key(prompt)
+    draft = report_drafts.get(thread_id, key)
+    sections = SectionTracker(writer)
+
+    messages = [HumanMessage(content=prompt)]
+    if draft:
+        # Count headings already written so section indices continue where they stopped
+        sections.emit = None
+        sections.feed(draft)
+        sections.emit = writer
+        writer({"event": "report_resumed", "content": draft})
+        messages += [AIMessage(content=draft), HumanMessage(content=report_continuation_prompt)]
+
+    # Each chunk is added to the stored draft as it arrives, so a cancelled run
+    # (task cancellation or cancel_report_generation) can be resumed from it
+    report = draft
+    async for chunk in model.astream(messages):
+        text = _chunk_text(chunk)
+        if not text:
+            continue
+        report += text
+        report_drafts.append(thread_id, text, key)
+        writer({"event": "report_token", "content": text})
+        sections.feed(text)
+
+        if report_drafts.take_cancel_request(thread_id):
+            raise ReportGenerationCancelled(
+                f"Report generation cancelled after {len(report)} characters"
+            )
+
+    sections.flush()
+    writer({"event": "report_complete", "chars": len(report), "sections": sections.sections})
+    report_drafts.clear(thread_id)
+    return report
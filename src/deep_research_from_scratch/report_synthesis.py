@@ -0,0 +1,213 @@
+"""Map-Reduce Final Report Synthesis.
+
+With many researchers, joining every compressed note into one final report
+prompt can overflow the writer's context window, and that single huge call is
+the slowest step of the pipeline. Above a token threshold the report is built
+hierarchically instead:
+
+1. Map: each note is turned into a section draft in parallel
+2. Citations: every draft's local ``[n]`` citations are renumbered against one
+   run-wide source list, so the same URL gets the same number everywhere
+3. Reduce: drafts are merged in batches that fit the context window until one
+   batch remains, which is handed to the final report writer together with the
+   deduplicated source list
+
+Below the threshold the original single-prompt path is used unchanged.
+"""
+
+import asyncio
+import logging
+import re
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import HumanMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langgraph.config import get_stream_writer
+from typing_extensions import Dict, List, Sequence, Tuple
+
+from deep_research_from_scratch.models import get_writer_model
+from deep_research_from_scratch.prompts import (
+    final_report_generation_prompt,
+    final_report_merge_prompt,
+    section_draft_prompt,
+    section_merge_prompt,
+)
+from deep_research_from_scratch.source_store import canonicalize_url
+from deep_research_from_scratch.utils import get_today_str
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Findings larger than this (approximate tokens) switch to map-reduce synthesis
+map_reduce_token_threshold = 60_000
+
+# Maximum approximate tokens of section drafts merged in a single reduce call
+merge_batch_tokens = 40_000
+
+# Maximum number of section drafts written at once
+max_concurrent_section_drafts = 4
+
+_SOURCES_HEADING = re.compile(r"^\s*#{1,6}\s*\**\s*(sources|references)\b.*$", re.IGNORECASE | re.MULTILINE)
+_SOURCE_LINE = re.compile(r"^\s*(?:[-*]\s*)?\[(\d+)\]\s*(.*?)\s*[:\-–]?\s*<?(https?://[^\s>]+)>?\s*$")
+_CITATION = re.compile(r"\[(\d+(?:\s*,\s*\d+)*)\](?!\()")
+
+def text_tokens(text: str) -> int:
+    """Approximate token count of a block of text."""
+    return count_tokens_approximately([HumanMessage(content=text)])
+
+# ===== CITATIONS =====
+
+class CitationRegistry:
+    """Run-wide source list assigning one citation number per unique URL."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self.numbers: Dict[str, int] = {}
+        self.sources: List[Tuple[str, str]] = []
+
+    def number_for(self, url: str, title: str) -> int:
+        """Return the global citation number for a URL, registering it if new."""
+        # URLs pulled from prose may carry trailing punctuation
+        url = url.rstrip(".,;)")
+        key = canonicalize_url(url)
+        if key not in self.numbers:
+            self.sources.append((title or url, url))
+            self.numbers[key] = len(self.sources)
+        return self.numbers[key]
+
+    def format_sources(self) -> str:
+        """Format the source list as "[n] Title: URL" lines."""
+        return "\n".join(f"[{i}] {title}: {url}" for i, (title, url) in enumerate(self.sources, start=1))
+
+def split_sources(text: str) -> Tuple[str, List[Tuple[int, str, str]]]:
+    """Split a draft into its body and the (number, title, url) entries of its Sources section."""
+    headings = list(_SOURCES_HEADING.finditer(text))
+    if not headings:
+        return text, []
+
+    start = headings[-1].start()
+    entries = []
+    for line in text[headings[-1].end():].splitlines():
+        match = _SOURCE_LINE.match(line)
+        if match:
+            entries.append((int(match.group(1)), match.group(2).strip(), match.group(3)))
+    return text[:start].rstrip(), entries
+
+def renumber_citations(text: str, registry: CitationRegistry) -> str:
+    """Rewrite a draft's local citations to global numbers and drop its Sources section.
+
+    Citation numbers that do not appear in the draft's own source list are removed.
+    """
+    body, entries = split_sources(text)
+    mapping = {number: registry.number_for(url, title) for number, title, url in entries}
+
+    def replace(match: re.Match) -> str:
+        numbers = [mapping[int(n)] for n in match.group(1).split(",") if int(n) in mapping]
+        numbers = list(dict.fromkeys(numbers))
+        return "[" + ", ".join(str(n) for n in numbers) + "]" if numbers else ""
+
+    return _CITATION.sub(replace, body)
+
+# ===== MAP / REDUCE =====
+
+async def draft_sections(notes: Sequence[str], research_brief: str, model: BaseChatModel) -> List[str]:
+    """Write one section draft per note in parallel; a failed draft falls back to its note."""
+    semaphore = asyncio.Semaphore(max_concurrent_section_drafts)
+
+    async def draft(note: str) -> str:
+        async with semaphore:
+            prompt = section_draft_prompt.format(research_brief=research_brief, findings=note, date=get_today_str())
+            try:
+                response = await model.ainvoke([HumanMessage(content=prompt)])
+                return str(response.content)
+            except Exception as e:
+                logger.warning("Failed to draft report section: %s", e)
+                return note
+
+    return await asyncio.gather(*(draft(note) for note in notes))
+
+def group_by_tokens(drafts: Sequence[str], max_tokens: int) -> List[List[str]]:
+    """Group consecutive drafts into batches of at most max_tokens (single oversize drafts stay alone)."""
+    batches, batch, batch_tokens = [], [], 0
+    for text in drafts:
+        tokens = text_tokens(text)
+        if batch and batch_tokens + tokens > max_tokens:
+            batches.append(batch)
+            batch, batch_tokens = [], 0
+        batch.append(text)
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+def _join_drafts(drafts: Sequence[str]) -> str:
+    return "\n\n".join(f"<Draft {i}>\n{text}\n</Draft {i}>" for i, text in enumerate(drafts, start=1))
+
+async def reduce_drafts(drafts: List[str], research_brief: str, model: BaseChatModel) -> List[str]:
+    """Merge drafts batch by batch until they fit into a single merge call.
+
+    Drafts that are each too large to share a batch are returned as they are.
+    A batch whose merge call fails is joined as is; its citations are already
+    renumbered against the run-wide source list.
+    """
+    while len(drafts) > 1:
+        batches = group_by_tokens(drafts, merge_batch_tokens)
+        # Stop once everything fits one call, or when drafts are too large to combine further
+        if len(batches) == 1 or len(batches) == len(drafts):
+            break
+
+        async def merge(batch: List[str]) -> str:
+            if len(batch) == 1:
+                return batch[0]
+            prompt = section_merge_prompt.format(research_brief=research_brief, drafts=_join_drafts(batch), date=get_today_str())
+            try:
+                response = await model.ainvoke([HumanMessage(content=prompt)])
+                return str(response.content)
+            except Exception as e:
+                logger.warning("Failed to merge report sections: %s", e)
+                return "\n\n".join(batch)
+
+        drafts = list(await asyncio.gather(*(merge(batch) for batch in batches)))
+    return drafts
+
+async def build_final_report_prompt(notes: Sequence[str], research_brief: str) -> str:
+    """Build the prompt for the final report writer.
+
+    Small note sets use the single-prompt path. Larger ones are first mapped
+    to section drafts with deduplicated citations and reduced until they fit
+    one merge prompt.
+
+    Args:
+        notes: Compressed research notes from all researchers
+        research_brief: The research brief
+
+    Returns:
+        Prompt to stream the final report from
+    """
+    findings = "\n".join(notes)
+    if text_tokens(findings) <= map_reduce_token_threshold or len(notes) < 2:
+        return final_report_generation_prompt.format(
+            research_brief=research_brief,
+            findings=findings,
+            date=get_today_str()
+        )
+
+    writer = get_stream_writer()
+    model = get_writer_model()
+
+    writer({"event": "report_stage", "stage": "draft_sections", "notes": len(notes)})
+    drafts = await draft_sections(notes, research_brief, model)
+
+    registry = CitationRegistry()
+    drafts = [renumber_citations(text, registry) for text in drafts]
+
+    writer({"event": "report_stage", "stage": "merge_sections", "drafts": len(drafts), "sources": len(registry.sources)})
+    drafts = await reduce_drafts(drafts, research_brief, model)
+
+    return final_report_merge_prompt.format(
+        research_brief=research_brief,
+        drafts=_join_drafts(drafts),
+        sources=registry.format_sources(),
+        date=get_today_str()
+    )
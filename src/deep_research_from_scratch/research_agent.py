@@ -5,16 +5,22 @@ This module implements a research agent that can perform iterative web searches
 and synthesis to answer complex research questions.
 """
 
-from pydantic import BaseModel, Field
-from typing_extensions import Literal
+import asyncio
+
+from typing_extensions import List, Literal, Union
 
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
-from langchain.chat_models import init_chat_model
+from langchain_core.messages import SystemMessage, filter_messages
 
+from deep_research_from_scratch.budgets import budget_stop, count_tokens_used, start_budget
+from deep_research_from_scratch.context_compaction import compact_context, is_compacted
+from deep_research_from_scratch.incremental_compression import compression_messages, fold_findings
+from deep_research_from_scratch.models import get_bound_model, get_compress_model, get_research_model
+from deep_research_from_scratch.note_store import put_note
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
-from deep_research_from_scratch.utils import tavily_search, get_today_str, think_tool
-from deep_research_from_scratch.prompts import research_agent_prompt, compress_research_system_prompt, compress_research_human_message
+from deep_research_from_scratch.utils import tavily_search, think_tool, execute_tool_calls
+from deep_research_from_scratch.prompts import research_agent_prompt
+from deep_research_from_scratch.tracing import traced_graph
 
 # ===== CONFIGURATION =====
 
@@ -22,78 +28,72 @@ from deep_research_from_scratch.prompts import research_agent_prompt, compress_r
 tools = [tavily_search, think_tool]
 tools_by_name = {tool.name: tool for tool in tools}
 
-# Initialize models - Primary: Google Gemini | Alternatives: OpenAI, Anthropic
-model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)  # Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
-model_with_tools = model.bind_tools(tools)
-summarization_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)  # Alternatives: "openai:gpt-4.1-mini", "anthropic:claude-haiku-3-5-20241022"
-compress_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0, max_tokens=32000)  # Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
+def get_model_with_tools():
+    """Research model bound to the researcher tools (built on first use)."""
+    return get_bound_model(get_research_model(), tools)
 
 # ===== AGENT NODES =====
 
-def llm_call(state: ResearcherState):
+async def llm_call(state: ResearcherState):
     """Analyze current state and decide on next actions.
 
     The model analyzes the current conversation state and decides whether to:
     1. Call search tools to gather more information
     2. Provide a final answer based on gathered information
 
-    Returns updated state with the model's response.
+    Returns updated state with the model's response and budget accounting.
     """
+    response = await get_model_with_tools().ainvoke(
+        [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
+    )
+
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt)] + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": [response],
+        **start_budget(state),
+        **count_tokens_used(state, response),
     }
 
-def tool_node(state: ResearcherState):
+async def tool_node(state: ResearcherState):
     """Execute all tool calls from the previous LLM response.
 
-    Executes all tool calls from the previous LLM responses.
+    Executes all tool calls from the previous LLM responses concurrently, so
+    several searches issued in one turn cost a single round-trip of wall time.
     Returns updated state with tool execution results.
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
 
-    # Execute all tool calls
-    observations = []
-    for tool_call in tool_calls:
-        tool = tools_by_name[tool_call["name"]]
-        observations.append(tool.invoke(tool_call["args"]))
-
-    # Create tool message outputs
-    tool_outputs = [
-        ToolMessage(
-            content=observation,
-            name=tool_call["name"],
-            tool_call_id=tool_call["id"]
-        ) for observation, tool_call in zip(observations, tool_calls)
-    ]
+    # Execute all tool calls concurrently; failures become error ToolMessages
+    tool_outputs = await execute_tool_calls(tool_calls, tools_by_name)
 
-    return {"researcher_messages": tool_outputs}
+    return {
+        "researcher_messages": tool_outputs,
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+    }
 
-def compress_research(state: ResearcherState) -> dict:
+async def compress_research(state: ResearcherState) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
     a compressed summary suitable for the supervisor's decision-making.
     """
 
-    system_message = compress_research_system_prompt.format(date=get_today_str())
-    messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
-    response = compress_model.invoke(messages)
+    # Only the rounds not yet folded into the running summary are compressed from scratch
+    # Restoring compacted outputs reads the note store, keep it off the event loop
+    messages = await asyncio.to_thread(compression_messages, state)
+    response = await get_compress_model().ainvoke(messages)
 
-    # Extract raw notes from tool and AI messages
+    # Extract raw notes from tool and AI messages (compacted outputs are already in raw_notes)
+    # and store them once, keeping only the reference in state
     raw_notes = [
         str(m.content) for m in filter_messages(
-            state["researcher_messages"], 
+            state["researcher_messages"],
             include_types=["tool", "ai"]
-        )
+        ) if not is_compacted(m)
     ]
 
     return {
         "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "raw_notes": [await asyncio.to_thread(put_note, "\n".join(raw_notes))]
     }
 
 # ===== ROUTING LOGIC =====
@@ -111,12 +111,27 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
+    # Stop early with what we have once any budget is exhausted
+    if last_message.tool_calls and budget_stop(state):
+        return "compress_research"
     # If the LLM makes a tool call, continue to tool execution
     if last_message.tool_calls:
         return "tool_node"
     # Otherwise, we have a final answer
     return "compress_research"
 
+def should_continue_after_tools(state: ResearcherState) -> Union[List[str], Literal["compress_research"]]:
+    """Determine whether another model turn fits in the researcher's budgets.
+
+    Returns:
+        ["llm_call", "fold_findings"]: Continue the research loop while the
+            latest rounds are folded into the running summary in parallel
+        "compress_research": A budget is exhausted, compress findings so far
+    """
+    if budget_stop(state):
+        return "compress_research"
+    return ["llm_call", "fold_findings"]
+
 # ===== GRAPH CONSTRUCTION =====
 
 # Build the agent workflow
@@ -125,6 +140,8 @@ agent_builder = StateGraph(ResearcherState, output_schema=ResearcherOutputState)
 # Add nodes to the graph
 agent_builder.add_node("llm_call", llm_call)
 agent_builder.add_node("tool_node", tool_node)
+agent_builder.add_node("compact_context", compact_context)
+agent_builder.add_node("fold_findings", fold_findings)
 agent_builder.add_node("compress_research", compress_research)
 
 # Add edges to connect nodes
@@ -137,8 +154,17 @@ agent_builder.add_conditional_edges(
         "compress_research": "compress_research", # Provide final answer
     },
 )
-agent_builder.add_edge("tool_node", "llm_call") # Loop back for more research
+agent_builder.add_edge("tool_node", "compact_context")
+agent_builder.add_conditional_edges(
+    "compact_context",
+    should_continue_after_tools,
+    {
+        "llm_call": "llm_call", # Loop back for more research
+        "fold_findings": "fold_findings", # Update running summary in parallel
+        "compress_research": "compress_research",  # Budget exhausted
+    },
+)
 agent_builder.add_edge("compress_research", END)
 
 # Compile the agent
-researcher_agent = agent_builder.compile()
+researcher_agent = traced_graph(agent_builder.compile(name="researcher_agent"))
@@ -12,47 +12,45 @@ The system orchestrates the complete research workflow from initial user
 input through final report delivery.
 """
 
-from langchain_core.messages import HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.utils import get_today_str
-from deep_research_from_scratch.prompts import final_report_generation_prompt
+from deep_research_from_scratch.models import get_writer_model
+from deep_research_from_scratch.report_streaming import astream_report
+from deep_research_from_scratch.report_synthesis import build_final_report_prompt
 from deep_research_from_scratch.state_scope import AgentState, AgentInputState
 from deep_research_from_scratch.research_agent_scope import clarify_with_user, write_research_brief
 from deep_research_from_scratch.multi_agent_supervisor import supervisor_agent
+from deep_research_from_scratch.tracing import traced_graph
 
 # ===== Config =====
 
-from langchain.chat_models import init_chat_model
 # Primary: Google Gemini | Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
-writer_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0, max_tokens=32000)
+# The writer model is created lazily on first use (see models.get_writer_model)
 
 # ===== FINAL REPORT GENERATION =====
 
-from deep_research_from_scratch.state_scope import AgentState
-
-async def final_report_generation(state: AgentState):
+async def final_report_generation(state: AgentState, config: RunnableConfig):
     """
     Final report generation node.
 
-    Synthesizes all research findings into a comprehensive final report
+    Synthesizes all research findings into a comprehensive final report,
+    switching to map-reduce synthesis for large note sets (see report_synthesis).
+    The report is streamed as custom events (see report_streaming) and can be
+    cancelled and resumed per thread.
     """
 
     notes = state.get("notes", [])
 
-    findings = "\n".join(notes)
-
-    final_report_prompt = final_report_generation_prompt.format(
-        research_brief=state.get("research_brief", ""),
-        findings=findings,
-        date=get_today_str()
-    )
+    # Large note sets are drafted per note and merged before the final call
+    final_report_prompt = await build_final_report_prompt(notes, state.get("research_brief", ""))
 
-    final_report = await writer_model.ainvoke([HumanMessage(content=final_report_prompt)])
+    thread_id = config.get("configurable", {}).get("thread_id")
+    final_report = await astream_report(get_writer_model(), final_report_prompt, thread_id)
 
     return {
-        "final_report": final_report.content, 
-        "messages": ["Here is the final report: " + final_report.content],
+        "final_report": final_report, 
+        "messages": ["Here is the final report: " + final_report],
     }
 
 # ===== GRAPH CONSTRUCTION =====
@@ -72,4 +70,4 @@ deep_researcher_builder.add_edge("supervisor_subgraph", "final_report_generation
 deep_researcher_builder.add_edge("final_report_generation", END)
 
 # Compile the full workflow
-agent = deep_researcher_builder.compile()
+agent = traced_graph(deep_researcher_builder.compile(name="research_agent_full"))
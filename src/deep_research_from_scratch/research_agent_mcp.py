@@ -7,50 +7,71 @@ server for local document research and analysis.
 
 Key features:
 - MCP server integration for tool access
-- Async operations for concurrent tool execution (required by MCP protocol)
+- Fully async nodes (MCP requires async; model calls use ainvoke)
 - Filesystem operations for local document research
+- Local BM25 index over the research files, exposed as the local_search tool
+- Native mmap-based readers for paging through large files without Node
 - Secure directory access with permission checking
 - Research compression for efficient processing
 - Lazy MCP client initialization for LangGraph Platform compatibility
+- Warm MCP session pool with cached tool discovery and tool binding
 - WSL support using Windows Node.js via cmd.exe
 """
 
+import asyncio
+import logging
 import os
 import platform
+import time
 
-from typing_extensions import Literal
+from typing_extensions import List, Literal, Union
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import SystemMessage, HumanMessage, ToolMessage, filter_messages
+from langchain_core.messages import SystemMessage, filter_messages
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph, START, END
 
-from deep_research_from_scratch.prompts import research_agent_prompt_with_mcp, compress_research_system_prompt, compress_research_human_message
+from deep_research_from_scratch.budgets import budget_stop, count_tokens_used, start_budget
+from deep_research_from_scratch.context_compaction import compact_context, is_compacted
+from deep_research_from_scratch.file_reader import file_reader_tools
+from deep_research_from_scratch.incremental_compression import compression_messages, fold_findings
+from deep_research_from_scratch.local_index import local_search
+from deep_research_from_scratch.mcp_sessions import MCPSessionPool
+from deep_research_from_scratch.models import get_bound_model, get_compress_model, get_research_model
+from deep_research_from_scratch.note_store import put_note
+from deep_research_from_scratch.prompts import research_agent_prompt_with_mcp
 from deep_research_from_scratch.state_research import ResearcherState, ResearcherOutputState
-from deep_research_from_scratch.utils import get_today_str, think_tool, get_current_dir, convert_path_for_mcp
+from deep_research_from_scratch.tracing import trace_span, traced_graph
+from deep_research_from_scratch.utils import get_today_str, think_tool, get_current_dir, convert_path_for_mcp, execute_tool_calls
+
+logger = logging.getLogger(__name__)
 
 # ===== CONFIGURATION =====
 
-# Determine command and args based on platform (WSL needs Windows Node.js)
-files_path = convert_path_for_mcp(get_current_dir() / "files")
-
-if platform.system() == "Linux" and "microsoft" in platform.release().lower():
-    # On WSL, use cmd.exe to invoke Windows npx (Windows Node.js)
-    mcp_command = "cmd.exe"
-    mcp_args = ["/c", "npx", "-y", "@modelcontextprotocol/server-filesystem", files_path]
-else:
-    # On other platforms, use standard npx
-    mcp_command = "npx"
-    mcp_args = ["-y", "@modelcontextprotocol/server-filesystem", files_path]
-
-# MCP server configuration for filesystem access
-mcp_config = {
-    "filesystem": {
-        "command": mcp_command,
-        "args": mcp_args,
-        "transport": "stdio"  # Communication via stdin/stdout
+def get_mcp_config() -> dict:
+    """Build the MCP server configuration for filesystem access.
+
+    Resolved on first use rather than at import, since detecting WSL and
+    converting the files path may spawn a subprocess.
+    """
+    files_path = convert_path_for_mcp(get_current_dir() / "files")
+
+    # Determine command and args based on platform (WSL needs Windows Node.js)
+    if platform.system() == "Linux" and "microsoft" in platform.release().lower():
+        # On WSL, use cmd.exe to invoke Windows npx (Windows Node.js)
+        mcp_command = "cmd.exe"
+        mcp_args = ["/c", "npx", "-y", "@modelcontextprotocol/server-filesystem", files_path]
+    else:
+        # On other platforms, use standard npx
+        mcp_command = "npx"
+        mcp_args = ["-y", "@modelcontextprotocol/server-filesystem", files_path]
+
+    return {
+        "filesystem": {
+            "command": mcp_command,
+            "args": mcp_args,
+            "transport": "stdio"  # Communication via stdin/stdout
+        }
     }
-}
 
 # Global client variable - will be initialized lazily
 _client = None
@@ -59,12 +80,50 @@ def get_mcp_client():
     """Get or initialize MCP client lazily to avoid issues with LangGraph Platform."""
     global _client
     if _client is None:
-        _client = MultiServerMCPClient(mcp_config)
+        _client = MultiServerMCPClient(get_mcp_config())
     return _client
 
-# Initialize models - Primary: Google Gemini | Alternatives: OpenAI, Anthropic
-compress_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0, max_tokens=32000)  # Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
-model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)  # Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
+# Number of warm filesystem server sessions kept for concurrent MCP researchers
+mcp_session_pool_size = 3
+
+# Global session pool - will be initialized lazily
+_session_pool = None
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """Get or initialize the persistent MCP session pool lazily."""
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = MCPSessionPool(get_mcp_client(), "filesystem", size=mcp_session_pool_size)
+    return _session_pool
+
+async def aget_mcp_session_pool() -> MCPSessionPool:
+    """Get the session pool from async code, building the MCP config off the event loop."""
+    if _session_pool is None:
+        # The config resolves filesystem paths (and may spawn a subprocess on WSL)
+        return await asyncio.to_thread(get_mcp_session_pool)
+    return _session_pool
+
+# Native tools offered alongside the MCP filesystem tools
+local_tools = [local_search, *file_reader_tools, think_tool]
+local_tools_by_name = {tool.name: tool for tool in local_tools}
+
+async def get_model_with_tools():
+    """Return the model bound to MCP tools + local tools, rebinding only when the tool list changes.
+
+    Bound models are shared through the model registry, keyed by the pool's
+    tools fingerprint. If the MCP server cannot be started (e.g. Node.js is
+    not installed), the model is bound to the local tools alone so research
+    can go on without it.
+    """
+    pool = await aget_mcp_session_pool()
+    try:
+        mcp_tools = await pool.get_tools()
+        fingerprint = pool.tools_fingerprint
+    except Exception as e:
+        logger.warning("MCP filesystem server unavailable, using local tools only: %s", e)
+        mcp_tools, fingerprint = [], "local"
+
+    return get_bound_model(get_research_model(), mcp_tools + local_tools, fingerprint)
 
 # ===== AGENT NODES =====
 
@@ -72,29 +131,24 @@ async def llm_call(state: ResearcherState):
     """Analyze current state and decide on tool usage with MCP integration.
 
     This node:
-    1. Retrieves available tools from MCP server
-    2. Binds tools to the language model
+    1. Retrieves available tools from the warm MCP session pool (cached)
+    2. Reuses the model bound to those tools unless the tool list changed
     3. Processes user input and decides on tool usage
 
     Returns updated state with model response.
     """
-    # Get available tools from MCP server
-    client = get_mcp_client()
-    mcp_tools = await client.get_tools()
-
-    # Use MCP tools for local document access
-    tools = mcp_tools + [think_tool]
-
-    # Initialize model with tool binding
-    model_with_tools = model.bind_tools(tools)
+    # Model bound to MCP tools (local document access) + local_search and think_tool
+    model_with_tools = await get_model_with_tools()
 
     # Process user input with system prompt
+    response = await model_with_tools.ainvoke(
+        [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))] + state["researcher_messages"]
+    )
+
     return {
-        "researcher_messages": [
-            model_with_tools.invoke(
-                [SystemMessage(content=research_agent_prompt_with_mcp.format(date=get_today_str()))] + state["researcher_messages"]
-            )
-        ]
+        "researcher_messages": [response],
+        **start_budget(state),
+        **count_tokens_used(state, response),
     }
 
 async def tool_node(state: ResearcherState):
@@ -102,51 +156,35 @@ async def tool_node(state: ResearcherState):
 
     This node:
     1. Retrieves current tool calls from the last message
-    2. Executes all tool calls using async operations (required for MCP)
-    3. Returns formatted tool results
+    2. Borrows a pooled MCP session only if a call names an MCP tool
+    3. Executes all tool calls concurrently using async operations (required for MCP)
+    4. Returns formatted tool results, with failed calls as error ToolMessages
 
     Note: MCP requires async operations due to inter-process communication
     with the MCP server subprocess. This is unavoidable.
     """
     tool_calls = state["researcher_messages"][-1].tool_calls
 
-    async def execute_tools():
-        """Execute all tool calls. MCP tools require async execution."""
-        # Get fresh tool references from MCP server
-        client = get_mcp_client()
-        mcp_tools = await client.get_tools()
-        tools = mcp_tools + [think_tool]
-        tools_by_name = {tool.name: tool for tool in tools}
-
-        # Execute tool calls (sequentially for reliability)
-        observations = []
-        for tool_call in tool_calls:
-            tool = tools_by_name[tool_call["name"]]
-            if tool_call["name"] == "think_tool":
-                # think_tool is sync, use regular invoke
-                observation = tool.invoke(tool_call["args"])
-            else:
-                # MCP tools are async, use ainvoke
-                observation = await tool.ainvoke(tool_call["args"])
-            observations.append(observation)
-
-        # Format results as tool messages
-        tool_outputs = [
-            ToolMessage(
-                content=observation,
-                name=tool_call["name"],
-                tool_call_id=tool_call["id"],
-            )
-            for observation, tool_call in zip(observations, tool_calls)
-        ]
-
-        return tool_outputs
-
-    messages = await execute_tools()
-
-    return {"researcher_messages": messages}
-
-def compress_research(state: ResearcherState) -> dict:
+    if all(tool_call["name"] in local_tools_by_name for tool_call in tool_calls):
+        # Native-only rounds need neither a pooled session nor the Node server behind it
+        messages = await execute_tool_calls(tool_calls, local_tools_by_name)
+    else:
+        # Borrow a warm session so tool calls reuse its running server process
+        requested_at = time.monotonic()
+        pool = await aget_mcp_session_pool()
+        async with pool.session() as pooled:
+            tools_by_name = {tool.name: tool for tool in pooled.tools} | local_tools_by_name
+
+            # Execute tool calls concurrently (native tools run in worker threads via ainvoke)
+            with trace_span("mcp.session", kind="mcp", queue_wait_seconds=time.monotonic() - requested_at, tool_calls=len(tool_calls)):
+                messages = await execute_tool_calls(tool_calls, tools_by_name)
+
+    return {
+        "researcher_messages": messages,
+        "tool_call_iterations": state.get("tool_call_iterations", 0) + 1,
+    }
+
+async def compress_research(state: ResearcherState) -> dict:
     """Compress research findings into a concise summary.
 
     Takes all the research messages and tool outputs and creates
@@ -156,22 +194,24 @@ def compress_research(state: ResearcherState) -> dict:
     file-based research content from MCP tools.
     """
 
-    system_message = compress_research_system_prompt.format(date=get_today_str())
-    messages = [SystemMessage(content=system_message)] + state.get("researcher_messages", []) + [HumanMessage(content=compress_research_human_message)]
+    # Only the rounds not yet folded into the running summary are compressed from scratch
+    # Restoring compacted outputs reads the note store, keep it off the event loop
+    messages = await asyncio.to_thread(compression_messages, state)
 
-    response = compress_model.invoke(messages)
+    response = await get_compress_model().ainvoke(messages)
 
-    # Extract raw notes from tool and AI messages
+    # Extract raw notes from tool and AI messages (compacted outputs are already in raw_notes)
+    # and store them once, keeping only the reference in state
     raw_notes = [
         str(m.content) for m in filter_messages(
-            state["researcher_messages"], 
+            state["researcher_messages"],
             include_types=["tool", "ai"]
-        )
+        ) if not is_compacted(m)
     ]
 
     return {
         "compressed_research": str(response.content),
-        "raw_notes": ["\n".join(raw_notes)]
+        "raw_notes": [await asyncio.to_thread(put_note, "\n".join(raw_notes))]
     }
 
 # ===== ROUTING LOGIC =====
@@ -185,12 +225,25 @@ def should_continue(state: ResearcherState) -> Literal["tool_node", "compress_re
     messages = state["researcher_messages"]
     last_message = messages[-1]
 
+    # Stop early with what we have once any budget is exhausted
+    if last_message.tool_calls and budget_stop(state):
+        return "compress_research"
     # Continue to tool execution if tools were called
     if last_message.tool_calls:
         return "tool_node"
     # Otherwise, compress research findings
     return "compress_research"
 
+def should_continue_after_tools(state: ResearcherState) -> Union[List[str], Literal["compress_research"]]:
+    """Determine whether another model turn fits in the researcher's budgets.
+
+    While research continues, the latest rounds are folded into the running
+    summary in parallel with the next model call.
+    """
+    if budget_stop(state):
+        return "compress_research"
+    return ["llm_call", "fold_findings"]
+
 # ===== GRAPH CONSTRUCTION =====
 
 # Build the agent workflow
@@ -199,6 +252,8 @@ agent_builder_mcp = StateGraph(ResearcherState, output_schema=ResearcherOutputSt
 # Add nodes to the graph
 agent_builder_mcp.add_node("llm_call", llm_call)
 agent_builder_mcp.add_node("tool_node", tool_node)
+agent_builder_mcp.add_node("compact_context", compact_context)
+agent_builder_mcp.add_node("fold_findings", fold_findings)
 agent_builder_mcp.add_node("compress_research", compress_research)
 
 # Add edges to connect nodes
@@ -211,8 +266,17 @@ agent_builder_mcp.add_conditional_edges(
         "compress_research": "compress_research",  # Compress research findings
     },
 )
-agent_builder_mcp.add_edge("tool_node", "llm_call")  # Loop back for more processing
+agent_builder_mcp.add_edge("tool_node", "compact_context")
+agent_builder_mcp.add_conditional_edges(
+    "compact_context",
+    should_continue_after_tools,
+    {
+        "llm_call": "llm_call",  # Loop back for more processing
+        "fold_findings": "fold_findings",  # Update running summary in parallel
+        "compress_research": "compress_research",  # Budget exhausted
+    },
+)
 agent_builder_mcp.add_edge("compress_research", END)
 
 # Compile the agent
-agent_mcp = agent_builder_mcp.compile()
+agent_mcp = traced_graph(agent_builder_mcp.compile(name="research_agent_mcp"))
@@ -12,13 +12,14 @@ whether sufficient context exists to proceed with research.
 from datetime import datetime
 from typing_extensions import Literal
 
-from langchain.chat_models import init_chat_model
 from langchain_core.messages import HumanMessage, AIMessage, get_buffer_string
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Command
 
+from deep_research_from_scratch.models import get_scoping_model
 from deep_research_from_scratch.prompts import clarify_with_user_instructions, transform_messages_into_research_topic_prompt
 from deep_research_from_scratch.state_scope import AgentState, ClarifyWithUser, ResearchQuestion, AgentInputState
+from deep_research_from_scratch.tracing import traced_graph
 
 # ===== UTILITY FUNCTIONS =====
 
@@ -28,13 +29,8 @@ def get_today_str() -> str:
 
 # ===== CONFIGURATION =====
 
-# Initialize model - Primary: Google Gemini | Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
-
-model = init_chat_model(
-    model="gemini-2.5-flash-lite",
-    model_provider="google_genai",
-    temperature=0.0
-)
+# Model - Primary: Google Gemini | Alternatives: "openai:gpt-4.1", "anthropic:claude-sonnet-4-20250514"
+# Created lazily on first use via the shared registry (see models.get_scoping_model)
 
 # ===== WORKFLOW NODES =====
 
@@ -46,7 +42,7 @@ def clarify_with_user(state: AgentState) -> Command[Literal["write_research_brie
     Routes to either research brief generation or ends with a clarification question.
     """
     # Set up structured output model
-    structured_output_model = model.with_structured_output(ClarifyWithUser)
+    structured_output_model = get_scoping_model().with_structured_output(ClarifyWithUser)
 
     # Invoke the model with clarification instructions
     response = structured_output_model.invoke([
@@ -76,7 +72,7 @@ def write_research_brief(state: AgentState):
     and contains all necessary details for effective research.
     """
     # Set up structured output model
-    structured_output_model = model.with_structured_output(ResearchQuestion)
+    structured_output_model = get_scoping_model().with_structured_output(ResearchQuestion)
 
     # Generate research brief from conversation history
     response = structured_output_model.invoke([
@@ -106,4 +102,4 @@ deep_researcher_builder.add_edge(START, "clarify_with_user")
 deep_researcher_builder.add_edge("write_research_brief", END)
 
 # Compile the workflow
-scope_research = deep_researcher_builder.compile()
+scope_research = traced_graph(deep_researcher_builder.compile(name="scope_research"))
@@ -0,0 +1,177 @@
+"""Research Unit Scheduling.
+
+This module bounds how many research units (researcher sub-agent runs) execute
+at once. Each supervisor step gets its own scheduler capped at the per-run
+concurrency limit, and every scheduler also draws from a process-wide limiter
+so that concurrent graph runs in the same server cannot together exceed the
+global cap. Units beyond the limits wait in a priority queue (FIFO within a
+priority) and each unit runs under its own timeout.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+
+from typing_extensions import Any, Awaitable, Callable, List, Optional
+
+from deep_research_from_scratch.tracing import trace_span
+
+# ===== CONFIGURATION =====
+
+# Maximum number of research units running at once across all graph runs in this process
+global_max_concurrent_researchers = 6
+
+# Wall-clock limit for a single research unit, in seconds
+research_unit_timeout_seconds = 900.0
+
+# ===== PRIORITY SEMAPHORE =====
+
+class PrioritySemaphore:
+    """Async semaphore that grants waiting slots by (priority, arrival order).
+
+    Lower priority values are served first; waiters with equal priority are
+    served in FIFO order.
+    """
+
+    def __init__(self, value: int):
+        """Create a semaphore with value available slots."""
+        if value < 1:
+            raise ValueError("PrioritySemaphore value must be at least 1")
+        self._value = value
+        self._waiters: list = []
+        self._counter = itertools.count()
+
+    @property
+    def queued(self) -> int:
+        """Number of acquirers currently waiting for a slot."""
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    async def acquire(self, priority: int = 0) -> None:
+        """Wait for a free slot, honoring priority among waiters."""
+        if self._value > 0 and not self.queued:
+            self._value -= 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        try:
+            await future
+        except asyncio.CancelledError:
+            # The slot may have been granted just before cancellation; hand it on
+            if future.done() and not future.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        """Release a slot to the highest-priority live waiter."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._value += 1
+
+# Process-wide limiter shared by every ResearchScheduler
+global_research_limiter = PrioritySemaphore(global_max_concurrent_researchers)
+
+# ===== RESEARCH SCHEDULER =====
+
+class ResearchUnitTimeout(TimeoutError):
+    """Raised when a research unit exceeds its wall-clock limit."""
+
+class ResearchScheduler:
+    """Run research units under a per-run and a global concurrency cap.
+
+    Units are passed as zero-argument coroutine factories so nothing starts
+    until a slot is granted. Failures, timeouts and cancellations of one unit
+    are returned in its result slot without affecting the others.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        unit_timeout: Optional[float] = research_unit_timeout_seconds,
+        global_limiter: Optional[PrioritySemaphore] = None,
+    ):
+        """Create a scheduler allowing max_concurrency units of this run at once."""
+        self.limiter = PrioritySemaphore(max_concurrency)
+        self.global_limiter = global_limiter or global_research_limiter
+        self.unit_timeout = unit_timeout
+        self.stats = {"started": 0, "completed": 0, "failed": 0, "timed_out": 0, "cancelled": 0, "queue_wait_seconds": 0.0}
+        self._tasks: set[asyncio.Task] = set()
+
+    async def run_unit(
+        self,
+        factory: Callable[[], Awaitable[Any]],
+        priority: int = 0,
+        timeout: Optional[float] = None,
+    ) -> Any:
+        """Run one unit once both a run slot and a global slot are available.
+
+        Raises:
+            ResearchUnitTimeout: If the unit runs longer than its timeout
+        """
+        timeout = timeout if timeout is not None else self.unit_timeout
+        queued_at = time.monotonic()
+
+        await self.limiter.acquire(priority)
+        try:
+            await self.global_limiter.acquire(priority)
+            try:
+                queue_wait = time.monotonic() - queued_at
+                self.stats["queue_wait_seconds"] += queue_wait
+                self.stats["started"] += 1
+                with trace_span("research_unit", kind="unit", queue_wait_seconds=queue_wait, priority=priority):
+                    try:
+                        return await asyncio.wait_for(factory(), timeout=timeout)
+                    except TimeoutError as e:
+                        raise ResearchUnitTimeout(f"Research unit timed out after {timeout:g}s") from e
+            finally:
+                self.global_limiter.release()
+        finally:
+            self.limiter.release()
+
+    async def run_all(
+        self,
+        factories: List[Callable[[], Awaitable[Any]]],
+        priorities: Optional[List[int]] = None,
+        timeout: Optional[float] = None,
+    ) -> List[Any]:
+        """Run all units and return their results in input order.
+
+        A unit that fails, times out or is cancelled contributes its exception
+        object instead of a result. If the caller is cancelled, every pending
+        and running unit is cancelled too.
+        """
+        priorities = priorities or [0] * len(factories)
+        tasks = [
+            asyncio.ensure_future(self.run_unit(factory, priority, timeout))
+            for factory, priority in zip(factories, priorities)
+        ]
+        self._tasks.update(tasks)
+
+        try:
+            results = await asyncio.gather(*tasks, return_exceptions=True)
+        except asyncio.CancelledError:
+            self.cancel()
+            raise
+        finally:
+            self._tasks.difference_update(tasks)
+
+        for result in results:
+            if isinstance(result, ResearchUnitTimeout):
+                self.stats["timed_out"] += 1
+            elif isinstance(result, asyncio.CancelledError):
+                self.stats["cancelled"] += 1
+            elif isinstance(result, BaseException):
+                self.stats["failed"] += 1
+            else:
+                self.stats["completed"] += 1
+
+        return results
+
+    def cancel(self) -> None:
+        """Cancel every queued or running unit of this scheduler."""
+        for task in self._tasks:
+            task.cancel()
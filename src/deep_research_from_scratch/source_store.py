@@ -0,0 +1,244 @@
+"""Run-Scoped Shared Source Store.
+
+Parallel researchers in one run often find the same pages, and each used to
+fetch and summarize them independently. This module gives every run one
+shared store of sources:
+
+- URLs are canonicalized (tracking parameters, fragments, ``www.``/AMP
+  variants and known redirect wrappers removed) so trivially different links
+  to the same page share one entry
+- Each page is summarized once per run; concurrent researchers asking for the
+  same page wait for the single in-flight summary
+- Every source gets a stable ID (``S1``, ``S2``, ...) that all researchers see,
+  so citations agree across researchers
+- Near-duplicate pages under other URLs can be aliased to an existing source,
+  sharing its summary and ID (see near_duplicates.py)
+
+The store for the current run is found through the ``current_source_store``
+context variable, which the supervisor sets for each researcher it starts
+with ``use_source_store``. A store is pinned while researchers use it and is
+only evicted once released and idle.
+"""
+
+import asyncio
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from typing_extensions import Awaitable, Callable, Dict, Iterator, Optional
+
+from deep_research_from_scratch.near_duplicates import NearDuplicateIndex
+
+# ===== CONFIGURATION =====
+
+# Query parameters that only track the visitor and never change the page
+tracking_query_params = {
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "mc_cid", "mc_eid",
+    "_ga", "_gl", "ref", "ref_src", "ref_url", "cmpid", "ocid", "spm", "amp",
+}
+tracking_query_prefixes = ("utm_", "pk_", "hsa_")
+
+# Redirect wrappers whose target is carried in a query parameter
+redirect_wrappers = {
+    ("google.com", "/url"): ("q", "url"),
+    ("l.facebook.com", "/l.php"): ("u",),
+    ("lm.facebook.com", "/l.php"): ("u",),
+    ("out.reddit.com", ""): ("url",),
+}
+
+# Number of released run stores kept in memory; stores in use are never evicted
+max_source_stores = 32
+
+# Released stores are only evicted after being idle this long, so a run
+# between supervisor iterations keeps its source IDs
+source_store_min_idle_seconds = 600.0
+
+# ===== URL CANONICALIZATION =====
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in tracking_query_params or name.startswith(tracking_query_prefixes)
+
+def canonicalize_url(url: str) -> str:
+    """Return a canonical form of url for deduplication.
+
+    Lowercases the scheme and host, upgrades http to https, drops ``www.``,
+    default ports, fragments, tracking parameters, AMP path suffixes and
+    trailing slashes, sorts the remaining query parameters, and unwraps known
+    redirect links to their target.
+    """
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ("http", "https") or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    path = parts.path or "/"
+    query = parse_qsl(parts.query, keep_blank_values=True)
+
+    # Unwrap redirect links such as https://www.google.com/url?q=<target>
+    for (wrapper_host, wrapper_path), names in redirect_wrappers.items():
+        if host == wrapper_host and (not wrapper_path or path == wrapper_path):
+            for name, value in query:
+                if name in names and value.startswith(("http://", "https://")):
+                    return canonicalize_url(value)
+
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    for suffix in ("/amp/", "/amp"):
+        if path.endswith(suffix):
+            path = path[: -len(suffix)] or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = sorted((name, value) for name, value in query if not _is_tracking_param(name))
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+# ===== SOURCE STORE =====
+
+class SourceRecord:
+    """A source known to the run: stable ID, canonical URL, title and summary."""
+
+    def __init__(self, source_id: str, url: str, title: str):
+        """Create a record without a summary yet."""
+        self.source_id = source_id
+        self.url = url
+        self.title = title
+        self.summary: Optional[str] = None
+
+class SourceStore:
+    """Sources seen by all researchers of one run, keyed by canonical URL."""
+
+    def __init__(self):
+        """Create an empty store."""
+        self._records: Dict[str, SourceRecord] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {"sources": 0, "summaries": 0, "reused": 0}
+        # Fingerprints of every page seen in the run, shared by all researchers
+        self.near_duplicates = NearDuplicateIndex()
+
+    def register(self, url: str, title: str) -> SourceRecord:
+        """Return the record for url, assigning the next source ID if it is new."""
+        key = canonicalize_url(url)
+        with self._lock:
+            record = self._records.get(key)
+            if record is None:
+                self.stats["sources"] += 1
+                record = SourceRecord(f"S{self.stats['sources']}", key, title)
+                self._records[key] = record
+            return record
+
+    def alias(self, url: str, target_url: str, title: str) -> SourceRecord:
+        """Make url resolve to the record of target_url, registering the target if needed."""
+        record = self.register(target_url, title)
+        with self._lock:
+            self._records.setdefault(canonicalize_url(url), record)
+        return record
+
+    def get_or_summarize(self, url: str, title: str, summarize: Callable[[], str]) -> SourceRecord:
+        """Return the record for url, summarizing the page if no summary exists yet."""
+        record = self.register(url, title)
+        if record.summary is not None:
+            self.stats["reused"] += 1
+            return record
+        record.summary = summarize()
+        self.stats["summaries"] += 1
+        return record
+
+    async def aget_or_summarize(
+        self,
+        url: str,
+        title: str,
+        summarize: Callable[[], Awaitable[str]],
+    ) -> SourceRecord:
+        """Return the record for url, summarizing it once for all concurrent callers."""
+        record = self.register(url, title)
+        if record.summary is not None:
+            self.stats["reused"] += 1
+            return record
+
+        task = self._inflight.get(record.url)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.stats["reused"] += 1
+        else:
+            async def summarize_and_store() -> str:
+                record.summary = await summarize()
+                self.stats["summaries"] += 1
+                return record.summary
+
+            task = asyncio.ensure_future(summarize_and_store())
+            self._inflight[record.url] = task
+            task.add_done_callback(lambda _: self._inflight.pop(record.url, None))
+
+        # Shield so one researcher's cancellation does not cancel the shared summary
+        await asyncio.shield(task)
+        return record
+
+# ===== RUN SCOPE =====
+
+# Store of the run the current researcher belongs to (None outside a supervised run)
+current_source_store: ContextVar[Optional[SourceStore]] = ContextVar("current_source_store", default=None)
+
+# store ID -> store, least recently used first
+_stores: OrderedDict[str, SourceStore] = OrderedDict()
+# store ID -> number of researchers currently using it
+_pins: Dict[str, int] = {}
+# store ID -> time it was last used
+_last_used: Dict[str, float] = {}
+_stores_lock = threading.Lock()
+
+def new_source_store_id() -> str:
+    """Return a fresh ID for a run's source store."""
+    return uuid.uuid4().hex
+
+def _evict_stores(now: float) -> None:
+    """Drop idle released stores beyond max_source_stores, least recently used first (lock held)."""
+    excess = len(_stores) - max_source_stores
+    for store_id in list(_stores):
+        if excess <= 0:
+            break
+        if _pins.get(store_id) or now - _last_used[store_id] < source_store_min_idle_seconds:
+            continue
+        del _stores[store_id]
+        del _last_used[store_id]
+        excess -= 1
+
+def get_source_store(store_id: str) -> SourceStore:
+    """Get the source store for a run, creating it on first use.
+
+    Beyond max_source_stores, released stores idle for at least
+    source_store_min_idle_seconds are evicted; stores in use are kept.
+    """
+    now = time.monotonic()
+    with _stores_lock:
+        store = _stores.get(store_id)
+        if store is None:
+            store = _stores[store_id] = SourceStore()
+        _stores.move_to_end(store_id)
+        _last_used[store_id] = now
+        _evict_stores(now)
+        return store
+
+@contextmanager
+def use_source_store(store_id: str) -> Iterator[SourceStore]:
+    """Make a run's store the current one for the block, pinning it against eviction."""
+    store = get_source_store(store_id)
+    with _stores_lock:
+        _pins[store_id] = _pins.get(store_id, 0) + 1
+    token = current_source_store.set(store)
+    try:
+        yield store
+    finally:
+        current_source_store.reset(token)
+        with _stores_lock:
+            _pins[store_id] -= 1
+            if not _pins[store_id]:
+                del _pins[store_id]
+            _last_used[store_id] = time.monotonic()
@@ -7,7 +7,7 @@ research supervisor workflow, including coordination state and research tools.
 """
 
 import operator
-from typing_extensions import Annotated, TypedDict, Sequence
+from typing_extensions import Annotated, Optional, TypedDict, Sequence
 
 from langchain_core.messages import BaseMessage
 from langchain_core.tools import tool
@@ -30,8 +30,10 @@ class SupervisorState(TypedDict):
     notes: Annotated[list[str], operator.add] = []
     # Counter tracking the number of research iterations performed
     research_iterations: int = 0
-    # Raw unprocessed research notes collected from sub-agent research
+    # References to raw research notes collected from sub-agent research (see note_store.py)
     raw_notes: Annotated[list[str], operator.add] = []
+    # ID of the run's shared source store (see source_store.py)
+    source_store_id: str = ""
 
 @tool
 class ConductResearch(BaseModel):
@@ -39,6 +41,18 @@ class ConductResearch(BaseModel):
     research_topic: str = Field(
         description="The topic to research. Should be a single topic, and should be described in high detail (at least a paragraph).",
     )
+    max_tool_call_iterations: Optional[int] = Field(
+        default=None,
+        description="Optional cap on the sub-agent's rounds of tool calls. Leave unset for the default.",
+    )
+    max_seconds: Optional[float] = Field(
+        default=None,
+        description="Optional wall-clock limit for the sub-agent in seconds. Leave unset for the default.",
+    )
+    max_tokens: Optional[int] = Field(
+        default=None,
+        description="Optional cap on tokens the sub-agent may consume. Leave unset for the default.",
+    )
 
 @tool
 class ResearchComplete(BaseModel):
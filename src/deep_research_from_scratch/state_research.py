@@ -14,26 +14,43 @@ from langgraph.graph.message import add_messages
 
 # ===== STATE DEFINITIONS =====
 
+class ResearchBudget(TypedDict, total=False):
+    """Resource limits for a single researcher run.
+
+    Any limit left out falls back to the defaults in budgets.py. When a limit
+    is reached the researcher stops searching and compresses what it has.
+    """
+    max_tool_call_iterations: int
+    max_seconds: float
+    max_tokens: int
+
 class ResearcherState(TypedDict):
     """
     State for the research agent containing message history and research metadata.
 
     This state tracks the researcher's conversation, iteration count for limiting
     tool calls, the research topic being investigated, compressed findings,
-    and raw research notes for detailed analysis.
+    and references to raw research notes (see note_store.py). Budget fields bound how long
+    and how expensively the researcher may loop, and the running summary holds
+    findings folded in after each tool round.
     """
     researcher_messages: Annotated[Sequence[BaseMessage], add_messages]
     tool_call_iterations: int
     research_topic: str
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
+    research_budget: ResearchBudget
+    research_deadline: float
+    tokens_used: int
+    running_summary: str
+    summarized_messages: int
 
 class ResearcherOutputState(TypedDict):
     """
     Output state for the research agent containing final research results.
 
     This represents the final output of the research process with compressed
-    research findings and all raw notes from the research process.
+    research findings and references to all raw notes from the research process.
     """
     compressed_research: str
     raw_notes: Annotated[List[str], operator.add]
@@ -32,7 +32,7 @@ class AgentState(MessagesState):
     research_brief: Optional[str]
     # Messages exchanged with the supervisor agent for coordination
     supervisor_messages: Annotated[Sequence[BaseMessage], add_messages]
-    # Raw unprocessed research notes collected during the research phase
+    # References to raw research notes collected during the research phase (see note_store.py)
     raw_notes: Annotated[list[str], operator.add] = []
     # Processed and structured notes ready for report generation
     notes: Annotated[list[str], operator.add] = []
@@ -0,0 +1,553 @@
+"""Run Tracing and Latency Instrumentation.
+
+This module records where each research run spends its time as a tree of
+spans, one trace per graph run:
+
+- Runs of the graphs registered with ``traced_graph`` are traced, with their
+  nodes, LLM calls and tool calls (including MCP tools), by
+  ``TracingCallbackHandler``. The handler joins every LangChain callback
+  manager through a configure hook, next to any callbacks the caller passes,
+  so graphs run inside a traced run (such as researchers launched by the
+  supervisor) are nested in its trace
+- Work that does not go through LangChain callbacks is traced explicitly with
+  ``trace_span``: Tavily queries, webpage summarization, research units
+  waiting for a scheduler slot and borrowed MCP sessions
+- Spans carry token counts, bytes, cache hits and queue wait time
+
+When a run finishes its spans are written as OTLP JSON (one export request
+per line, readable by the OpenTelemetry Collector's ``otlpjsonfile``
+receiver) and a per-run summary table is logged. If the OpenTelemetry API
+is installed, every span is also mirrored to it, so a configured SDK tracer
+provider exports them as well.
+
+Tracing is off by default; set DEEP_RESEARCH_TRACING=1 to enable it, or call
+``set_tracing_enabled(True)``.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tracers.context import register_configure_hook
+from typing_extensions import Any, Dict, Iterator, List, Optional, Set
+
+from deep_research_from_scratch.cache import get_cache_dir
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:  # Optional: spans are still recorded and written to the trace file
+    otel_trace = None
+
+logger = logging.getLogger(__name__)
+
+# ===== CONFIGURATION =====
+
+# Set DEEP_RESEARCH_TRACING=1 to record spans for every graph run
+tracing_enabled = os.environ.get("DEEP_RESEARCH_TRACING", "").lower() in ("1", "true", "yes")
+
+# OTLP JSON lines file finished runs are appended to; defaults to traces/spans.otlp.jsonl
+# in the cache directory (set DEEP_RESEARCH_TRACE_FILE="" to disable)
+trace_file = os.environ.get("DEEP_RESEARCH_TRACE_FILE")
+
+# Log the per-run summary table at INFO when a run finishes (DEEP_RESEARCH_TRACE_SUMMARY=0 to disable)
+log_run_summary = os.environ.get("DEEP_RESEARCH_TRACE_SUMMARY", "1").lower() not in ("0", "false", "no")
+
+# Number of finished run traces kept in memory for get_recent_runs()
+recent_runs_kept = 20
+
+# Service name reported in exported resources
+service_name = "deep_research_from_scratch"
+
+# OTLP span kinds: LLM calls and searches are remote calls, everything else is internal
+_OTLP_KINDS = {"llm": 3, "search": 3, "mcp_tool": 3}
+
+# ===== SPANS =====
+
+class Span:
+    """One timed operation within a run trace."""
+
+    def __init__(self, trace: "RunTrace", name: str, kind: str, parent: Optional["Span"], attributes: Dict[str, Any]):
+        """Start a span now, as a child of parent."""
+        self.trace = trace
+        self.name = name
+        self.kind = kind
+        self.parent = parent
+        self.span_id = os.urandom(8).hex()
+        self.attributes = {key: value for key, value in attributes.items() if value is not None}
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self._perf_start = time.perf_counter()
+        self.duration_seconds = 0.0
+
+        self.otel_span = None
+        if otel_trace is not None:
+            context = otel_trace.set_span_in_context(parent.otel_span) if parent is not None and parent.otel_span is not None else None
+            self.otel_span = otel_trace.get_tracer(__name__).start_span(
+                name,
+                context=context,
+                kind=otel_trace.SpanKind.CLIENT if kind in _OTLP_KINDS else otel_trace.SpanKind.INTERNAL,
+                start_time=self.start_ns,
+            )
+
+    @property
+    def ended(self) -> bool:
+        """Whether the span has finished."""
+        return self.end_ns is not None
+
+    def set(self, **attributes: Any) -> None:
+        """Set attributes on the span; None values are ignored."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        """End the span, recording error if the operation failed."""
+        if self.ended:
+            return
+        self.duration_seconds = time.perf_counter() - self._perf_start
+        self.end_ns = self.start_ns + int(self.duration_seconds * 1e9)
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+
+        if self.otel_span is not None:
+            self.otel_span.set_attributes({key: _attribute_value(value) for key, value in self.attributes.items()})
+            if self.error:
+                self.otel_span.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, self.error))
+            self.otel_span.end(end_time=self.end_ns)
+
+    def to_otlp(self) -> dict:
+        """OTLP JSON representation of the span."""
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": _OTLP_KINDS.get(self.kind, 1),
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": [_otlp_attribute("span.kind", self.kind)]
+            + [_otlp_attribute(key, value) for key, value in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent is not None:
+            span["parentSpanId"] = self.parent.span_id
+        return span
+
+class _DisabledSpan:
+    """Stand-in returned by trace_span when no traced run is active."""
+
+    def set(self, **attributes: Any) -> None:
+        """Ignore attributes."""
+
+_disabled_span = _DisabledSpan()
+
+def _attribute_value(value: Any) -> Any:
+    """Coerce an attribute value to a type OpenTelemetry accepts."""
+    return value if isinstance(value, str | bool | int | float) else str(value)
+
+def _otlp_attribute(key: str, value: Any) -> dict:
+    """OTLP JSON key/value pair for an attribute."""
+    value = _attribute_value(value)
+    if isinstance(value, bool):
+        return {"key": key, "value": {"boolValue": value}}
+    if isinstance(value, int):
+        return {"key": key, "value": {"intValue": str(value)}}
+    if isinstance(value, float):
+        return {"key": key, "value": {"doubleValue": value}}
+    return {"key": key, "value": {"stringValue": value}}
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of values (0.0 when empty)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(int(q / 100 * len(ordered)), len(ordered) - 1)]
+
+def _attribute_total(spans: List[Span], key: str) -> float:
+    """Sum of a numeric attribute over spans (missing counts as 0)."""
+    return sum(span.attributes.get(key, 0) for span in spans)
+
+# ===== RUN TRACES =====
+
+class RunTrace:
+    """All spans recorded for one graph run."""
+
+    def __init__(self, name: str):
+        """Create an empty trace for a run of the named graph."""
+        self.trace_id = os.urandom(16).hex()
+        self.name = name
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, kind: str, parent: Optional[Span], attributes: Dict[str, Any]) -> Span:
+        """Start a span in this trace."""
+        span = Span(self, name, kind, parent, attributes)
+        with self._lock:
+            self.spans.append(span)
+            if parent is None and self.root is None:
+                self.root = span
+        return span
+
+    def summary_rows(self) -> List[dict]:
+        """Aggregate finished spans by kind and name, slowest total first."""
+        groups = defaultdict(list)
+        with self._lock:
+            spans = [span for span in self.spans if span.ended and span is not self.root]
+        for span in spans:
+            groups[(span.kind, span.name)].append(span)
+
+        rows = []
+        for (kind, name), group in groups.items():
+            durations = [span.duration_seconds for span in group]
+            rows.append({
+                "kind": kind,
+                "name": name,
+                "count": len(group),
+                "errors": sum(1 for span in group if span.error),
+                "total_seconds": sum(durations),
+                "p50_seconds": _percentile(durations, 50),
+                "p95_seconds": _percentile(durations, 95),
+                "tokens": _attribute_total(group, "input_tokens") + _attribute_total(group, "output_tokens"),
+                "bytes": _attribute_total(group, "bytes"),
+                "cache_hits": sum(1 for span in group if span.attributes.get("cache_hit")),
+                "queue_wait_seconds": _attribute_total(group, "queue_wait_seconds"),
+            })
+        return sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+
+    def format_summary(self) -> str:
+        """Render the per-run summary as a plain-text table."""
+        duration = self.root.duration_seconds if self.root is not None else 0.0
+        lines = [
+            f"Run {self.name} ({self.trace_id[:8]}): {duration:.2f}s, {len(self.spans)} spans",
+            f"{'kind':<10} {'name':<40} {'count':>5} {'total s':>8} {'p50 ms':>9} {'p95 ms':>9} {'tokens':>8} {'KiB':>8} {'hits':>5} {'wait s':>7}",
+        ]
+        for row in self.summary_rows():
+            lines.append(
+                f"{row['kind']:<10} {row['name'][:40]:<40} {row['count']:>5} {row['total_seconds']:>8.2f} "
+                f"{row['p50_seconds'] * 1000:>9.1f} {row['p95_seconds'] * 1000:>9.1f} {row['tokens']:>8} "
+                f"{row['bytes'] / 1024:>8.1f} {row['cache_hits']:>5} {row['queue_wait_seconds']:>7.2f}"
+                + (f"  ({row['errors']} failed)" if row["errors"] else "")
+            )
+        return "\n".join(lines)
+
+    def to_otlp(self) -> dict:
+        """OTLP JSON export request holding every span of the run."""
+        with self._lock:
+            spans = [span.to_otlp() for span in self.spans]
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": [_otlp_attribute("service.name", service_name)]},
+                "scopeSpans": [{"scope": {"name": __name__}, "spans": spans}],
+            }]
+        }
+
+# ===== TRACER =====
+
+# Innermost span opened with trace_span in the current context
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_trace_span", default=None)
+
+# Attributes for the next span started in the current context (see next_span_attributes)
+_next_span_attributes: ContextVar[Optional[dict]] = ContextVar("next_span_attributes", default=None)
+
+# Names of the compiled graphs whose runs are traced (see traced_graph)
+_traced_graph_names: Set[str] = set()
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """LangChain callback handler turning graph, node, LLM and tool runs into spans.
+
+    A trace starts at the outermost run of a traced graph; runs outside any
+    traced graph are ignored. Runs that are neither a traced graph, a graph
+    node, an LLM call nor a tool call (routers, prompt templates, ...) get no
+    span of their own; their children are attached to the nearest traced
+    ancestor.
+    """
+
+    run_inline = True
+
+    def __init__(self, tracer: "RunTracer"):
+        """Create a handler recording into tracer."""
+        self.tracer = tracer
+        # run_id -> (span, whether this run owns the span)
+        self._spans: Dict[Any, tuple] = {}
+        self._lock = threading.Lock()
+
+    def span_for_run(self, run_id: Any) -> Optional[Span]:
+        """Span covering a LangChain run, if it is traced."""
+        entry = self._spans.get(run_id)
+        return entry[0] if entry else None
+
+    def _parent(self, parent_run_id: Any) -> Optional[Span]:
+        return _deepest(self.span_for_run(parent_run_id), _current_span.get())
+
+    def _start(self, run_id: Any, parent_run_id: Any, name: Optional[str], kind: Optional[str], **attributes: Any) -> Optional[Span]:
+        if not self.tracer.enabled or run_id in self._spans:
+            return None
+        parent = self._parent(parent_run_id)
+
+        if name is None:
+            # Untraced run: its children belong to the nearest traced ancestor
+            if parent is not None:
+                with self._lock:
+                    self._spans[run_id] = (parent, False)
+            return None
+
+        if parent is None:
+            if kind != "graph":
+                return None
+            span = self.tracer.start_run(name)
+        else:
+            if kind == "tool" and parent.kind == "mcp":
+                kind = "mcp_tool"
+            pending = _next_span_attributes.get()
+            if pending:
+                attributes.update(pending)
+                pending.clear()
+            span = parent.trace.start_span(name, kind, parent, attributes)
+        with self._lock:
+            self._spans[run_id] = (span, True)
+        return span
+
+    def _finish(self, run_id: Any, error: Optional[BaseException] = None, **attributes: Any) -> None:
+        with self._lock:
+            entry = self._spans.pop(run_id, None)
+        if entry is None or not entry[1]:
+            return
+        span = entry[0]
+        span.set(**attributes)
+        span.finish(error)
+        if span is span.trace.root:
+            self.tracer.finish_run(span.trace)
+
+    # ----- chains and graph nodes -----
+
+    def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Start a span for a traced graph run or graph node."""
+        name = kwargs.get("name") or (serialized or {}).get("name")
+        node = (metadata or {}).get("langgraph_node")
+        if name in _traced_graph_names:
+            # A root trace, or a graph nested inside a traced run
+            self._start(run_id, parent_run_id, name, "graph")
+        elif parent_run_id is not None and node and name == node:
+            self._start(run_id, parent_run_id, node, "node")
+        else:
+            self._start(run_id, parent_run_id, None, None)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        """End the run's span."""
+        self._finish(run_id)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        """End the run's span as failed (interrupts and Command jumps are not failures)."""
+        failed = type(error).__name__ not in ("GraphInterrupt", "ParentCommand")
+        self._finish(run_id, error if failed else None)
+
+    # ----- LLM calls -----
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Start a span for a chat model call."""
+        metadata = metadata or {}
+        name = metadata.get("ls_model_name") or (serialized or {}).get("name") or "chat_model"
+        self._start(run_id, parent_run_id, name, "llm", provider=metadata.get("ls_provider"), messages=sum(len(batch) for batch in messages))
+
+    def on_llm_start(self, serialized, prompts, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+        """Start a span for a completion model call."""
+        name = (metadata or {}).get("ls_model_name") or (serialized or {}).get("name") or "llm"
+        self._start(run_id, parent_run_id, name, "llm", provider=(metadata or {}).get("ls_provider"))
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        """End the call's span with its token usage."""
+        input_tokens = output_tokens = 0
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                input_tokens += usage.get("input_tokens", 0)
+                output_tokens += usage.get("output_tokens", 0)
+        self._finish(run_id, input_tokens=input_tokens, output_tokens=output_tokens)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        """End the call's span as failed."""
+        self._finish(run_id, error)
+
+    # ----- tool calls -----
+
+    def on_tool_start(self, serialized, input_str, *, run_id, parent_run_id=None, **kwargs):
+        """Start a span for a tool call."""
+        name = kwargs.get("name") or (serialized or {}).get("name") or "tool"
+        self._start(run_id, parent_run_id, name, "tool", input_bytes=len(str(input_str).encode("utf-8")))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        """End the call's span with the size of its output."""
+        content = getattr(output, "content", output)
+        self._finish(run_id, bytes=len(str(content).encode("utf-8")))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        """End the call's span as failed."""
+        self._finish(run_id, error)
+
+class RunTracer:
+    """Records run traces, exports finished runs and keeps the most recent ones."""
+
+    def __init__(self, path: Optional[str] = trace_file, enabled: bool = tracing_enabled):
+        """Create a tracer appending finished runs to path (the cache directory's trace file if None, no file export if empty)."""
+        self._path = path
+        self.enabled = enabled
+        self.handler = TracingCallbackHandler(self)
+        self.recent = deque(maxlen=recent_runs_kept)
+        self.stats = {"runs": 0, "spans": 0, "exported": 0, "export_errors": 0}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> Optional[Path]:
+        """Trace file finished runs are appended to, or None when file export is off."""
+        if self._path is None:
+            return get_cache_dir() / "traces" / "spans.otlp.jsonl"
+        return Path(self._path) if self._path else None
+
+    def start_run(self, name: str) -> Span:
+        """Start a new trace and return its root span."""
+        trace = RunTrace(name)
+        return trace.start_span(name, "graph", None, {})
+
+    def finish_run(self, trace: RunTrace) -> None:
+        """Record a finished run: keep it, export it and log its summary."""
+        with self._lock:
+            self.recent.append(trace)
+            self.stats["runs"] += 1
+            self.stats["spans"] += len(trace.spans)
+        if self.path is not None:
+            # File I/O runs on a background thread, off the event loop
+            self._get_executor().submit(self._export, trace)
+        if log_run_summary:
+            logger.info("%s", trace.format_summary())
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="trace-export")
+            return self._executor
+
+    def _export(self, trace: RunTrace) -> None:
+        path = self.path
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_otlp()) + "\n")
+            self.stats["exported"] += 1
+        except OSError as e:
+            self.stats["export_errors"] += 1
+            logger.warning("Failed to export trace %s: %s", trace.trace_id, e)
+
+    def flush(self) -> None:
+        """Wait until every finished run has been written to the trace file."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+# Global tracer - will be initialized lazily
+_tracer = None
+_tracer_lock = threading.Lock()
+
+def get_tracer() -> RunTracer:
+    """Get or initialize the run tracer lazily."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = RunTracer()
+            # Every callback manager picks up the handler in addition to the
+            # caller's callbacks, and passes it on to child runs
+            register_configure_hook(ContextVar("deep_research_tracing_handler", default=_tracer.handler), inheritable=True)
+        return _tracer
+
+def set_tracing_enabled(enabled: bool) -> None:
+    """Turn span recording on or off for subsequent runs."""
+    get_tracer().enabled = enabled
+
+def get_recent_runs() -> List[RunTrace]:
+    """Most recently finished run traces, oldest first."""
+    return list(get_tracer().recent)
+
+def traced_graph(graph):
+    """Trace the runs of a compiled graph and return the graph unchanged.
+
+    The graph is registered by name; its config is left alone, so callbacks
+    passed by the caller are kept alongside the tracing handler.
+    """
+    get_tracer()
+    _traced_graph_names.add(graph.get_name())
+    return graph
+
+# ===== EXPLICIT SPANS =====
+
+def _deepest(callback_span: Optional[Span], explicit_span: Optional[Span]) -> Optional[Span]:
+    """Return the more deeply nested of a callback-run span and an explicit span."""
+    if explicit_span is None or explicit_span.ended:
+        return callback_span
+    if callback_span is None:
+        return explicit_span
+    # An explicit span opened inside the callback run is nested deeper than it
+    if explicit_span.trace is callback_span.trace and explicit_span.start_ns >= callback_span.start_ns:
+        return explicit_span
+    return callback_span
+
+def current_span() -> Optional[Span]:
+    """Innermost open span of the current context, if a traced run is active."""
+    tracer = get_tracer()
+    if not tracer.enabled:
+        return None
+    config = var_child_runnable_config.get() or {}
+    parent_run_id = getattr(config.get("callbacks"), "parent_run_id", None)
+    return _deepest(tracer.handler.span_for_run(parent_run_id), _current_span.get())
+
+@contextmanager
+def trace_span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+    """Trace a block as a child of the current span.
+
+    Outside a traced run this does nothing and yields a span stand-in whose
+    ``set`` is a no-op.
+
+    Args:
+        name: Span name, e.g. "tavily.search"
+        kind: Span category shown in the run summary
+        **attributes: Initial span attributes
+
+    Returns:
+        Context manager yielding the span
+    """
+    parent = current_span()
+    if parent is None:
+        yield _disabled_span
+        return
+
+    span = parent.trace.start_span(name, kind, parent, attributes)
+    token = _current_span.set(span)
+    try:
+        yield span
+    except BaseException as e:
+        span.finish(e)
+        raise
+    finally:
+        _current_span.reset(token)
+        span.finish()
+
+@contextmanager
+def next_span_attributes(**attributes: Any) -> Iterator[None]:
+    """Attach attributes to the next callback span started in this context.
+
+    Used to record what is measured before a LangChain run starts, such as the
+    time a tool call waited for its concurrency slot.
+    """
+    token = _next_span_attributes.set(dict(attributes))
+    try:
+        yield
+    finally:
+        _next_span_attributes.reset(token)
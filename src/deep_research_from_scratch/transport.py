@@ -0,0 +1,183 @@
+"""Shared HTTP Transport Layer.
+
+This module provides one pooled, keep-alive HTTP transport that the Tavily
+clients and OpenAI-compatible chat models reuse, so parallel researchers share
+connections (and TLS sessions) to the same endpoints instead of each opening
+their own pool. Gemini models (langchain-google-genai 2.x) talk to the API
+through Google's own gRPC client, which has no hook for an httpx transport,
+so they keep their own connections.
+
+- ``SharedTransport`` is an httpx transport usable from both sync and async
+  clients; async pools are kept per event loop since connections cannot move
+  between loops
+- Pool sizes are derived from the researcher concurrency limits
+- ``transport_stats`` counts requests and newly opened connections, so
+  connection reuse is visible as ``requests - connections_opened``; requests
+  made through the shared requests session (sync Tavily) are counted
+  separately as ``session_requests``
+"""
+
+import asyncio
+import threading
+import weakref
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from typing_extensions import Dict, Optional
+
+from deep_research_from_scratch.scheduler import global_max_concurrent_researchers
+
+# ===== CONFIGURATION =====
+
+# Concurrent HTTP requests a single researcher can have in flight
+# (one LLM call plus its search and summarization fan-out)
+requests_per_researcher = 6
+
+# Connection pool sizes, tied to how many researchers can run at once
+pool_max_connections = global_max_concurrent_researchers * requests_per_researcher + 4
+pool_max_keepalive_connections = pool_max_connections
+pool_keepalive_expiry_seconds = 60.0
+
+# ===== METRICS =====
+
+transport_stats = {"requests": 0, "connections_opened": 0, "errors": 0, "session_requests": 0}
+_stats_lock = threading.Lock()
+
+def _count(key: str) -> None:
+    with _stats_lock:
+        transport_stats[key] += 1
+
+def get_transport_stats() -> dict:
+    """Return request/connection counters plus the derived connection reuse ratio."""
+    with _stats_lock:
+        stats = dict(transport_stats)
+    reused = max(stats["requests"] - stats["connections_opened"], 0)
+    stats["connections_reused"] = reused
+    stats["reuse_ratio"] = reused / stats["requests"] if stats["requests"] else 0.0
+    return stats
+
+def reset_transport_stats() -> None:
+    """Reset all transport counters to zero."""
+    with _stats_lock:
+        for key in transport_stats:
+            transport_stats[key] = 0
+
+def _trace_sync(event_name: str, info: dict) -> None:
+    """Count new TCP connections from httpcore trace events (sync clients)."""
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+
+async def _trace_async(event_name: str, info: dict) -> None:
+    """Count new TCP connections from httpcore trace events (async clients)."""
+    if event_name == "connection.connect_tcp.complete":
+        _count("connections_opened")
+
+# ===== SHARED TRANSPORT =====
+
+class SharedTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Pooled keep-alive httpx transport shared by sync and async clients."""
+
+    def __init__(self, limits: Optional[httpx.Limits] = None):
+        """Create the transport; pools are opened lazily on first request."""
+        self.limits = limits or httpx.Limits(
+            max_connections=pool_max_connections,
+            max_keepalive_connections=pool_max_keepalive_connections,
+            keepalive_expiry=pool_keepalive_expiry_seconds,
+        )
+        self._sync_transport: Optional[httpx.HTTPTransport] = None
+        self._async_transports: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncHTTPTransport] = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _get_sync_transport(self) -> httpx.HTTPTransport:
+        with self._lock:
+            if self._sync_transport is None:
+                self._sync_transport = httpx.HTTPTransport(limits=self.limits, http2=False)
+            return self._sync_transport
+
+    def _get_async_transport(self) -> httpx.AsyncHTTPTransport:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transport = self._async_transports.get(loop)
+            if transport is None:
+                transport = httpx.AsyncHTTPTransport(limits=self.limits, http2=False)
+                self._async_transports[loop] = transport
+            return transport
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over the shared sync connection pool."""
+        _count("requests")
+        request.extensions.setdefault("trace", _trace_sync)
+        try:
+            return self._get_sync_transport().handle_request(request)
+        except Exception:
+            _count("errors")
+            raise
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send a request over the shared async connection pool for the running loop."""
+        _count("requests")
+        request.extensions.setdefault("trace", _trace_async)
+        try:
+            return await self._get_async_transport().handle_async_request(request)
+        except Exception:
+            _count("errors")
+            raise
+
+    def close(self) -> None:
+        """Close the sync pool (async pools close with their clients or loops)."""
+        with self._lock:
+            if self._sync_transport is not None:
+                self._sync_transport.close()
+                self._sync_transport = None
+
+    async def aclose(self) -> None:
+        """Close the async pool of the running loop."""
+        with self._lock:
+            transport = self._async_transports.pop(asyncio.get_running_loop(), None)
+        if transport is not None:
+            await transport.aclose()
+
+# Global transport and sessions - will be initialized lazily
+_shared_transport = None
+_requests_session = None
+_init_lock = threading.Lock()
+
+def get_shared_transport() -> SharedTransport:
+    """Get or initialize the process-wide shared transport lazily."""
+    global _shared_transport
+    with _init_lock:
+        if _shared_transport is None:
+            _shared_transport = SharedTransport()
+        return _shared_transport
+
+def get_async_http_client(**kwargs) -> httpx.AsyncClient:
+    """Return a new async httpx client that sends requests over the shared transport."""
+    return httpx.AsyncClient(transport=get_shared_transport(), **kwargs)
+
+def get_http_client(**kwargs) -> httpx.Client:
+    """Return a new sync httpx client that sends requests over the shared transport."""
+    return httpx.Client(transport=get_shared_transport(), **kwargs)
+
+def get_requests_session() -> requests.Session:
+    """Get the shared pooled requests session (used by the sync Tavily client)."""
+    global _requests_session
+    with _init_lock:
+        if _requests_session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_max_connections)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.hooks["response"].append(lambda response, *args, **kwargs: _count("session_requests"))
+            _requests_session = session
+        return _requests_session
+
+def chat_model_transport_params(model_provider: str) -> Dict[str, object]:
+    """Return init_chat_model params that route a provider's HTTP calls over the shared transport.
+
+    Providers without a supported hook (including google_genai, which uses a
+    gRPC client) return no params and keep their own pools.
+    """
+    if model_provider in ("openai", "azure_openai"):
+        return {"http_client": get_http_client(), "http_async_client": get_async_http_client()}
+    return {}
@@ -4,22 +4,39 @@ This module provides search and content processing utilities for the research ag
 including web search capabilities and content summarization tools.
 """
 
+import asyncio
+import logging
 import os
 import platform
 import subprocess
+import time
 from pathlib import Path
 from datetime import datetime
-from typing_extensions import Annotated, List, Literal
+from typing_extensions import Annotated, Dict, List, Literal, Optional
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, ToolMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import tool, InjectedToolArg
-from tavily import TavilyClient
-
+from langchain_core.tools import tool, BaseTool, InjectedToolArg, StructuredTool
+
+from deep_research_from_scratch.cache import (
+    content_hash,
+    normalize_content,
+    get_model_id,
+    get_search_cache,
+    get_summary_cache,
+    SearchCache,
+    SummaryCache,
+)
+from deep_research_from_scratch.content_selection import summary_input_token_budget, trim_to_relevant_content
+from deep_research_from_scratch.near_duplicates import NearDuplicateIndex
+from deep_research_from_scratch.models import get_async_tavily_client, get_summarization_model, get_tavily_client
+from deep_research_from_scratch.source_store import canonicalize_url, current_source_store
 from deep_research_from_scratch.state_research import Summary
+from deep_research_from_scratch.tracing import next_span_attributes, trace_span
 from deep_research_from_scratch.prompts import summarize_webpage_prompt
 
+logger = logging.getLogger(__name__)
+
 # ===== UTILITY FUNCTIONS =====
 
 def get_today_str() -> str:
@@ -73,9 +90,25 @@ def convert_path_for_mcp(path: Path) -> str:
 
 # ===== CONFIGURATION =====
 
-# Primary: Google Gemini | Alternatives: "openai:gpt-4.1-mini", "anthropic:claude-haiku-3-5-20241022"
-summarization_model = init_chat_model(model="gemini-2.5-pro", model_provider="google_genai", temperature=0.0)
-tavily_client = TavilyClient()
+# Models and Tavily clients are created lazily and shared via the models registry
+# (see get_summarization_model, get_tavily_client, get_async_tavily_client)
+
+# Maximum number of Tavily queries in flight at once for a single batch
+max_concurrent_searches = 5
+
+# Per-query timeout in seconds; a query that exceeds it is reported as failed
+search_timeout_seconds = 30.0
+
+# Maximum number of webpage summaries running at once for a single search
+max_concurrent_summaries = 4
+
+# Per-tool concurrency limits for execute_tool_calls; unlisted tools use the default
+tool_concurrency_limits = {"tavily_search": 3}
+default_tool_concurrency = 4
+
+# Version of summarize_webpage_prompt, part of the summary cache key so that
+# prompt edits invalidate previously cached summaries
+summarize_prompt_version = content_hash(summarize_webpage_prompt)[:12]
 
 # ===== SEARCH FUNCTIONS =====
 
@@ -97,51 +130,246 @@ def tavily_search_multiple(
         List of search result dictionaries
     """
 
-    # Execute searches sequentially. Note: yon can use AsyncTavilyClient to parallelize this step.
+    cache = get_search_cache()
+
+    # Execute searches sequentially. Use atavily_search_multiple to run them concurrently.
     search_docs = []
     for query in search_queries:
-        result = tavily_client.search(
-            query,
-            max_results=max_results,
-            include_raw_content=include_raw_content,
-            topic=topic
-        )
-        search_docs.append(result)
+        with trace_span("tavily.search", kind="search", query=query, topic=topic) as span:
+            if cache is not None:
+                cache_key = SearchCache.make_key(query, max_results, topic, include_raw_content)
+                if (cached := cache.get(cache_key, topic)) is not None:
+                    span.set(cache_hit=True, results=len(cached.get("results", [])))
+                    search_docs.append(cached)
+                    continue
+                if cache.mode == "replay":
+                    search_docs.append({"query": query, "results": [], "error": "No recorded search response"})
+                    continue
+
+            result = get_tavily_client().search(
+                query,
+                max_results=max_results,
+                include_raw_content=include_raw_content,
+                topic=topic
+            )
+            span.set(cache_hit=False, results=len(result.get("results", [])), bytes=_response_bytes(result))
+            if cache is not None:
+                cache.put(cache_key, topic, query, result)
+            search_docs.append(result)
 
     return search_docs
 
-def summarize_webpage_content(webpage_content: str) -> str:
+async def atavily_search_multiple(
+    search_queries: List[str],
+    max_results: int = 3,
+    topic: Literal["general", "news", "finance"] = "general",
+    include_raw_content: bool = True,
+    max_concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> List[dict]:
+    """Perform concurrent searches using the async Tavily API for multiple queries.
+
+    Queries are scheduled with a semaphore so that at most ``max_concurrency``
+    requests are in flight, and each query is bounded by ``timeout`` seconds.
+    A failed or timed-out query yields an empty response carrying an ``error``
+    field instead of failing the whole batch. Responses go through the search
+    cache, so identical queries issued concurrently share one HTTP call.
+
+    Args:
+        search_queries: List of search queries to execute
+        max_results: Maximum number of results per query
+        topic: Topic filter for search results
+        include_raw_content: Whether to include raw webpage content
+        max_concurrency: Maximum concurrent queries (defaults to max_concurrent_searches)
+        timeout: Per-query timeout in seconds (defaults to search_timeout_seconds)
+
+    Returns:
+        List of search result dictionaries, in the same order as search_queries
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or max_concurrent_searches)
+    timeout = timeout or search_timeout_seconds
+
+    cache = await asyncio.to_thread(get_search_cache)
+
+    async def fetch(query: str, span) -> dict:
+        requested_at = time.monotonic()
+        async with semaphore:
+            span.set(cache_hit=False, queue_wait_seconds=time.monotonic() - requested_at)
+            result = await asyncio.wait_for(
+                get_async_tavily_client().search(
+                    query,
+                    max_results=max_results,
+                    include_raw_content=include_raw_content,
+                    topic=topic
+                ),
+                timeout=timeout
+            )
+            span.set(bytes=_response_bytes(result))
+            return result
+
+    async def search_one(query: str) -> dict:
+        with trace_span("tavily.search", kind="search", query=query, topic=topic) as span:
+            try:
+                if cache is None:
+                    result = await fetch(query, span)
+                else:
+                    cache_key = SearchCache.make_key(query, max_results, topic, include_raw_content)
+                    # Served from the cache (or a concurrent identical request) unless fetch runs
+                    span.set(cache_hit=True)
+                    result = await cache.aget_or_fetch(cache_key, topic, query, lambda: fetch(query, span))
+                span.set(results=len(result.get("results", [])))
+                return result
+            except TimeoutError:
+                error = f"Search timed out after {timeout:g}s"
+            except Exception as e:
+                error = str(e)
+            span.set(error=error)
+
+        logger.warning("Search failed for query '%s': %s", query, error)
+        return {"query": query, "results": [], "error": error}
+
+    # gather preserves input order regardless of completion order
+    return list(await asyncio.gather(*(search_one(query) for query in search_queries)))
+
+def _response_bytes(response: dict) -> int:
+    """Approximate size of a Tavily response: the text of all its results."""
+    return sum(
+        len((result.get("content") or "").encode("utf-8")) + len((result.get("raw_content") or "").encode("utf-8"))
+        for result in response.get("results", [])
+    )
+
+def _summary_messages(webpage_content: str) -> list:
+    """Build the summarization prompt for a single webpage."""
+    return [
+        HumanMessage(content=summarize_webpage_prompt.format(
+            webpage_content=webpage_content,
+            date=get_today_str()
+        ))
+    ]
+
+def _format_summary(summary: Summary) -> str:
+    """Format a structured summary with clear summary/excerpt sections."""
+    return (
+        f"<summary>\n{summary.summary}\n</summary>\n\n"
+        f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
+    )
+
+def _summary_cache_key(webpage_content: str, query: Optional[str] = None, trimmed: bool = False) -> str:
+    """Content address of a page summary for the current model and prompt.
+
+    Keyed on the raw page rather than the selected excerpt. Pages summarized
+    whole are keyed on the page alone, so every query finding them shares one
+    entry; only when the selection trimmed the page do the query and token
+    budget stand in for the excerpt.
+    """
+    selection = f"{normalize_content(query or '').lower()}|{summary_input_token_budget}" if trimmed else ""
+    return SummaryCache.make_key(webpage_content, get_model_id(get_summarization_model()), summarize_prompt_version, selection)
+
+def _truncate_content(webpage_content: str) -> str:
+    """Fallback used when summarization fails: the first 1000 characters of the page."""
+    return webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
+
+def summarize_webpage_content(webpage_content: str, query: Optional[str] = None) -> str:
     """Summarize webpage content using the configured summarization model.
 
+    Long pages are first reduced to the chunks most relevant to query.
+
     Args:
         webpage_content: Raw webpage content to summarize
+        query: Search query the page was found for
 
     Returns:
         Formatted summary with key excerpts
     """
-    try:
-        # Set up structured output model for summarization
-        structured_model = summarization_model.with_structured_output(Summary)
+    with trace_span("summarize_webpage", kind="summarize", bytes=len(webpage_content.encode("utf-8"))) as span:
+        # Serve repeated pages from the persistent summary cache; a hit on the
+        # whole-page key skips the selection too
+        cache = get_summary_cache()
+        if cache is not None:
+            cache_key = _summary_cache_key(webpage_content)
+            if (cached := cache.get(cache_key)) is not None:
+                span.set(cache_hit=True)
+                return cached
+
+        selected, trimmed = trim_to_relevant_content(webpage_content, query)
+        if cache is not None and trimmed:
+            cache_key = _summary_cache_key(webpage_content, query, trimmed)
+            if (cached := cache.get(cache_key)) is not None:
+                span.set(cache_hit=True)
+                return cached
+        span.set(cache_hit=False)
+
+        webpage_content = selected
+        span.set(selected_bytes=len(webpage_content.encode("utf-8")))
 
-        # Generate summary
-        summary = structured_model.invoke([
-            HumanMessage(content=summarize_webpage_prompt.format(
-                webpage_content=webpage_content,
-                date=get_today_str()
-            ))
-        ])
+        try:
+            # Set up structured output model for summarization
+            structured_model = get_summarization_model().with_structured_output(Summary)
+
+            # Generate summary
+            summary = structured_model.invoke(_summary_messages(webpage_content))
+
+            # Format summary with clear structure
+            formatted_summary = _format_summary(summary)
+
+            # Only successful summaries are cached, never the truncation fallback
+            if cache is not None:
+                cache.put(cache_key, formatted_summary)
 
-        # Format summary with clear structure
-        formatted_summary = (
-            f"<summary>\n{summary.summary}\n</summary>\n\n"
-            f"<key_excerpts>\n{summary.key_excerpts}\n</key_excerpts>"
-        )
+            return formatted_summary
 
-        return formatted_summary
+        except Exception as e:
+            logger.warning("Failed to summarize webpage: %s", e)
+            span.set(error=str(e))
+            return _truncate_content(webpage_content)
 
-    except Exception as e:
-        print(f"Failed to summarize webpage: {str(e)}")
-        return webpage_content[:1000] + "..." if len(webpage_content) > 1000 else webpage_content
+async def asummarize_webpage_content(webpage_content: str, query: Optional[str] = None) -> str:
+    """Summarize webpage content asynchronously using the configured summarization model.
+
+    Long pages are first reduced to the chunks most relevant to query.
+
+    Args:
+        webpage_content: Raw webpage content to summarize
+        query: Search query the page was found for
+
+    Returns:
+        Formatted summary with key excerpts, or the truncated page on failure
+    """
+    with trace_span("summarize_webpage", kind="summarize", bytes=len(webpage_content.encode("utf-8"))) as span:
+        # Cache access is disk I/O, keep it off the event loop
+        cache = await asyncio.to_thread(get_summary_cache)
+        if cache is not None:
+            cache_key = _summary_cache_key(webpage_content)
+            if (cached := await asyncio.to_thread(cache.get, cache_key)) is not None:
+                span.set(cache_hit=True)
+                return cached
+
+        # Selection is CPU-bound on large pages, so it runs in a worker thread as well
+        selected, trimmed = await asyncio.to_thread(trim_to_relevant_content, webpage_content, query)
+        if cache is not None and trimmed:
+            cache_key = _summary_cache_key(webpage_content, query, trimmed)
+            if (cached := await asyncio.to_thread(cache.get, cache_key)) is not None:
+                span.set(cache_hit=True)
+                return cached
+        span.set(cache_hit=False)
+
+        webpage_content = selected
+        span.set(selected_bytes=len(webpage_content.encode("utf-8")))
+
+        try:
+            structured_model = get_summarization_model().with_structured_output(Summary)
+            summary = await structured_model.ainvoke(_summary_messages(webpage_content))
+            formatted_summary = _format_summary(summary)
+
+            if cache is not None:
+                await asyncio.to_thread(cache.put, cache_key, formatted_summary)
+
+            return formatted_summary
+
+        except Exception as e:
+            logger.warning("Failed to summarize webpage: %s", e)
+            span.set(error=str(e))
+            return _truncate_content(webpage_content)
 
 def deduplicate_search_results(search_results: List[dict]) -> dict:
     """Deduplicate search results by URL to avoid processing duplicate content.
@@ -150,44 +378,134 @@ def deduplicate_search_results(search_results: List[dict]) -> dict:
         search_results: List of search result dictionaries
 
     Returns:
-        Dictionary mapping URLs to unique results
+        Dictionary mapping URLs (as returned by the search) to unique results
     """
     unique_results = {}
+    seen = set()
 
     for response in search_results:
         for result in response['results']:
-            url = result['url']
-            if url not in unique_results:
-                unique_results[url] = result
+            # Canonical URLs merge links that differ only in tracking params or redirects,
+            # but the original URL is kept so citations point at the page the search returned
+            key = canonicalize_url(result['url'])
+            if key not in seen:
+                seen.add(key)
+                unique_results[result['url']] = result
 
     return unique_results
 
-def process_search_results(unique_results: dict) -> dict:
+def filter_near_duplicates(unique_results: dict, index: Optional[NearDuplicateIndex] = None) -> dict:
+    """Merge results whose raw content nearly duplicates an earlier result.
+
+    A copy of a page kept earlier in the same batch is dropped and its URL
+    listed under the kept result's 'duplicate_urls'. Within a supervised run
+    the run's shared index is used, and a copy of a page another search
+    already found is aliased to that source so its summary is reused.
+
+    Args:
+        unique_results: Dictionary of unique search results
+        index: Fingerprint index to check against (defaults to the run's index)
+
+    Returns:
+        Dictionary of results without near-duplicates, in the original order
+    """
+    store = current_source_store.get()
+    if index is None:
+        index = store.near_duplicates if store is not None else NearDuplicateIndex()
+
+    filtered_results = {}
+    for url, result in unique_results.items():
+        # Only pages that would be summarized are fingerprinted
+        match = index.find_or_add(url, result["raw_content"]) if result.get("raw_content") else None
+        if match is None:
+            filtered_results[url] = result
+            continue
+
+        index.record_saved_summary()
+        if match in filtered_results:
+            kept = filtered_results[match]
+            filtered_results[match] = {**kept, "duplicate_urls": kept.get("duplicate_urls", []) + [url]}
+        else:
+            if store is not None:
+                store.alias(url, match, result["title"])
+            filtered_results[url] = result
+
+    return filtered_results
+
+def process_search_results(unique_results: dict, query: Optional[str] = None) -> dict:
     """Process search results by summarizing content where available.
 
+    Within a supervised run, summaries and source IDs come from the run's
+    shared source store, so each page is summarized once per run.
+
     Args:
         unique_results: Dictionary of unique search results
+        query: Search query, used to pick the relevant parts of long pages
 
     Returns:
         Dictionary of processed results with summaries
     """
     summarized_results = {}
+    store = current_source_store.get()
 
     for url, result in unique_results.items():
-        # Use existing content if no raw content for summarization
-        if not result.get("raw_content"):
-            content = result['content']
-        else:
+        def summarize(result=result) -> str:
+            # Use existing content if no raw content for summarization
+            if not result.get("raw_content"):
+                return result['content']
             # Summarize raw content for better processing
-            content = summarize_webpage_content(result['raw_content'])
+            return summarize_webpage_content(result['raw_content'], query)
 
-        summarized_results[url] = {
-            'title': result['title'],
-            'content': content
-        }
+        if store is None:
+            summarized_results[url] = {'title': result['title'], 'content': summarize()}
+        else:
+            # Pages already summarized by any researcher in this run are reused
+            record = store.get_or_summarize(url, result['title'], summarize)
+            summarized_results[url] = {'title': result['title'], 'content': record.summary, 'source_id': record.source_id}
 
     return summarized_results
 
+async def aprocess_search_results(
+    unique_results: dict,
+    max_concurrency: Optional[int] = None,
+    query: Optional[str] = None,
+) -> dict:
+    """Process search results concurrently by summarizing content where available.
+
+    Summaries run in parallel under a semaphore; each page keeps its own
+    truncate-to-1000-chars fallback, and the output preserves the URL order
+    of unique_results so source numbering stays stable. Within a supervised
+    run, pages are summarized once per run through the shared source store.
+
+    Args:
+        unique_results: Dictionary of unique search results
+        max_concurrency: Maximum concurrent summaries (defaults to max_concurrent_summaries)
+        query: Search query, used to pick the relevant parts of long pages
+
+    Returns:
+        Dictionary of processed results with summaries
+    """
+    semaphore = asyncio.Semaphore(max_concurrency or max_concurrent_summaries)
+    store = current_source_store.get()
+
+    async def summarize(result: dict) -> str:
+        # Use existing content if no raw content for summarization
+        if not result.get("raw_content"):
+            return result['content']
+        async with semaphore:
+            return await asummarize_webpage_content(result['raw_content'], query)
+
+    async def process_one(url: str, result: dict) -> dict:
+        if store is None:
+            return {'title': result['title'], 'content': await summarize(result)}
+        # Pages already summarized (or being summarized) by any researcher in this run are reused
+        record = await store.aget_or_summarize(url, result['title'], lambda: summarize(result))
+        return {'title': result['title'], 'content': record.summary, 'source_id': record.source_id}
+
+    processed = await asyncio.gather(*(process_one(url, result) for url, result in unique_results.items()))
+
+    return dict(zip(unique_results, processed))
+
 def format_search_output(summarized_results: dict) -> str:
     """Format search results into a well-structured string output.
 
@@ -204,16 +522,70 @@ def format_search_output(summarized_results: dict) -> str:
 
     for i, (url, result) in enumerate(summarized_results.items(), 1):
         formatted_output += f"\n\n--- SOURCE {i}: {result['title']} ---\n"
-        formatted_output += f"URL: {url}\n\n"
+        if result.get('source_id'):
+            formatted_output += f"SOURCE ID: {result['source_id']}\n"
+        formatted_output += f"URL: {url}\n"
+        if result.get('duplicate_urls'):
+            formatted_output += f"ALSO PUBLISHED AT: {', '.join(result['duplicate_urls'])}\n"
+        formatted_output += "\n"
         formatted_output += f"SUMMARY:\n{result['content']}\n\n"
         formatted_output += "-" * 80 + "\n"
 
     return formatted_output
 
+# ===== TOOL EXECUTION =====
+
+async def execute_tool_calls(
+    tool_calls: List[dict],
+    tools_by_name: Dict[str, BaseTool],
+    concurrency_limits: Optional[Dict[str, int]] = None,
+) -> List[ToolMessage]:
+    """Execute independent tool calls concurrently and return their ToolMessages.
+
+    Calls run in parallel, with at most N concurrent calls per tool name (see
+    tool_concurrency_limits). A call that fails, or names an unknown tool, is
+    turned into an error ToolMessage instead of aborting the whole turn.
+
+    Args:
+        tool_calls: Tool calls from the last AI message
+        tools_by_name: Mapping of tool name to tool
+        concurrency_limits: Per-tool overrides of tool_concurrency_limits
+
+    Returns:
+        One ToolMessage per tool call, in the same order as tool_calls
+    """
+    limits = {**tool_concurrency_limits, **(concurrency_limits or {})}
+    semaphores = {
+        name: asyncio.Semaphore(limits.get(name, default_tool_concurrency))
+        for name in {tool_call["name"] for tool_call in tool_calls}
+    }
+
+    async def run_one(tool_call: dict) -> ToolMessage:
+        name = tool_call["name"]
+        status = "success"
+        tool = tools_by_name.get(name)
+
+        if tool is None:
+            content, status = f"Error: unknown tool '{name}'", "error"
+        else:
+            try:
+                requested_at = time.monotonic()
+                async with semaphores[name]:
+                    # The wait for a slot is recorded on the tool call's span
+                    with next_span_attributes(queue_wait_seconds=time.monotonic() - requested_at):
+                        content = await tool.ainvoke(tool_call["args"])
+            except Exception as e:
+                logger.warning("Tool %s failed: %s", name, e)
+                content, status = f"Error executing {name}: {str(e)}", "error"
+
+        return ToolMessage(content=content, name=name, tool_call_id=tool_call["id"], status=status)
+
+    # gather preserves tool_calls order, so ToolMessages line up with their tool_call_ids
+    return list(await asyncio.gather(*(run_one(tool_call) for tool_call in tool_calls)))
+
 # ===== RESEARCH TOOLS =====
 
-@tool(parse_docstring=True)
-def tavily_search(
+def _tavily_search(
     query: str,
     max_results: Annotated[int, InjectedToolArg] = 3,
     topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
@@ -236,15 +608,44 @@ def tavily_search(
         include_raw_content=True,
     )
 
-    # Deduplicate results by URL to avoid processing duplicate content
-    unique_results = deduplicate_search_results(search_results)
+    # Deduplicate results by URL, then drop near-duplicate copies of the same page
+    unique_results = filter_near_duplicates(deduplicate_search_results(search_results))
 
     # Process results with summarization
-    summarized_results = process_search_results(unique_results)
+    summarized_results = process_search_results(unique_results, query=query)
 
     # Format output for consumption
     return format_search_output(summarized_results)
 
+async def _atavily_search(
+    query: str,
+    max_results: Annotated[int, InjectedToolArg] = 3,
+    topic: Annotated[Literal["general", "news", "finance"], InjectedToolArg] = "general",
+) -> str:
+    """Async variant of _tavily_search built on atavily_search_multiple."""
+    search_results = await atavily_search_multiple(
+        [query],
+        max_results=max_results,
+        topic=topic,
+        include_raw_content=True,
+    )
+
+    # Fingerprinting long pages is CPU-bound, keep it off the event loop
+    unique_results = await asyncio.to_thread(filter_near_duplicates, deduplicate_search_results(search_results))
+
+    # Summarize all pages concurrently
+    summarized_results = await aprocess_search_results(unique_results, query=query)
+
+    return format_search_output(summarized_results)
+
+# Exposed as one tool with both sync (invoke) and async (ainvoke) implementations
+tavily_search = StructuredTool.from_function(
+    func=_tavily_search,
+    coroutine=_atavily_search,
+    name="tavily_search",
+    parse_docstring=True,
+)
+
 @tool(parse_docstring=True)
 def think_tool(reflection: str) -> str:
     """Tool for strategic reflection on research progress and decision-making.
@@ -0,0 +1,123 @@
+"""Tests for research unit scheduling."""
+
+import asyncio
+
+from deep_research_from_scratch.multi_agent_supervisor import (
+    get_research_result_content,
+)
+from deep_research_from_scratch.scheduler import (
+    PrioritySemaphore,
+    ResearchScheduler,
+    ResearchUnitTimeout,
+)
+
+
+def test_priority_semaphore_serves_waiters_by_priority_then_arrival():
+    async def main():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        order = []
+
+        async def waiter(name, priority):
+            await semaphore.acquire(priority)
+            order.append(name)
+            semaphore.release()
+
+        tasks = [
+            asyncio.create_task(waiter(name, priority))
+            for name, priority in [("low-1", 5), ("high", 0), ("low-2", 5), ("mid", 1)]
+        ]
+        await asyncio.sleep(0)
+        assert semaphore.queued == 4
+        semaphore.release()
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(main()) == ["high", "mid", "low-1", "low-2"]
+
+
+def test_scheduler_caps_concurrency_and_keeps_result_order():
+    async def main():
+        running = peak = 0
+
+        async def unit(value):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            return value
+
+        scheduler = ResearchScheduler(2, global_limiter=PrioritySemaphore(10))
+        results = await scheduler.run_all([lambda value=value: unit(value) for value in range(5)])
+        return results, peak, scheduler.stats
+
+    results, peak, stats = asyncio.run(main())
+    assert results == [0, 1, 2, 3, 4]
+    assert peak == 2
+    assert stats["completed"] == 5
+
+
+def test_unit_timeout_returns_partial_progress():
+    async def main():
+        progress = {}
+
+        async def slow_unit():
+            progress["running_summary"] = "partial findings"
+            await asyncio.sleep(10)
+
+        async def fast_unit():
+            return {"compressed_research": "done"}
+
+        scheduler = ResearchScheduler(2, global_limiter=PrioritySemaphore(10))
+        results = await scheduler.run_all([slow_unit, fast_unit], timeout=0.05)
+        return results, progress, scheduler.stats
+
+    results, progress, stats = asyncio.run(main())
+    assert isinstance(results[0], ResearchUnitTimeout)
+    assert results[1] == {"compressed_research": "done"}
+    assert stats["timed_out"] == 1 and stats["completed"] == 1
+    assert "partial findings" in get_research_result_content(results[0], progress)
+
+
+def test_cancellation_cancels_units_and_releases_permits():
+    async def main():
+        global_limiter = PrioritySemaphore(2)
+        scheduler = ResearchScheduler(2, global_limiter=global_limiter)
+        started = asyncio.Event()
+
+        async def unit():
+            started.set()
+            await asyncio.sleep(10)
+
+        run = asyncio.create_task(scheduler.run_all([unit for _ in range(4)]))
+        await started.wait()
+        run.cancel()
+        try:
+            await run
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0)
+
+        # Every slot is free again: both limiters grant their full capacity at once
+        for limiter in (scheduler.limiter, global_limiter):
+            await asyncio.wait_for(asyncio.gather(limiter.acquire(), limiter.acquire()), timeout=1)
+        return scheduler
+
+    scheduler = asyncio.run(main())
+    assert not scheduler._tasks
+
+
+def test_cancelled_waiter_hands_its_slot_on():
+    async def main():
+        semaphore = PrioritySemaphore(1)
+        await semaphore.acquire()
+        cancelled = asyncio.create_task(semaphore.acquire())
+        waiting = asyncio.create_task(semaphore.acquire())
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        semaphore.release()
+        await asyncio.wait_for(waiting, timeout=1)
+        assert semaphore.queued == 0
+
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Tests for URL canonicalization and run-scoped source stores."""
+
+import pytest
+
+from deep_research_from_scratch import source_store
+from deep_research_from_scratch.source_store import (
+    canonicalize_url,
+    current_source_store,
+    get_source_store,
+    new_source_store_id,
+    use_source_store,
+)
+
+
+@pytest.mark.parametrize(
+    ("url", "expected"),
+    [
+        ("http://www.Example.com/a/", "https://example.com/a"),
+        ("https://example.com/a?utm_source=x&b=2&a=1#frag", "https://example.com/a?a=1&b=2"),
+        ("https://example.com:443/a?fbclid=123", "https://example.com/a"),
+        ("https://example.com:8080/a", "https://example.com:8080/a"),
+        ("https://example.com/story/amp/", "https://example.com/story"),
+        ("https://www.google.com/url?q=https://example.com/a%3Futm_medium%3Dx", "https://example.com/a"),
+        ("mailto:someone@example.com", "mailto:someone@example.com"),
+    ],
+)
+def test_canonicalize_url(url, expected):
+    assert canonicalize_url(url) == expected
+
+
+def test_store_assigns_one_id_per_canonical_url():
+    store = get_source_store(new_source_store_id())
+    first = store.register("https://www.example.com/a?utm_source=x", "A")
+    again = store.register("https://example.com/a", "A")
+    other = store.register("https://example.com/b", "B")
+    assert first is again
+    assert (first.source_id, other.source_id) == ("S1", "S2")
+
+
+def test_stores_in_use_are_not_evicted(monkeypatch):
+    monkeypatch.setattr(source_store, "max_source_stores", 2)
+    monkeypatch.setattr(source_store, "source_store_min_idle_seconds", 0.0)
+    monkeypatch.setattr(source_store, "_stores", source_store.OrderedDict())
+    monkeypatch.setattr(source_store, "_pins", {})
+    monkeypatch.setattr(source_store, "_last_used", {})
+
+    live_id = new_source_store_id()
+    with use_source_store(live_id) as live:
+        assert current_source_store.get() is live
+        live.register("https://example.com/a", "A")
+        for _ in range(5):
+            get_source_store(new_source_store_id())
+        assert get_source_store(live_id) is live
+        assert live.register("https://example.com/b", "B").source_id == "S2"
+    assert current_source_store.get() is None
+
+    # Once released, the store can be evicted like any other
+    for _ in range(3):
+        get_source_store(new_source_store_id())
+    assert live_id not in source_store._stores